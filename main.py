@@ -1,42 +1,116 @@
 import functions_framework
-from src.q1_time import q1_time
-from src.q1_memory import q1_memory
-from src.q2_time import q2_time
-from src.q2_memory import q2_memory
-from src.q3_time import q3_time
-from src.q3_memory import q3_memory
+import os
 import json
 import base64
-from google.cloud import storage
-import datetime
-
-
-def _serializable_result(result):
-    """Convierte resultados de Polars a JSON serializable."""
-    if not isinstance(result, list):
-        return str(result)
-
-    clean_result = []
-    for item in result:
-        # Convertir tuplas a listas y fechas a string
-        clean_item = []
-        for val in item:
-            if isinstance(val, (datetime.date, datetime.datetime)):
-                clean_item.append(val.isoformat())
+import functools
+import importlib
+import threading
+
+
+# Top-k de q1/q2/q3 sobre todos los archivos de input/ (estado incremental)
+GLOBAL_OUTPUT = "output/global_top_k.json"
+
+# Ruta local con los histogramas de esta instancia en formato Prometheus
+METRICS_PATH = "/metrics"
+
+# (pregunta, estrategia) -> (módulo, función). Los motores (polars, msgspec) y el
+# cliente de GCS se importan recién cuando una ruta los necesita (cold start)
+ROUTES = {
+    ("q1", "time"): ("src.q1_time", "q1_time"),
+    ("q1", "memory"): ("src.q1_memory", "q1_memory"),
+    ("q2", "time"): ("src.q2_time", "q2_time"),
+    ("q2", "memory"): ("src.q2_memory", "q2_memory"),
+    ("q3", "time"): ("src.q3_time", "q3_time"),
+    ("q3", "memory"): ("src.q3_memory", "q3_memory"),
+    ("all", "time"): ("src.run_all", "run_all"),
+    ("all", "memory"): ("src.run_all", "run_all"),
+}
+
+
+def _load_route(q, strategy, approximate, engine=None):
+    """Importa solo el módulo de la ruta pedida y fija sus parámetros."""
+    module_name, func_name = ROUTES[(q, strategy)]
+    func = getattr(importlib.import_module(module_name), func_name)
+    options = {}
+    if q == "all":
+        options["strategy"] = strategy
+    if strategy == "memory" and q in ("q2", "q3"):
+        options["approximate"] = approximate
+    if strategy == "time" and engine:
+        options["engine"] = engine
+    return functools.partial(func, **options) if options else func
+
+
+def _compute_http(cache, q, strategy, approximate, file_path, version, func):
+    """
+    Calcula una consulta HTTP compartiendo lecturas del archivo: si hay un q=all en
+    curso sobre el mismo archivo y versión, q1/q2/q3 esperan su resultado en vez de
+    leer de nuevo; y un q=all deja en caché las entradas de cada pregunta.
+    """
+    from src.common.encoding import encode_result, join_encoded
+    from src.common.result_cache import cache_key
+
+    if q != "all" and not approximate:
+        all_key = cache_key("all", strategy, False, file_path, version)
+        all_flight = cache.flights.in_flight(all_key)
+        if all_flight is not None:
+            try:
+                all_flight.result()
+            except Exception as e:
+                # Si el q=all falla, esta pregunta hace su propia lectura
+                print(f"[CACHE] q=all compartido falló, se recalcula {q}: {e}")
             else:
-                clean_item.append(val)
-        clean_result.append(clean_item)
-    return clean_result
+                shared = cache.peek(cache_key(q, strategy, False, file_path, version))
+                if shared is not None:
+                    return shared
 
+    result = func(file_path)
+    if q != "all":
+        return encode_result(result)
 
-def _write_to_gcs(bucket_name, blob_name, data_str):
+    # Cada pregunta se codifica una vez y el JSON de q=all se arma con esas partes
+    parts = {question: encode_result(rows) for question, rows in result.items()}
+    for question, data in parts.items():
+        cache.put(cache_key(question, strategy, False, file_path, version), data)
+    return join_encoded(parts)
+
+
+@functools.cache
+def _build_result_cache():
+    """
+    Cache de resultados HTTP: LRU en memoria (RESULT_CACHE_SIZE entradas) y, si se
+    configura, un nivel persistente en un bucket (RESULT_CACHE_BUCKET) o en un
+    directorio local (RESULT_CACHE_DIR) que sobrevive a los cold starts.
+    Se crea en la primera consulta HTTP.
+    """
+    from src.common.result_cache import ResultCache
+    from src.common.state_store import GCSStateStore, LocalStateStore
+
+    persistent = None
+    if os.environ.get("RESULT_CACHE_BUCKET"):
+        persistent = GCSStateStore(os.environ["RESULT_CACHE_BUCKET"])
+    elif os.environ.get("RESULT_CACHE_DIR"):
+        persistent = LocalStateStore(os.environ["RESULT_CACHE_DIR"])
+    return ResultCache(int(os.environ.get("RESULT_CACHE_SIZE", 128)), persistent)
+
+
+_result_cache_lock = threading.Lock()
+
+
+def _result_cache():
+    """Caché única del proceso, aunque la primera ráfaga llegue en paralelo."""
+    with _result_cache_lock:
+        return _build_result_cache()
+
+
+def _write_to_gcs(bucket_name, blob_name, data):
     """Escribe datos en un bucket de GCS."""
+    from src.common.gcs_client import get_storage_client
+
     print(f"[GCS] Intentando subir a: gs://{bucket_name}/{blob_name}")
     try:
-        client = storage.Client()
-        bucket = client.bucket(bucket_name)
-        blob = bucket.blob(blob_name)
-        blob.upload_from_string(data_str, content_type="application/json")
+        blob = get_storage_client().bucket(bucket_name).blob(blob_name)
+        blob.upload_from_string(data, content_type="application/json")
         print(f"[GCS] Subida exitosa: gs://{bucket_name}/{blob_name}")
         return f"gs://{bucket_name}/{blob_name}"
     except Exception as e:
@@ -47,6 +121,12 @@ def _write_to_gcs(bucket_name, blob_name, data_str):
 @functions_framework.http
 def entrypoint(request):
     """Entrypoint universal para Cloud Function (HTTP y Pub/Sub)."""
+    # Caso 0: Scrape de métricas (latencia, throughput y memoria por evento/paso)
+    if getattr(request, "path", None) == METRICS_PATH:
+        from src.common.metrics import CONTENT_TYPE, REGISTRY
+
+        return REGISTRY.render(), 200, {"Content-Type": CONTENT_TYPE}
+
     request_json = request.get_json(silent=True)
 
     # Caso 1: Evento Pub/Sub (GCS Notification vía Eventarc)
@@ -61,27 +141,42 @@ def entrypoint(request):
                 bucket = data.get("bucket")
                 name = data.get("name")
                 if bucket and name:
+                    from src.common.encoding import encode_result
+                    from src.incremental import publish_global, update_state
+                    from src.common.state_store import GCSStateStore
+
                     file_path = f"gs://{bucket}/{name}"
                     print(f"[BATCH] Procesando archivo: {file_path}")
 
-                    # Ejecutar procesamiento
-                    result = q1_time(file_path)
+                    # Escanear solo el archivo nuevo y fusionarlo al estado acumulado.
+                    # El q1 del archivo sale del conteo fusionado (q1_memory): los
+                    # totales por fecha omiten tweets sin username y los empates van
+                    # a la primera fecha vista, a diferencia de q1_time
+                    store = GCSStateStore(bucket)
+                    result = update_state(
+                        store, file_path, name, str(data.get("generation", ""))
+                    )
 
-                    # Persistir resultado
+                    # Persistir resultado del archivo (q1)
                     output_name = name.replace("input/", "output/")
                     if output_name == name:
                         output_name = f"output/{name.split('/')[-1]}"
-                    serializable = _serializable_result(result)
                     output_path = _write_to_gcs(
-                        bucket, output_name, json.dumps(serializable)
+                        bucket, output_name, encode_result(result["file"]["q1"])
                     )
 
+                    # Top-k global desde el último estado, con escritura condicional:
+                    # una invocación que termina tarde no deja un top-k antiguo
+                    publish_global(store, GLOBAL_OUTPUT)
+                    global_path = f"gs://{bucket}/{GLOBAL_OUTPUT}"
+
                     return json.dumps(
                         {
                             "status": "success",
                             "trigger": "pubsub",
                             "input": file_path,
                             "output": output_path,
+                            "global_output": global_path,
                         }
                     ), 200
 
@@ -97,34 +192,55 @@ def entrypoint(request):
     q = request.args.get("q", "q1")
     strategy = request.args.get("strategy", "time")
     file_path = request.args.get("file")
+    # Top-k aproximado con memoria fija (solo aplica a q2/q3 con strategy=memory)
+    approximate = (
+        request.args.get("approximate", "false").lower() in ("1", "true")
+        and strategy == "memory"
+        and q in ("q2", "q3")
+    )
 
     if not file_path:
         return json.dumps(
             {"status": "error", "message": "Missing required parameter: file"}
         ), 400
 
-    funcs = {
-        ("q1", "time"): q1_time,
-        ("q1", "memory"): q1_memory,
-        ("q2", "time"): q2_time,
-        ("q2", "memory"): q2_memory,
-        ("q3", "time"): q3_time,
-        ("q3", "memory"): q3_memory,
-    }
-
-    func = funcs.get((q, strategy))
-    if not func:
+    if (q, strategy) not in ROUTES:
         return "Invalid question or strategy", 400
 
-    try:
-        result = func(file_path)
+    # Motor de polars de strategy=time: in-memory, streaming o auto (elige según
+    # POLARS_MEMORY_BUDGET_MB). No cambia el resultado, así que no entra en la caché
+    from src.common.polars_engine import ENGINES
+
+    engine = request.args.get("engine")
+    if engine is not None and engine not in ENGINES:
         return json.dumps(
+            {"status": "error", "message": f"Invalid engine: {engine}"}
+        ), 400
+
+    try:
+        from src.common.encoding import encode_response
+        from src.common.result_cache import cached_call, object_version
+
+        func = _load_route(q, strategy, approximate, engine)
+        # Los archivos de entrada son inmutables: la versión del objeto (generation
+        # en GCS, mtime+tamaño en local) invalida la entrada si se reescribe
+        cache, version = _result_cache(), object_version(file_path)
+        # Consultas idénticas concurrentes se fusionan en un solo cálculo
+        result = cached_call(
+            cache,
+            (q, strategy, approximate, file_path, version),
+            lambda: _compute_http(
+                cache, q, strategy, approximate, file_path, version, func
+            ),
+        )
+        return encode_response(
             {
                 "question": q,
                 "strategy": strategy,
+                "approximate": approximate,
                 "file": file_path,
-                "result": _serializable_result(result),
-            }
+            },
+            result,
         ), 200
     except Exception as e:
         print(f"[HTTP ERROR] {str(e)}")
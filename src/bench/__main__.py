@@ -0,0 +1,131 @@
+import sys
+import json
+import argparse
+
+from src.bench.compare import compare_runs, environment_mismatches, format_report
+from src.bench.datasets import DATASET_SEED, DATASET_SIZES
+from src.bench.runner import DEFAULT_DATA_DIR, TARGETS, environment, run_suite
+from src.bench.scaling import run_scaling, write_curves
+from src.bench.synthetic import (
+    MALFORMED_KINDS,
+    SyntheticSpec,
+    parse_size,
+    write_synthetic,
+)
+
+
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _report(baseline: dict, current: dict, args) -> int:
+    rows = compare_runs(baseline, current, args.threshold, args.alpha)
+    print(format_report(rows, environment_mismatches(baseline, current)))
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.bench",
+        description="Reproducible benchmarks on synthetic data with regression checks.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="run the suite and write a results JSON")
+    run.add_argument("--targets", default=",".join(TARGETS))
+    run.add_argument("--sizes", default="small")
+    run.add_argument("--repeats", type=int, default=5)
+    run.add_argument("--seed", type=int, default=DATASET_SEED)
+    run.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    run.add_argument("--output", required=True)
+    run.add_argument("--baseline", help="compare against this results JSON")
+
+    compare = sub.add_parser("compare", help="compare two results JSON files")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+
+    generate = sub.add_parser("generate", help="write a synthetic NDJSON dataset")
+    generate.add_argument("output")
+    size = generate.add_mutually_exclusive_group(required=True)
+    size.add_argument("--size", type=parse_size, help="e.g. 100MB, 50GB")
+    size.add_argument("--tweets", type=int)
+    defaults = SyntheticSpec()
+    for field in SyntheticSpec.__struct_fields__:
+        value = getattr(defaults, field)
+        if isinstance(value, (int, float, str)):
+            generate.add_argument(
+                f"--{field.replace('_', '-')}", type=type(value), default=value
+            )
+    generate.add_argument(
+        "--malformed-kinds",
+        default=",".join(defaults.malformed_kinds),
+        help=f"comma separated subset of {', '.join(MALFORMED_KINDS)}",
+    )
+
+    scale = sub.add_parser(
+        "scale", help="sweep input size and threads, write CSV/JSON curves"
+    )
+    scale.add_argument("--targets", default=",".join(TARGETS))
+    scale.add_argument("--sizes", default="10MB,100MB,1GB")
+    scale.add_argument("--threads", default="1,2,4")
+    scale.add_argument("--repeats", type=int, default=3)
+    scale.add_argument("--seed", type=int, default=DATASET_SEED)
+    scale.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    scale.add_argument(
+        "--output", required=True, help="path prefix for <output>.csv/.json"
+    )
+
+    for p in (run, compare):
+        p.add_argument("--threshold", type=float, default=0.10)
+        p.add_argument("--alpha", type=float, default=0.05)
+
+    args = parser.parse_args(argv)
+    if args.command == "generate":
+        spec = SyntheticSpec(
+            **{
+                field: getattr(args, field)
+                for field in SyntheticSpec.__struct_fields__
+                if hasattr(args, field)
+            }
+            | {"malformed_kinds": tuple(args.malformed_kinds.split(","))}
+        )
+        stats = write_synthetic(args.output, spec, args.size, args.tweets)
+        print(
+            f"{args.output}: {stats.tweets} tweets, {stats.malformed} malformed, "
+            f"{stats.bytes} bytes"
+        )
+        return 0
+    if args.command == "scale":
+        targets = args.targets.split(",")
+        if unknown := [t for t in targets if t not in TARGETS]:
+            parser.error(f"unknown targets: {', '.join(unknown)}")
+        sizes = [parse_size(size) for size in args.sizes.split(",")]
+        threads = [int(n) for n in args.threads.split(",")]
+        meta = environment() | {"repeats": args.repeats, "seed": args.seed}
+        rows = run_scaling(
+            targets, sizes, threads, args.repeats, args.data_dir, args.seed
+        )
+        print(
+            "Curves written to {} and {}".format(*write_curves(rows, args.output, meta))
+        )
+        return 0
+    if args.command == "compare":
+        return _report(_load(args.baseline), _load(args.current), args)
+
+    targets, sizes = args.targets.split(","), args.sizes.split(",")
+    unknown = [t for t in targets if t not in TARGETS] + [
+        s for s in sizes if s not in DATASET_SIZES
+    ]
+    if unknown:
+        parser.error(f"unknown targets/sizes: {', '.join(unknown)}")
+
+    current = run_suite(targets, sizes, args.repeats, args.data_dir, args.seed)
+    with open(args.output, "w") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.output}")
+    return _report(_load(args.baseline), current, args) if args.baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
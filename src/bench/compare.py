@@ -0,0 +1,47 @@
+from src.bench.stats import compare_samples
+
+METRICS = ("time_s", "peak_rss_mb", "peak_anon_mb")
+
+# Meta fields that make two result files incomparable when they differ
+ENVIRONMENT_KEYS = ("machine", "cpu_count", "python", "polars", "msgspec")
+
+
+def environment_mismatches(baseline: dict, current: dict) -> list[str]:
+    base, new = baseline["meta"], current["meta"]
+    return [
+        f"{key}: {base.get(key)} -> {new.get(key)}"
+        for key in ENVIRONMENT_KEYS
+        if base.get(key) != new.get(key)
+    ]
+
+
+def compare_runs(
+    baseline: dict, current: dict, threshold: float = 0.10, alpha: float = 0.05
+) -> list[dict]:
+    """One row per (target/size, metric) measured in both result files."""
+    rows = []
+    for key in sorted(baseline["results"].keys() & current["results"].keys()):
+        base, new = baseline["results"][key], current["results"][key]
+        for metric in METRICS:
+            # Older result files (or non-Linux runs) lack some metrics
+            if None in base.get(metric, [None]) or None in new.get(metric, [None]):
+                continue
+            row = compare_samples(base[metric], new[metric], threshold, alpha)
+            rows.append({"key": key, "metric": metric, **row})
+    return rows
+
+
+def format_report(rows: list[dict], mismatches: list[str] = ()) -> str:
+    lines = [f"WARNING environment differs ({m})" for m in mismatches]
+    lines.append(
+        f"{'benchmark':<26} {'metric':<12} {'baseline':>10} {'current':>10} "
+        f"{'change':>8} {'p':>6}"
+    )
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        lines.append(
+            f"{row['key']:<26} {row['metric']:<12} {row['baseline_median']:>10.3f} "
+            f"{row['current_median']:>10.3f} {row['change']:>+8.1%} "
+            f"{row['p_value']:>6.3f}{flag}"
+        )
+    return "\n".join(lines)
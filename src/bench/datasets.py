@@ -0,0 +1,90 @@
+import os
+
+from src.bench.synthetic import (
+    GENERATOR_VERSION,
+    WRITE_BLOCK_BYTES,
+    SyntheticSpec,
+    write_synthetic,
+)
+
+# Named dataset sizes (tweets) shared by every benchmark run and baseline
+DATASET_SIZES = {
+    "tiny": 2_000,
+    "small": 20_000,
+    "medium": 100_000,
+    "large": 400_000,
+}
+
+# Average bytes per synthetic tweet, to scale cardinalities of byte-sized datasets
+AVG_TWEET_BYTES = 470
+
+# Same seed, same bytes: baselines stay comparable across machines and runs
+DATASET_SEED = 2021
+
+# Compressed variants of a dataset: suffix and the tools' default levels
+COMPRESSIONS = {"gzip": (".gz", 6), "zstd": (".zst", 3)}
+
+
+def scaled_spec(n: int, seed: int = DATASET_SEED) -> SyntheticSpec:
+    """Default synthetic spec with user/mention cardinalities scaled to n tweets."""
+    return SyntheticSpec(
+        seed=seed, users=max(n // 5, 100), mention_users=max(n // 10, 50)
+    )
+
+
+def write_dataset(path: str, n: int, seed: int = DATASET_SEED) -> int:
+    """Writes n synthetic tweets as NDJSON and returns the file size in bytes."""
+    return write_synthetic(path, scaled_spec(n, seed), n_tweets=n).bytes
+
+
+def ensure_dataset(directory: str, name: str, seed: int = DATASET_SEED) -> str:
+    """Path of the named dataset, generated once per (name, size, seed, generator)."""
+    n = DATASET_SIZES[name]
+    path = os.path.join(directory, f"{name}-{n}-{seed}-v{GENERATOR_VERSION}.json")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_dataset(f"{path}.tmp", n, seed)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def ensure_sized_dataset(
+    directory: str, size_bytes: int, seed: int = DATASET_SEED
+) -> str:
+    """Like ensure_dataset, for a file of at least size_bytes (scaling sweeps)."""
+    path = os.path.join(
+        directory, f"bytes-{size_bytes}-{seed}-v{GENERATOR_VERSION}.json"
+    )
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        spec = scaled_spec(size_bytes // AVG_TWEET_BYTES, seed)
+        write_synthetic(f"{path}.tmp", spec, target_bytes=size_bytes)
+        os.replace(f"{path}.tmp", path)
+    return path
+
+
+def ensure_compressed(path: str, compression: str, directory: str | None = None) -> str:
+    """
+    Compressed copy of a dataset (<name>.gz / <name>.zst) in directory, or next to
+    the dataset, written once and streamed block by block.
+    """
+    suffix, level = COMPRESSIONS[compression]
+    out = os.path.join(directory or os.path.dirname(path), os.path.basename(path))
+    out += suffix
+    if not os.path.exists(out):
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        if compression == "gzip":
+            import gzip
+
+            writer = gzip.open(f"{out}.tmp", "wb", compresslevel=level)
+        else:
+            import zstandard
+
+            writer = zstandard.ZstdCompressor(level=level).stream_writer(
+                open(f"{out}.tmp", "wb")
+            )
+        with open(path, "rb") as src, writer:
+            while block := src.read(WRITE_BLOCK_BYTES):
+                writer.write(block)
+        os.replace(f"{out}.tmp", out)
+    return out
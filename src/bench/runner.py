@@ -0,0 +1,206 @@
+import os
+import sys
+import json
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+from importlib import metadata
+
+from src.bench.datasets import DATASET_SEED, DATASET_SIZES, ensure_dataset
+from src.bench.stats import summarize
+from src.bench.synthetic import GENERATOR_VERSION
+
+# name -> (module, function, kwargs)
+TARGETS = {
+    "q1_time": ("src.q1_time", "q1_time", {}),
+    "q1_memory": ("src.q1_memory", "q1_memory", {}),
+    # Builds the date index sidecar on the first run, reuses it afterwards
+    "q1_memory_indexed": ("src.q1_memory", "q1_memory", {"use_index": True}),
+    # Decodes newline-aligned raw blocks instead of line by line
+    "q1_memory_raw_scan": ("src.q1_memory", "q1_memory", {"raw_scan": True}),
+    "q2_time": ("src.q2_time", "q2_time", {}),
+    "q2_memory": ("src.q2_memory", "q2_memory", {}),
+    "q3_time": ("src.q3_time", "q3_time", {}),
+    "q3_memory": ("src.q3_memory", "q3_memory", {}),
+    "q3_memory_raw_scan": ("src.q3_memory", "q3_memory", {"raw_scan": True}),
+    "run_all_time": ("src.run_all", "run_all", {"strategy": "time"}),
+    "run_all_memory": ("src.run_all", "run_all", {"strategy": "memory"}),
+    "q1_time_streaming": ("src.q1_time", "q1_time", {"engine": "streaming"}),
+    "q2_time_streaming": ("src.q2_time", "q2_time", {"engine": "streaming"}),
+    "q3_time_streaming": ("src.q3_time", "q3_time", {"engine": "streaming"}),
+    "run_all_time_streaming": (
+        "src.run_all",
+        "run_all",
+        {"strategy": "time", "engine": "streaming"},
+    ),
+}
+
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "latam-bench-data")
+
+# Runs one target in a fresh interpreter: imports are warm before the clock starts,
+# ru_maxrss is this run's own peak and the outer canonical event gives the steps.
+# ru_maxrss also counts the mmapped input (file pages, reclaimable), so a thread
+# samples RssAnon to get the heap actually held by the engine (Linux only)
+PROBE = """
+import os, sys, json, time, resource, importlib, threading
+
+# Before polars starts its thread pool, so it sizes the pool to the allowed cores
+if cpus := os.environ.get("BENCH_CPUS"):
+    os.sched_setaffinity(0, sorted(os.sched_getaffinity(0))[: int(cpus)])
+
+from src.common import metrics
+
+module, func, kwargs, file_path, out = sys.argv[1:6]
+events = []
+record_event = metrics.REGISTRY.record_event
+metrics.REGISTRY.record_event = lambda data: (events.append(data), record_event(data))
+fn = getattr(importlib.import_module(module), func)
+import_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+peak_anon, done = [None], threading.Event()
+def sample_anon():
+    while True:
+        try:
+            with open("/proc/self/status") as status:
+                kb = next(int(l.split()[1]) for l in status if l.startswith("RssAnon"))
+        except (OSError, StopIteration):
+            return
+        peak_anon[0] = max(peak_anon[0] or 0, kb / 1024)
+        if done.wait(0.01):
+            return
+sampler = threading.Thread(target=sample_anon, daemon=True)
+sampler.start()
+
+t0 = time.perf_counter()
+fn(file_path, **json.loads(kwargs))
+elapsed = time.perf_counter() - t0
+done.set()
+sampler.join()
+steps = {k: v["duration_ms"] for k, v in events[-1]["steps"].items()} if events else {}
+with open(out, "w") as f:
+    json.dump({
+        "time_s": elapsed,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "import_rss_mb": import_rss,
+        "peak_anon_mb": peak_anon[0],
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        "steps_ms": steps,
+    }, f)
+"""
+
+
+def run_once(
+    target: str,
+    file_path: str,
+    env: dict | None = None,
+    overrides: dict | None = None,
+) -> dict:
+    """
+    One isolated measurement of a target over a file. env is added to the child's
+    environment (e.g. POLARS_MAX_THREADS, BENCH_CPUS) and overrides to its kwargs.
+    """
+    module, func, kwargs = TARGETS[target]
+    kwargs = {**kwargs, **(overrides or {})}
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as out:
+        out_path = out.name
+    try:
+        subprocess.run(
+            [sys.executable, "-c", PROBE, module, func, json.dumps(kwargs)]
+            + [file_path, out_path],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            env={**os.environ, **(env or {})},
+        )
+        with open(out_path) as f:
+            return json.load(f)
+    finally:
+        os.remove(out_path)
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _version(package: str) -> str | None:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def environment() -> dict:
+    """What a baseline depends on besides the code: machine and library versions."""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "polars": _version("polars"),
+        "msgspec": _version("msgspec"),
+    }
+
+
+def run_suite(
+    targets: list[str],
+    sizes: list[str],
+    repeats: int = 5,
+    data_dir: str = DEFAULT_DATA_DIR,
+    seed: int = DATASET_SEED,
+    log=print,
+) -> dict:
+    """
+    Runs every target on every named dataset `repeats` times. Runs are
+    interleaved (target order rotates each round) so drift in the machine
+    (thermal, page cache) spreads over all targets instead of biasing one.
+    """
+    datasets, results = {}, {}
+    for size in sizes:
+        path = ensure_dataset(data_dir, size, seed)
+        datasets[size] = {
+            "tweets": DATASET_SIZES[size],
+            "seed": seed,
+            "generator": GENERATOR_VERSION,
+            "bytes": os.path.getsize(path),
+        }
+        for round_ in range(repeats):
+            shift = round_ % len(targets)
+            for target in targets[shift:] + targets[:shift]:
+                sample = run_once(target, path)
+                entry = results.setdefault(
+                    f"{target}/{size}",
+                    {
+                        "time_s": [],
+                        "peak_rss_mb": [],
+                        "peak_anon_mb": [],
+                        "steps_ms": [],
+                    },
+                )
+                for metric in ("time_s", "peak_rss_mb", "peak_anon_mb", "steps_ms"):
+                    entry[metric].append(sample[metric])
+                log(
+                    f"{target}/{size} run {round_ + 1}/{repeats}: "
+                    f"{sample['time_s']:.3f}s, {sample['peak_rss_mb']:.1f}MB"
+                )
+
+    for entry in results.values():
+        entry["summary"] = {
+            metric: summarize(entry[metric])
+            for metric in ("time_s", "peak_rss_mb", "peak_anon_mb")
+            if None not in entry[metric]
+        }
+    return {
+        "meta": {**environment(), "repeats": repeats},
+        "datasets": datasets,
+        "results": results,
+    }
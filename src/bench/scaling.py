@@ -0,0 +1,170 @@
+import os
+import csv
+import json
+import statistics
+
+from src.bench.datasets import DATASET_SEED, ensure_sized_dataset
+from src.bench.runner import DEFAULT_DATA_DIR, environment, run_once
+
+# Targets with a `workers` argument (byte-range process pool); the rest are
+# polars plans whose parallelism is POLARS_MAX_THREADS
+WORKER_TARGETS = frozenset({"q1_memory", "q2_memory", "q3_memory"})
+
+# Cloud Functions (gen2) available_memory tiers, in MiB
+MEMORY_TIERS = {
+    "256Mi": 256,
+    "512Mi": 512,
+    "1Gi": 1024,
+    "2Gi": 2048,
+    "4Gi": 4096,
+    "8Gi": 8192,
+    "16Gi": 16384,
+    "32Gi": 32768,
+}
+
+# Margin over the measured peak (GC timing, larger real tweets, concurrent requests)
+MEMORY_HEADROOM = 1.25
+
+BASE_COLUMNS = [
+    "target",
+    "size_bytes",
+    "threads",
+    "repeat",
+    "time_s",
+    "throughput_mb_s",
+    "peak_rss_mb",
+    "peak_anon_mb",
+    "children_peak_rss_mb",
+]
+
+
+def parallelism(target: str, threads: int) -> tuple[dict, dict]:
+    """
+    Child environment and kwargs that run target with `threads` cores: the process
+    is pinned to that many CPUs, polars sizes its pool to it and the msgspec
+    strategies split the file across that many workers.
+    """
+    env = {
+        "BENCH_CPUS": str(min(threads, len(os.sched_getaffinity(0)))),
+        "POLARS_MAX_THREADS": str(threads),
+    }
+    overrides = {"workers": threads} if target in WORKER_TARGETS else {}
+    return env, overrides
+
+
+def memory_tier(rss_mb: float) -> str | None:
+    """Smallest available_memory tier holding rss_mb plus headroom (None if none)."""
+    needed = rss_mb * MEMORY_HEADROOM
+    return next((tier for tier, mib in MEMORY_TIERS.items() if mib >= needed), None)
+
+
+def run_scaling(
+    targets: list[str],
+    sizes: list[int],
+    threads: list[int],
+    repeats: int = 3,
+    data_dir: str = DEFAULT_DATA_DIR,
+    seed: int = DATASET_SEED,
+    log=print,
+) -> list[dict]:
+    """One row per (target, size, threads, repeat), with per-step times flattened."""
+    rows = []
+    for size in sizes:
+        path = ensure_sized_dataset(data_dir, size, seed)
+        size_bytes = os.path.getsize(path)
+        for n_threads in threads:
+            for target in targets:
+                env, overrides = parallelism(target, n_threads)
+                for repeat in range(repeats):
+                    sample = run_once(target, path, env, overrides)
+                    row = {
+                        "target": target,
+                        "size_bytes": size_bytes,
+                        "threads": n_threads,
+                        "repeat": repeat,
+                        "time_s": sample["time_s"],
+                        "throughput_mb_s": size_bytes / 1e6 / sample["time_s"],
+                        "peak_rss_mb": sample["peak_rss_mb"],
+                        "peak_anon_mb": sample["peak_anon_mb"],
+                        "children_peak_rss_mb": sample["children_peak_rss_mb"],
+                    }
+                    row |= {f"step_{k}_ms": v for k, v in sample["steps_ms"].items()}
+                    rows.append(row)
+                    log(
+                        f"{target} {size_bytes / 1e6:.0f}MB x{n_threads} "
+                        f"run {repeat + 1}/{repeats}: {row['time_s']:.3f}s, "
+                        f"{row['throughput_mb_s']:.1f}MB/s, {row['peak_rss_mb']:.1f}MB"
+                    )
+    return rows
+
+
+def scaling_curves(rows: list[dict]) -> list[dict]:
+    """
+    Medians per (target, size, threads), plus the speedup against the fewest
+    threads measured for the same target and size. The instance needs the parent
+    peak plus one worker peak per worker (RUSAGE_CHILDREN reports the largest
+    child), which gives the smallest memory tier that fits.
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault(
+            (row["target"], row["size_bytes"], row["threads"]), []
+        ).append(row)
+
+    curves = []
+    for (target, size_bytes, n_threads), group in sorted(groups.items()):
+        steps = {key for row in group for key in row if key.startswith("step_")}
+        curves.append(
+            {
+                "target": target,
+                "size_bytes": size_bytes,
+                "threads": n_threads,
+                "time_s": statistics.median(r["time_s"] for r in group),
+                "throughput_mb_s": statistics.median(
+                    r["throughput_mb_s"] for r in group
+                ),
+                "peak_rss_mb": max(r["peak_rss_mb"] for r in group),
+                "peak_anon_mb": max((r.get("peak_anon_mb") or 0) for r in group),
+                "children_peak_rss_mb": max(r["children_peak_rss_mb"] for r in group),
+                **{
+                    key: statistics.median(r[key] for r in group if key in r)
+                    for key in sorted(steps)
+                },
+            }
+        )
+
+    base = {}
+    for curve in curves:  # sorted, so the fewest threads come first
+        reference = base.setdefault(
+            (curve["target"], curve["size_bytes"]), curve["time_s"]
+        )
+        curve["speedup"] = reference / curve["time_s"]
+        workers = curve["threads"] if curve["children_peak_rss_mb"] else 0
+        curve["instance_rss_mb"] = (
+            curve["peak_rss_mb"] + workers * curve["children_peak_rss_mb"]
+        )
+        curve["memory_tier"] = memory_tier(curve["instance_rss_mb"])
+    return curves
+
+
+def write_curves(
+    rows: list[dict], output: str, meta: dict | None = None
+) -> tuple[str, str]:
+    """Writes <output>.csv (one row per run) and <output>.json (meta, rows, curves)."""
+    csv_path, json_path = f"{output}.csv", f"{output}.json"
+    steps = sorted({key for row in rows for key in row if key.startswith("step_")})
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=BASE_COLUMNS + steps, restval="")
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(json_path, "w") as f:
+        json.dump(
+            {
+                "meta": meta or environment(),
+                "rows": rows,
+                "curves": scaling_curves(rows),
+            },
+            f,
+            indent=2,
+        )
+    return csv_path, json_path
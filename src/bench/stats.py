@@ -0,0 +1,63 @@
+import random
+import statistics
+from itertools import combinations
+from math import comb
+
+# Above this many label permutations the test samples instead of enumerating
+EXACT_PERMUTATIONS = 20_000
+SAMPLED_PERMUTATIONS = 10_000
+
+
+def summarize(samples: list[float]) -> dict:
+    """Median, mean, standard deviation, min and max of repeated measurements."""
+    return {
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "min": min(samples),
+        "max": max(samples),
+    }
+
+
+def permutation_pvalue(baseline: list[float], current: list[float]) -> float:
+    """
+    One-sided permutation test: probability that relabeling the pooled samples
+    yields a mean increase at least as large as the observed one. Exact for small
+    samples (5 vs 5 runs: 252 splits), no distribution assumption.
+    """
+    pooled = baseline + current
+    n, k = len(pooled), len(current)
+    observed = statistics.fmean(current) - statistics.fmean(baseline)
+    total = sum(pooled)
+
+    def diff(indices) -> float:
+        picked = sum(pooled[i] for i in indices)
+        return picked / k - (total - picked) / (n - k)
+
+    if comb(n, k) <= EXACT_PERMUTATIONS:
+        splits = list(combinations(range(n), k))
+    else:
+        rnd = random.Random(0)
+        splits = [rnd.sample(range(n), k) for _ in range(SAMPLED_PERMUTATIONS)]
+    # Small tolerance so ties with the observed split count as "as large"
+    return sum(diff(s) >= observed - 1e-12 for s in splits) / len(splits)
+
+
+def compare_samples(
+    baseline: list[float], current: list[float], threshold: float, alpha: float
+) -> dict:
+    """
+    Flags a regression when the median grows more than `threshold` (relative)
+    and the increase is significant at `alpha`. With n runs per side the smallest
+    attainable p-value is 1 / comb(2n, n): use at least 4 repeats for alpha=0.05.
+    """
+    base, new = statistics.median(baseline), statistics.median(current)
+    change = (new - base) / base if base else 0.0
+    p_value = permutation_pvalue(baseline, current)
+    return {
+        "baseline_median": base,
+        "current_median": new,
+        "change": change,
+        "p_value": p_value,
+        "regression": change > threshold and p_value < alpha,
+    }
@@ -0,0 +1,246 @@
+import os
+import re
+import math
+import random
+import msgspec
+from datetime import datetime, timedelta
+from collections.abc import Iterable
+
+# Bump whenever the bytes produced for a given spec change (invalidates cached files)
+GENERATOR_VERSION = 1
+
+# Lines are joined into blocks of about this many bytes before each write
+WRITE_BLOCK_BYTES = 1 << 20
+
+SIZE_UNITS = {"": 1, "B": 1, "KB": 10**3, "MB": 10**6, "GB": 10**9, "TB": 10**12}
+
+WORDS = (
+    "farmers protest delhi support india now with the we stand kisan andolan "
+    "government law bill agriculture rights justice peace people voice world "
+    "modi border tractor rally january february march solidarity against for"
+).split()
+
+SKIN_TONES = [chr(c) for c in range(0x1F3FB, 0x1F3FF + 1)]
+
+# Emoji pools by kind; within the chosen kind, popularity is Zipf over the pool order
+EMOJI_POOLS = {
+    "simple": list("🚜🌾🙏😂😭🔥💚💪👏😡🤣🥺🌍✊💯😍🤔👇🙌💔"),
+    "skin_tone": [base + tone for base in "👍🙏✊👏💪🙌" for tone in SKIN_TONES],
+    "zwj": [
+        "🏳️‍🌈",  # flag + FE0F + ZWJ + rainbow
+        "❤️‍🔥",
+        "👁️‍🗨️",
+        "🏳️‍⚧️",
+        "👨‍🌾",  # ZWJ without FE0F
+        "👩‍🌾",
+        "👨‍👩‍👧",
+        "🧑🏽‍🌾",  # skin tone inside a ZWJ sequence
+    ],
+    "flag": [
+        chr(0x1F1E6 + ord(a) - 65) + chr(0x1F1E6 + ord(b) - 65)
+        for a, b in ("IN", "US", "GB", "CA", "AU", "PK", "AR", "CL", "BR", "MX")
+    ],
+}
+
+# Share of each pool among the emojis of a tweet
+EMOJI_MIX = {"simple": 0.6, "skin_tone": 0.15, "zwj": 0.1, "flag": 0.15}
+
+# Malformed line kinds: "schema" is valid JSON with wrong field types (every engine
+# skips it); "truncated" and "garbage" are not JSON at all (msgspec readers skip
+# them, polars scan_ndjson rejects the file)
+MALFORMED_KINDS = ("schema", "truncated", "garbage")
+
+
+class SyntheticSpec(msgspec.Struct, frozen=True, kw_only=True):
+    """Shape of a synthetic dataset; the same spec always yields the same bytes."""
+
+    seed: int = 2021
+    start_date: str = "2021-02-01"
+    days: int = 30
+    date_skew: float = 0.5
+    users: int = 100_000
+    user_skew: float = 1.1
+    mention_users: int = 50_000
+    mention_skew: float = 1.2
+    mentions_per_tweet: float = 0.6
+    words_per_tweet: tuple[int, int] = (6, 30)
+    emoji_density: float = 0.8
+    emoji_mix: dict[str, float] = msgspec.field(default_factory=lambda: dict(EMOJI_MIX))
+    malformed_rate: float = 0.0
+    malformed_kinds: tuple[str, ...] = ("schema",)
+
+    def __post_init__(self):
+        if unknown := set(self.malformed_kinds) - set(MALFORMED_KINDS):
+            raise ValueError(f"Unknown malformed kinds: {sorted(unknown)}")
+        if unknown := set(self.emoji_mix) - EMOJI_POOLS.keys():
+            raise ValueError(f"Unknown emoji kinds: {sorted(unknown)}")
+
+
+class GenerationStats(msgspec.Struct):
+    tweets: int = 0
+    malformed: int = 0
+    bytes: int = 0
+
+
+class ZipfSampler:
+    """
+    Draws ranks 1..n with P(k) ~ 1/k^s by rejection-inversion (Hörmann and
+    Derflinger), in O(1) memory and expected time whatever n is, so cardinalities
+    of millions of users need no probability table. s=0 is uniform.
+    """
+
+    def __init__(self, n: int, s: float, rnd: random.Random):
+        self.n, self.s, self.rnd = n, s, rnd
+        if s > 0:
+            self.h_x1 = self._h_integral(1.5) - 1.0
+            self.h_n = self._h_integral(n + 0.5)
+            self.threshold = 2.0 - self._h_integral_inverse(
+                self._h_integral(2.5) - self._h(2.0)
+            )
+
+    def _h(self, x: float) -> float:
+        return math.exp(-self.s * math.log(x))
+
+    def _h_integral(self, x: float) -> float:
+        log_x = math.log(x)
+        t = (1.0 - self.s) * log_x
+        return (math.expm1(t) / t if abs(t) > 1e-8 else 1.0 + t / 2) * log_x
+
+    def _h_integral_inverse(self, x: float) -> float:
+        t = max(x * (1.0 - self.s), -1.0)
+        return math.exp((math.log1p(t) / t if abs(t) > 1e-8 else 1.0 - t / 2) * x)
+
+    def sample(self) -> int:
+        if self.s <= 0:
+            return self.rnd.randint(1, self.n)
+        while True:
+            u = self.h_n + self.rnd.random() * (self.h_x1 - self.h_n)
+            x = self._h_integral_inverse(u)
+            k = min(max(int(x + 0.5), 1), self.n)
+            if k - x <= self.threshold or u >= self._h_integral(k + 0.5) - self._h(k):
+                return k
+
+
+def parse_size(size: str | int) -> int:
+    """'100MB', '50GB', '1.5GB' or a plain byte count -> bytes (decimal units)."""
+    if isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMGT]?B?)\s*", size.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(float(match[1]) * SIZE_UNITS[match[2]])
+
+
+def _poisson(rnd: random.Random, lam: float) -> int:
+    """Knuth's method; fine for the small means used here."""
+    limit, k, p = math.exp(-lam), 0, rnd.random()
+    while p > limit:
+        k += 1
+        p *= rnd.random()
+    return k
+
+
+def generate_lines(spec: SyntheticSpec) -> Iterable[bytes]:
+    """Infinite stream of NDJSON lines (without newline) following spec."""
+    rnd = random.Random(spec.seed)
+    users = ZipfSampler(spec.users, spec.user_skew, rnd)
+    mentions = ZipfSampler(spec.mention_users, spec.mention_skew, rnd)
+    days = ZipfSampler(spec.days, spec.date_skew, rnd)
+    # Busiest day is not always the first one
+    day_order = rnd.sample(range(spec.days), spec.days)
+    start = datetime.fromisoformat(spec.start_date)
+    kinds = list(spec.emoji_mix)
+    kind_weights = list(spec.emoji_mix.values())
+    pools = {kind: ZipfSampler(len(EMOJI_POOLS[kind]), 1.0, rnd) for kind in kinds}
+    encoder = msgspec.json.Encoder()
+
+    for tweet_id in range(1, 1 << 62):
+        if spec.malformed_rate and rnd.random() < spec.malformed_rate:
+            yield _malformed(rnd, rnd.choice(spec.malformed_kinds))
+            continue
+
+        date = start + timedelta(
+            days=day_order[days.sample() - 1], seconds=rnd.randrange(86_400)
+        )
+        tokens = rnd.choices(WORDS, k=rnd.randint(*spec.words_per_tweet))
+        for _ in range(_poisson(rnd, spec.emoji_density)):
+            kind = rnd.choices(kinds, kind_weights)[0]
+            emoji = EMOJI_POOLS[kind][pools[kind].sample() - 1]
+            # Emojis glued to words or to each other as often as standalone
+            position = rnd.randrange(len(tokens) + 1)
+            if position and rnd.random() < 0.5:
+                tokens[position - 1] += emoji
+            else:
+                tokens.insert(position, emoji)
+        content = " ".join(tokens)
+        user = users.sample()
+        mentioned = [
+            {"username": f"user{mentions.sample()}"}
+            for _ in range(_poisson(rnd, spec.mentions_per_tweet))
+        ]
+        username = f"user{user}"
+        yield encoder.encode(
+            {
+                "url": f"https://twitter.com/{username}/status/{tweet_id}",
+                "date": date.isoformat() + "+00:00",
+                "content": content,
+                "renderedContent": content,
+                "id": tweet_id,
+                "user": {"id": user, "username": username},
+                "lang": "en",
+                "mentionedUsers": mentioned or None,
+            }
+        )
+
+
+def _malformed(rnd: random.Random, kind: str) -> bytes:
+    if kind == "schema":
+        return rnd.choice(
+            [
+                b'{"date": "garbage", "user": {"username": null}}',
+                b'{"date": null, "content": 5, "user": "x", "mentionedUsers": "y"}',
+                b'{"date": "2021-02-12T10:00:00+00:00", "user": null}',
+                b"[1, 2, 3]",
+            ]
+        )
+    if kind == "truncated":
+        line = b'{"date": "2021-02-12T10:00:00+00:00", "content": "cut \xf0\x9f\x9a\x9c'
+        return line[: rnd.randint(1, len(line))]
+    if kind == "garbage":
+        return bytes(rnd.randrange(0x20, 0x7F) for _ in range(rnd.randint(1, 80)))
+    raise ValueError(f"Unknown malformed kind: {kind!r}")
+
+
+def write_synthetic(
+    path: str,
+    spec: SyntheticSpec = SyntheticSpec(),
+    target_bytes: int | None = None,
+    n_tweets: int | None = None,
+) -> GenerationStats:
+    """
+    Streams lines to path until target_bytes or n_tweets lines (counting malformed
+    ones) are written. Memory stays at one write block whatever the file size.
+    """
+    if target_bytes is None and n_tweets is None:
+        raise ValueError("target_bytes or n_tweets is required")
+    stats, block, block_bytes = GenerationStats(), [], 0
+    with open(path, "wb") as f:
+        for line in generate_lines(spec):
+            if (
+                n_tweets is not None and stats.tweets + stats.malformed >= n_tweets
+            ) or (target_bytes is not None and stats.bytes >= target_bytes):
+                break
+            block.append(line)
+            block_bytes += len(line) + 1
+            stats.bytes += len(line) + 1
+            if line.startswith(b'{"url"'):
+                stats.tweets += 1
+            else:
+                stats.malformed += 1
+            if block_bytes >= WRITE_BLOCK_BYTES:
+                f.write(b"\n".join(block) + b"\n")
+                block, block_bytes = [], 0
+        if block:
+            f.write(b"\n".join(block) + b"\n")
+    assert stats.bytes == os.path.getsize(path)
+    return stats
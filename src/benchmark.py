@@ -7,7 +7,10 @@ import emoji
 import pstats
 import orjson
 import cProfile
+import tempfile
 import functools
+import statistics
+import subprocess
 import unicodedata
 import polars as pl
 from collections import Counter
@@ -17,14 +20,21 @@ from memory_profiler import memory_usage
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Import all functions
+from src.common.utils import read_msgspec, tweet_decoder, content_decoder
+from src.common.emoji_tokenizer import tokenize, tokenize_many
 from src.q1_time import q1_time
 from src.q1_memory import q1_memory
 from src.q2_time import q2_time
 from src.q2_memory import q2_memory
 from src.q3_time import q3_time
 from src.q3_memory import q3_memory
+from src.bench.runner import DEFAULT_DATA_DIR, run_once
+from src.bench.datasets import COMPRESSIONS, ensure_compressed
 
-file_path = "farmers-protest-tweets-2021-2-4.json"
+# Dataset configurable: el real o uno sintético de src.bench (python -m src.bench)
+file_path = os.environ.get("BENCHMARK_FILE", "farmers-protest-tweets-2021-2-4.json")
+# Prefijo gs://bucket/carpeta/ para medir también la lectura desde GCS (opcional)
+gcs_prefix = os.environ.get("BENCHMARK_GCS_PREFIX")
 output_file = "src/benchmark_results.txt"
 
 twitter_schema = {
@@ -727,6 +737,318 @@ def run_lab(f_handle=None):
 # --- NUEVA SECCIÓN DE BENCHMARK FINAL ---
 
 
+def q1_memory_single_pass(file_path: str):
+    """Variante de una sola lectura de q1_memory (contadores por fecha y usuario)."""
+    return q1_memory(file_path, single_pass=True)
+
+
+def run_engine_comparison(f_handle):
+    """
+    Motor in-memory vs streaming de polars para q*_time y run_all (strategy=time).
+    Cada corrida usa un intérprete nuevo: el pico de RSS incluye las páginas del
+    archivo mapeado (recuperables), el pico anónimo es la memoria del motor.
+    """
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== POLARS ENGINE (in-memory vs streaming) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    for target in ["q1_time", "q2_time", "q3_time", "run_all_time"]:
+        for engine, name in [
+            ("in-memory", target),
+            ("streaming", f"{target}_streaming"),
+        ]:
+            try:
+                sample = run_once(name, file_path)
+                f_handle.write(
+                    f"{target} engine={engine}: {sample['time_s']:.4f} s, "
+                    f"peak RSS {sample['peak_rss_mb']:.2f} MB, "
+                    f"peak anon {sample['peak_anon_mb'] or 0:.2f} MB\n"
+                )
+            except Exception as e:
+                f_handle.write(f"Error in {target} engine={engine}: {str(e)}\n")
+    f_handle.write("\n")
+
+
+def upload_inputs(paths: list[str], prefix: str) -> list[str]:
+    """Sube cada archivo bajo el prefijo gs:// (una sola vez) y devuelve sus URIs."""
+    from src.common.gcs_client import get_storage_client
+
+    bucket_name, _, folder = prefix[5:].partition("/")
+    bucket = get_storage_client().bucket(bucket_name)
+    uris = []
+    for path in paths:
+        name = f"{folder.rstrip('/')}/{os.path.basename(path)}".lstrip("/")
+        blob = bucket.blob(name)
+        if not blob.exists():
+            blob.upload_from_filename(path)
+        uris.append(f"gs://{bucket_name}/{name}")
+    return uris
+
+
+def run_compression_comparison(f_handle):
+    """
+    Tiempo de punta a punta del archivo plano contra sus copias gzip y zstd, en local
+    y (con BENCHMARK_GCS_PREFIX) desde GCS. Cada corrida usa un intérprete nuevo; la
+    descompresión ocurre en streaming dentro de la misma lectura.
+    """
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== COMPRESSED INPUT (raw vs gzip vs zstd) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    paths = [file_path] + [
+        ensure_compressed(file_path, c, DEFAULT_DATA_DIR) for c in COMPRESSIONS
+    ]
+    inputs = list(zip(["raw", *COMPRESSIONS], paths))
+    for name, path in inputs:
+        f_handle.write(f"{name}: {os.path.getsize(path) / 1e6:.1f} MB\n")
+    if gcs_prefix:
+        uris = upload_inputs(paths, gcs_prefix)
+        inputs += [(f"gcs {name}", uri) for (name, _), uri in zip(inputs, uris)]
+    f_handle.write("\n")
+
+    for target in [
+        "q1_memory",
+        "q2_memory",
+        "q3_memory",
+        "q1_time",
+        "q2_time",
+        "q3_time",
+    ]:
+        for name, path in inputs:
+            try:
+                sample = run_once(target, path)
+                f_handle.write(
+                    f"{target} {name}: {sample['time_s']:.4f} s, "
+                    f"peak anon {sample['peak_anon_mb'] or 0:.2f} MB\n"
+                )
+            except Exception as e:
+                f_handle.write(f"Error in {target} {name}: {str(e)}\n")
+    f_handle.write("\n")
+
+
+def run_parallel_scaling(f_handle):
+    """Escalamiento de q*_memory(workers=N) desde 1 proceso hasta os.cpu_count()."""
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== PARALLEL SCALING (q*_memory, workers=N) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    worker_counts = sorted({1, 2, 4, os.cpu_count() or 1})
+    for name, func in [
+        ("Q1 Memory", q1_memory),
+        ("Q2 Memory", q2_memory),
+        ("Q3 Memory", q3_memory),
+    ]:
+        for workers in worker_counts:
+            log_buffer = io.StringIO()
+            original_stdout = sys.stdout
+            sys.stdout = log_buffer
+            try:
+                peak_mem, duration, _ = profile_performance(func)(
+                    file_path, workers=workers
+                )
+                sys.stdout = original_stdout
+                f_handle.write(
+                    f"{name} workers={workers}: {duration:.4f} s, {peak_mem:.2f} MB\n"
+                )
+            except Exception as e:
+                sys.stdout = original_stdout
+                f_handle.write(f"Error in {name} workers={workers}: {str(e)}\n")
+    f_handle.write("\n")
+
+
+def count_records(file_path: str, use_mmap: bool = False) -> int:
+    """Decodifica todo el archivo con tweet_decoder (mide solo lectura + parsing)."""
+    return sum(
+        1 for _ in read_msgspec(file_path, decoder=tweet_decoder, use_mmap=use_mmap)
+    )
+
+
+def run_reader_comparison(f_handle):
+    """Compara la lectura local línea a línea contra la lectura zero-copy con mmap."""
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== LOCAL READER (file iteration vs mmap) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    for name, use_mmap in [("read_msgspec", False), ("read_msgspec mmap", True)]:
+        log_buffer = io.StringIO()
+        original_stdout = sys.stdout
+        sys.stdout = log_buffer
+        try:
+            peak_mem, duration, rows = profile_performance(count_records)(
+                file_path, use_mmap=use_mmap
+            )
+            sys.stdout = original_stdout
+            f_handle.write(
+                f"{name}: {rows} rows, {duration:.4f} s, {peak_mem:.2f} MB\n"
+            )
+        except Exception as e:
+            sys.stdout = original_stdout
+            f_handle.write(f"Error in {name}: {str(e)}\n")
+    f_handle.write("\n")
+
+
+def count_emojis(file_path: str, extractor: Callable) -> tuple[int, float]:
+    """Etapa de extracción de q2 sobre los contenidos ya decodificados en memoria."""
+    contents = [t.content for t in read_msgspec(file_path, decoder=content_decoder)]
+    t0 = time.perf_counter()
+    tokens = extractor(contents)
+    return len(tokens), time.perf_counter() - t0
+
+
+def run_emoji_tokenizer_comparison(f_handle):
+    """Compara el regex por tweet (q2_memory anterior) contra el tokenizador de emojis."""
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== EMOJI EXTRACTION (regex vs tokenizer) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    legacy_regex = re.compile(
+        r"("
+        r"[\U0001f1e6-\U0001f1ff]{2}|"
+        r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf]"
+        r"(?:[\ufe0f\u200d\U0001f3fb-\U0001f3ff]+"
+        r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf])*"
+        r")"
+    )
+    for name, extractor in [
+        (
+            "re.findall per tweet",
+            lambda cs: [e for c in cs for e in legacy_regex.findall(c)],
+        ),
+        ("tokenize per tweet", lambda cs: [e for c in cs for e in tokenize(c)]),
+        (
+            "tokenize_many (batches of 256)",
+            lambda cs: [
+                e
+                for i in range(0, len(cs), 256)
+                for e in tokenize_many(cs[i : i + 256])
+            ],
+        ),
+    ]:
+        try:
+            tokens, duration = count_emojis(file_path, extractor)
+            f_handle.write(f"{name}: {tokens} emojis, {duration:.4f} s\n")
+        except Exception as e:
+            f_handle.write(f"Error in {name}: {str(e)}\n")
+    f_handle.write("\n")
+
+
+# Presupuesto de cold start (ms, mediana de COLD_START_RUNS intérpretes nuevos)
+COLD_START_BUDGET_MS = {
+    "import_main": 400,
+    "first_response": 1000,
+}
+COLD_START_RUNS = 5
+COLD_START_ROUTES = [("q1", "time"), ("q2", "memory"), ("all", "memory")]
+
+# Script ejecutado en un intérprete nuevo: importa main y responde una consulta
+COLD_START_PROBE = """
+import json, time
+t0 = time.perf_counter()
+import main
+t1 = time.perf_counter()
+class Request:
+    args = {args!r}
+    def get_json(self, silent=True):
+        return None
+_, status = main.entrypoint(Request())
+t2 = time.perf_counter()
+print(json.dumps({{"import_main": (t1 - t0) * 1000,
+                  "first_response": (t2 - t1) * 1000, "status": status}}))
+"""
+
+
+def write_cold_start_sample(path: str, n: int = 1000):
+    """Archivo NDJSON pequeño y determinista: mide el arranque, no el cómputo."""
+    with open(path, "wb") as f:
+        for i in range(n):
+            tweet = {
+                "date": f"2021-02-{i % 28 + 1:02d}T10:00:00+00:00",
+                "content": f"tweet {i} " + "🚜🌾❤"[i % 3],
+                "user": {"id": i % 50, "username": f"user{i % 50}"},
+                "mentionedUsers": [{"username": f"mention{i % 7}"}],
+            }
+            f.write(orjson.dumps(tweet) + b"\n")
+
+
+def import_breakdown(importtime_log: str, top: int = 8) -> list[tuple[str, float]]:
+    """
+    Agrupa la salida de `python -X importtime` por import de primer nivel (ms
+    acumulados): los hijos directos de main y lo que se carga en la primera consulta.
+    """
+    entries, phase = [], "startup"
+    for line in importtime_log.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2][1:]
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth == 0 and name in ("site", "main"):
+            phase = name
+        elif (phase, depth) in (("site", 1), ("main", 0)):
+            entries.append((name.strip(), int(parts[1]) / 1000))
+    return sorted(entries, key=lambda e: e[1], reverse=True)[:top]
+
+
+def measure_cold_start(q: str, strategy: str, sample_path: str) -> dict:
+    """Mediana de COLD_START_RUNS arranques en frío (import + primera respuesta)."""
+    args = {"q": q, "strategy": strategy, "file": sample_path}
+    env = {k: v for k, v in os.environ.items() if not k.startswith("RESULT_CACHE_")}
+    runs, breakdown = [], []
+    for _ in range(COLD_START_RUNS):
+        probe = COLD_START_PROBE.format(args=args)
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", probe],
+            capture_output=True,
+            text=True,
+            env=env,
+            check=True,
+        )
+        runs.append(orjson.loads(proc.stdout.strip().splitlines()[-1]))
+        breakdown = import_breakdown(proc.stderr)
+    return {
+        "import_main": statistics.median(r["import_main"] for r in runs),
+        "first_response": statistics.median(r["first_response"] for r in runs),
+        "status": runs[-1]["status"],
+        "breakdown": breakdown,
+    }
+
+
+def run_cold_start_check(f_handle) -> bool:
+    """Mide el cold start de cada ruta y lo compara contra COLD_START_BUDGET_MS."""
+    f_handle.write("=" * 80 + "\n")
+    f_handle.write("=== COLD START (fresh interpreter, median of runs) ===\n")
+    f_handle.write("=" * 80 + "\n\n")
+
+    within_budget = True
+    with tempfile.TemporaryDirectory() as tmp:
+        sample_path = os.path.join(tmp, "cold_start_sample.json")
+        write_cold_start_sample(sample_path)
+        for q, strategy in COLD_START_ROUTES:
+            try:
+                result = measure_cold_start(q, strategy, sample_path)
+            except Exception as e:
+                f_handle.write(f"Error in {q}/{strategy}: {str(e)}\n")
+                within_budget = False
+                continue
+            checks = {
+                name: result[name] <= budget
+                for name, budget in COLD_START_BUDGET_MS.items()
+            }
+            within_budget &= all(checks.values()) and result["status"] == 200
+            f_handle.write(f"{q}/{strategy} (HTTP {result['status']}):\n")
+            for name, budget in COLD_START_BUDGET_MS.items():
+                verdict = "OK" if checks[name] else "OVER BUDGET"
+                f_handle.write(
+                    f"  > {name}: {result[name]:.1f} ms "
+                    f"(budget {budget} ms) {verdict}\n"
+                )
+            f_handle.write("  > Slowest imports (cumulative ms):\n")
+            for name, ms in result["breakdown"]:
+                f_handle.write(f"      {name}: {ms:.1f}\n")
+    f_handle.write(f"\nCold start within budget: {within_budget}\n\n")
+    return within_budget
+
+
 def run_final_benchmark():
     print("\n[FINAL BENCHMARK] Executing all q* functions with real data")
 
@@ -738,6 +1060,7 @@ def run_final_benchmark():
         funcs = [
             ("Q1 Time", q1_time),
             ("Q1 Memory", q1_memory),
+            ("Q1 Memory (single pass)", q1_memory_single_pass),
             ("Q2 Time", q2_time),
             ("Q2 Memory", q2_memory),
             ("Q3 Time", q3_time),
@@ -771,6 +1094,24 @@ def run_final_benchmark():
                 sys.stdout = original_stdout
                 f.write(f"Error executing {name}: {str(e)}\n\n")
 
+        # Cold start: import time + first response against the budget
+        run_cold_start_check(f)
+
+        # Local reader: line iteration vs zero-copy mmap
+        run_reader_comparison(f)
+
+        # q2 extraction stage: backtracking regex vs emoji tokenizer
+        run_emoji_tokenizer_comparison(f)
+
+        # Parallel byte-range map-reduce for the memory strategies
+        run_parallel_scaling(f)
+
+        # Polars streaming engine against the in-memory one
+        run_engine_comparison(f)
+
+        # Compressed inputs (gzip/zstd) decompressed while reading, local and GCS
+        run_compression_comparison(f)
+
         # Now run the lab comparison and save to the same file
         run_lab(f)
 
@@ -778,6 +1119,9 @@ def run_final_benchmark():
 
 
 if __name__ == "__main__":
+    if "--cold-start" in sys.argv:
+        # Solo el presupuesto de cold start (no necesita el dataset); falla si se excede
+        sys.exit(0 if run_cold_start_check(sys.stdout) else 1)
     if os.path.exists(file_path):
         run_final_benchmark()
     else:
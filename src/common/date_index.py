@@ -0,0 +1,205 @@
+import os
+import threading
+import msgspec
+from itertools import chain, islice
+from collections import Counter
+from collections.abc import Iterable
+from src.common.utils import (
+    BATCH_SIZE,
+    decode_batch,
+    decode_batches,
+    is_compressed,
+    is_multi_input,
+    mmap_lines,
+    not_blank,
+    read_msgspec_batches,
+    tweet_decoder,
+)
+
+# Bump whenever the layout or the meaning of the index changes
+INDEX_VERSION = 1
+
+# Granularity of the index: a date maps to runs of blocks of this many bytes, so the
+# index stays small when dates are interleaved and a rescan reads whole blocks
+INDEX_BLOCK_SIZE = 64 * 1024
+
+# Opt-in default for q1_memory (the sidecar is written next to the source file)
+DATE_INDEX = os.environ.get("DATE_INDEX", "0") == "1"
+
+
+class DateIndex(msgspec.Struct, frozen=True):
+    """
+    Per-date byte-offset index of a local NDJSON file. `counts` holds the tweets per
+    date in first-seen order (the same Counter as a full date scan, ties included)
+    and `blocks` the [first, end) runs of INDEX_BLOCK_SIZE blocks holding the lines
+    that start with each date. Valid only while the source keeps its size and mtime.
+    """
+
+    version: int
+    size: int
+    mtime_ns: int
+    block_size: int
+    counts: dict[str, int]
+    blocks: dict[str, list[tuple[int, int]]]
+
+    def ranges(self, dates: Iterable[str]) -> list[tuple[int, int]]:
+        """Sorted, merged [start, end) byte ranges holding every line of `dates`."""
+        runs = sorted(chain.from_iterable(self.blocks.get(d, ()) for d in dates))
+        merged = []
+        for first, end in runs:
+            if merged and first <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([first, end])
+        return [
+            (first * self.block_size, min(end * self.block_size, self.size))
+            for first, end in merged
+        ]
+
+
+_encoder = msgspec.json.Encoder()
+_decoder = msgspec.json.Decoder(DateIndex)
+
+# In-process tier: warm invocations reuse the decoded index (path -> DateIndex)
+_loaded = {}
+_lock = threading.Lock()
+
+
+def indexable(file_path: str) -> bool:
+    """Byte offsets only make sense for a single, local, uncompressed file."""
+    return (
+        not file_path.startswith("gs://")
+        and not is_multi_input(file_path)
+        and os.path.isfile(file_path)
+        and not is_compressed(file_path)
+    )
+
+
+def sidecar_path(file_path: str) -> str:
+    """Hidden file next to the source, so directory and glob inputs skip it."""
+    head, tail = os.path.split(file_path)
+    return os.path.join(head, f".{tail}.dates.idx")
+
+
+def _is_current(index: DateIndex, stat: os.stat_result) -> bool:
+    return (
+        index.version == INDEX_VERSION
+        and index.size == stat.st_size
+        and index.mtime_ns == stat.st_mtime_ns
+    )
+
+
+def decode_with_offsets(lines: Iterable[memoryview], decoder=tweet_decoder):
+    """
+    Yields (line start offset, record) for every valid line. Batches are decoded
+    with decode_batch like decode_batches: each line is framed as its own element,
+    so a decoded batch holds exactly one record per line and pairs with the
+    offsets; a batch with a corrupt line falls back to line by line.
+    """
+    position = 0
+    lines = iter(lines)
+    while chunk := list(islice(lines, BATCH_SIZE)):
+        starts, kept = [], []
+        for line in chunk:
+            if not_blank(line):
+                starts.append(position)
+                kept.append(line)
+            position += len(line)
+        batch = decode_batch(kept, decoder)
+        if batch is not None:
+            yield from zip(starts, batch)
+            continue
+        for start, line in zip(starts, kept):
+            try:
+                yield start, decoder.decode(line)
+            except msgspec.DecodeError:
+                continue
+
+
+def build_index(file_path: str, block_size: int = INDEX_BLOCK_SIZE) -> DateIndex:
+    """One scan of the file: per-date counts plus the block runs of every date."""
+    stat = os.stat(file_path)
+    counts, blocks = Counter(), {}
+    for start, tweet in decode_with_offsets(mmap_lines(file_path)):
+        date = tweet.date[:10]
+        counts[date] += 1
+        block = start // block_size
+        runs = blocks.setdefault(date, [])
+        if runs and block <= runs[-1][1]:
+            runs[-1][1] = block + 1
+        else:
+            runs.append([block, block + 1])
+    return DateIndex(
+        INDEX_VERSION,
+        stat.st_size,
+        stat.st_mtime_ns,
+        block_size,
+        dict(counts),
+        {date: [tuple(run) for run in runs] for date, runs in blocks.items()},
+    )
+
+
+def save_index(file_path: str, index: DateIndex) -> bool:
+    """Writes the sidecar atomically; False if the directory is not writable."""
+    path = sidecar_path(file_path)
+    with _lock:
+        _loaded[file_path] = index
+    try:
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(_encoder.encode(index))
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        return False
+    return True
+
+
+def load_index(file_path: str) -> DateIndex | None:
+    """
+    Index of the file if one exists and still matches its size and mtime (from
+    this process or from the sidecar), None otherwise.
+    """
+    if not indexable(file_path):
+        return None
+    stat = os.stat(file_path)
+    index = _loaded.get(file_path)
+    if index is not None and _is_current(index, stat):
+        return index
+    try:
+        with open(sidecar_path(file_path), "rb") as f:
+            index = _decoder.decode(f.read())
+    except (OSError, msgspec.DecodeError, msgspec.ValidationError):
+        return None
+    if not _is_current(index, stat):
+        return None
+    with _lock:
+        _loaded[file_path] = index
+    return index
+
+
+def ensure_index(file_path: str) -> tuple[DateIndex | None, str]:
+    """
+    Loads or builds (and saves) the index of a file, for ingest jobs and the first
+    pass of q1_memory. The second value says how: "hit", "built" or "unavailable".
+    """
+    if not indexable(file_path):
+        return None, "unavailable"
+    if (index := load_index(file_path)) is not None:
+        return index, "hit"
+    index = build_index(file_path)
+    save_index(file_path, index)
+    return index, "built"
+
+
+def read_dates(file_path: str, dates: Iterable[str], decoder=tweet_decoder):
+    """
+    Batches of records from the blocks holding `dates`, in file order. Blocks are
+    shared with other dates, so callers still filter by date. Without a current
+    index every line of the file is read.
+    """
+    index = load_index(file_path)
+    if index is None:
+        return read_msgspec_batches(file_path, decoder=decoder)
+    lines = chain.from_iterable(
+        mmap_lines(file_path, a, b) for a, b in index.ranges(dates)
+    )
+    return decode_batches(lines, decoder)
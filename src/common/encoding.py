@@ -0,0 +1,34 @@
+import msgspec
+
+
+def _enc_hook(obj):
+    """Polars frames/series (without importing polars) as rows/lists of values."""
+    module = type(obj).__module__
+    if module.startswith("polars"):
+        if hasattr(obj, "iter_rows"):
+            return obj.rows()
+        if hasattr(obj, "to_list"):
+            return obj.to_list()
+    raise TypeError(f"Cannot encode {type(obj).__name__}")
+
+
+# Dates/datetimes encode natively as ISO 8601, tuples as arrays and Counters as
+# objects, so q* results go to JSON in one C pass without rebuilding every row
+result_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def encode_result(result) -> bytes:
+    """Encodes a q*/run_all result (rows, dict of rows, Counter or frame) as JSON."""
+    return result_encoder.encode(result)
+
+
+def encode_response(payload: dict, encoded_result: bytes) -> bytes:
+    """Encodes a response envelope embedding an already encoded result verbatim."""
+    return result_encoder.encode({**payload, "result": msgspec.Raw(encoded_result)})
+
+
+def join_encoded(parts: dict[str, bytes]) -> bytes:
+    """JSON object whose values are already encoded results (e.g. one per question)."""
+    return result_encoder.encode(
+        {key: msgspec.Raw(data) for key, data in parts.items()}
+    )
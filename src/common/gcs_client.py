@@ -0,0 +1,56 @@
+import os
+import time
+import threading
+from src.common.logger import current_context
+
+# HTTP connections kept per host: covers the concurrent requests of one instance
+# plus the parallel range downloads of a read, so sockets are reused, not reopened
+GCS_POOL_SIZE = int(os.environ.get("GCS_POOL_SIZE", 32))
+
+_client = None
+_lock = threading.Lock()
+
+
+def _reset_after_fork():
+    """A forked worker must not share the parent's sockets: it builds its own client."""
+    global _client, _lock
+    _client = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def build_storage_client(pool_size: int = GCS_POOL_SIZE):
+    """Creates a storage.Client whose HTTP session keeps up to pool_size connections."""
+    from google.cloud import storage
+    from requests.adapters import HTTPAdapter
+
+    client = storage.Client()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    client._http.mount("https://", adapter)
+    return client
+
+
+def get_storage_client():
+    """
+    Process-wide storage client, shared by every warm invocation and thread.
+    Credential discovery and session setup run once (double-checked lock); that
+    setup is reported as the "gcs_client_setup" step of the canonical call in
+    progress, and later calls only flag the client as reused.
+    """
+    global _client
+    ctx = current_context()
+    if _client is None:
+        with _lock:
+            if _client is None:
+                t0 = time.perf_counter()
+                _client = build_storage_client()
+                if ctx:
+                    ctx.add_step(
+                        "gcs_client_setup", round((time.perf_counter() - t0) * 1000, 4)
+                    )
+                return _client
+    if ctx:
+        ctx.add_metric("gcs_client_reused", True)
+    return _client
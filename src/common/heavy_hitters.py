@@ -0,0 +1,108 @@
+import heapq
+from functools import reduce
+from collections import Counter
+from collections.abc import Iterable
+from typing import NamedTuple
+
+# Default number of keys kept by the summary (fixed memory, independent of input size)
+SKETCH_CAPACITY = 4096
+
+
+class Sketch(NamedTuple):
+    """
+    Misra-Gries heavy-hitter summary (the mergeable counterpart of Space-Saving).
+    Every estimate is a lower bound: estimate <= true count <= estimate + error.
+    """
+
+    counts: Counter
+    error: int = 0
+    total: int = 0
+
+
+# Modular Functional Blocks (KISS + Type Hints + Docstrings)
+
+
+def prune(counts: Counter, capacity: int) -> tuple[Counter, int]:
+    """
+    Keeps at most `capacity` keys: subtracts the (capacity + 1)-th largest count from
+    every key and drops the ones that reach zero. Returns the pruned counter and the
+    amount subtracted (added to the error of every estimate).
+    """
+    if len(counts) <= capacity:
+        return counts, 0
+    cut = heapq.nlargest(capacity + 1, counts.values())[-1]
+    return Counter({key: c - cut for key, c in counts.items() if c > cut}), cut
+
+
+def sketch_update(
+    sketch: Sketch, items: Iterable[str], capacity: int = SKETCH_CAPACITY
+) -> Sketch:
+    """
+    Adds a batch of keys to the summary. Pruning runs lazily once the summary holds
+    twice its capacity, so its cost is amortized over many batches; the error bound
+    error <= total / (capacity + 1) holds after every update.
+    """
+    batch = Counter(items)
+    counts = sketch.counts
+    counts.update(batch)
+    cut = 0
+    if len(counts) > 2 * capacity:
+        counts, cut = prune(counts, capacity)
+    return Sketch(counts, sketch.error + cut, sketch.total + batch.total())
+
+
+def sketch_counter(
+    stream: Iterable[list[str]], capacity: int = SKETCH_CAPACITY
+) -> Sketch:
+    """Aggregates a stream of key lists into a bounded-memory summary."""
+    return reduce(
+        lambda acc, items: sketch_update(acc, items, capacity),
+        stream,
+        Sketch(Counter()),
+    )
+
+
+def merge_sketches(
+    sketches: Iterable[Sketch], capacity: int = SKETCH_CAPACITY
+) -> Sketch:
+    """
+    Merges partial summaries (e.g. one per worker) in order: counts and errors add
+    up and the result is pruned back to capacity, keeping the same error bound.
+    """
+
+    def merge(acc: Sketch, sketch: Sketch) -> Sketch:
+        acc.counts.update(sketch.counts)
+        counts, cut = prune(acc.counts, capacity)
+        return Sketch(counts, acc.error + sketch.error + cut, acc.total + sketch.total)
+
+    return reduce(merge, sketches, Sketch(Counter()))
+
+
+def sketch_top_k(sketch: Sketch, k: int) -> list[tuple[str, int]]:
+    """Top k keys by estimated count (ties broken by key, as the exact get_top_k)."""
+    return sorted(sketch.counts.items(), key=lambda x: (-x[1], x[0]))[:k]
+
+
+def sketch_bounds(sketch: Sketch, k: int, capacity: int = SKETCH_CAPACITY) -> dict:
+    """
+    Error bounds of a top k read from the summary, for the canonical log metrics:
+    every returned count may be short by at most `max_count_error`, which never
+    exceeds `error_bound` = total / (capacity + 1). A returned key is guaranteed to
+    belong to the true top k when its estimate beats the (k + 1)-th estimate plus
+    that error; with zero error the whole ranking is exact.
+    """
+    ranked = sketch_top_k(sketch, k + 1)
+    runner_up = ranked[k][1] if len(ranked) > k else 0
+    guaranteed = (
+        len(ranked[:k])
+        if sketch.error == 0
+        else sum(1 for _, c in ranked[:k] if c > runner_up + sketch.error)
+    )
+    return {
+        "sketch_capacity": capacity,
+        "sketch_keys": len(sketch.counts),
+        "stream_items": sketch.total,
+        "max_count_error": sketch.error,
+        "error_bound": sketch.total // (capacity + 1),
+        "guaranteed_top_k": guaranteed,
+    }
@@ -5,7 +5,11 @@ import structlog
 import orjson
 import os
 import psutil
+import threading
+import tracemalloc
+from contextvars import ContextVar
 from typing import Callable, Any
+from src.common.metrics import REGISTRY
 
 
 # Configure structlog for high performance with orjson
@@ -21,29 +25,154 @@ structlog.configure(
 logger = structlog.get_logger()
 
 
+# Background RSS sampling period in ms (0 = off: no thread, no overhead)
+MEMORY_SAMPLE_INTERVAL_MS = float(os.environ.get("MEMORY_SAMPLE_INTERVAL_MS", 0))
+
+# Top allocation sites reported per step with tracemalloc (0 = off, it is costly)
+MEMORY_TRACE_TOP = int(os.environ.get("MEMORY_TRACE_TOP", 0))
+
+
+@functools.cache
+def _process(pid: int) -> psutil.Process:
+    """psutil handle of the current process, built once per pid (fork safe)."""
+    return psutil.Process(pid)
+
+
 def get_memory_usage_mb() -> float:
     """Returns the current process memory usage (RSS) in MB using psutil."""
-    process = psutil.Process(os.getpid())
-    return round(process.memory_info().rss / (1024 * 1024), 2)
+    return round(_process(os.getpid()).memory_info().rss / (1024 * 1024), 2)
+
+
+class RssSampler:
+    """
+    Samples RSS from a daemon thread every interval_ms. Tracks the peak of the
+    whole call and the peak of the current window, which add_step closes, so each
+    step reports the highest RSS seen since the previous step ended.
+    """
+
+    def __init__(self, interval_ms: float):
+        self.interval = interval_ms / 1000
+        self.peak = self.window_peak = get_memory_usage_mb()
+        self.samples = 1
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def sample(self) -> float:
+        current = get_memory_usage_mb()
+        with self._lock:
+            self.samples += 1
+            self.peak = max(self.peak, current)
+            self.window_peak = max(self.window_peak, current)
+        return current
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def close_window(self, current: float) -> float:
+        """Returns the peak of the window ending now and starts the next one."""
+        with self._lock:
+            self.peak = max(self.peak, current)
+            window_peak = max(self.window_peak, current)
+            self.window_peak = current
+        return window_peak
+
+    def stop(self) -> float:
+        """Stops the thread and returns the peak RSS of the whole call."""
+        self._stop.set()
+        self._thread.join()
+        self.sample()
+        return self.peak
+
+
+# Tracers of the canonical calls in progress (nested calls stack up). tracemalloc
+# keeps a single peak counter, so its value is folded into every open window before
+# any reset; otherwise an inner call would erase the outer step's peak
+_active_tracers: list["AllocationTracer"] = []
+_tracers_lock = threading.Lock()
+
+
+def _reset_traced_peak():
+    """Folds the traced peak into every open window, then resets the counter."""
+    with _tracers_lock:
+        _, peak = tracemalloc.get_traced_memory()
+        for tracer in _active_tracers:
+            tracer.window_peak = max(tracer.window_peak, peak)
+        tracemalloc.reset_peak()
+
+
+class AllocationTracer:
+    """
+    tracemalloc mode: per step, the traced peak and the top_n source lines that
+    grew the most since the previous step. Starts tracemalloc if it is off and
+    stops it at the end only in that case. Nested calls share the tracing: each
+    keeps its own window peak, so an inner call never hides an outer step's peak.
+    """
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+        self.owner = not tracemalloc.is_tracing()
+        if self.owner:
+            tracemalloc.start()
+        self.peak = self.window_peak = 0
+        _reset_traced_peak()
+        with _tracers_lock:
+            _active_tracers.append(self)
+        self.snapshot = tracemalloc.take_snapshot()
+
+    def close_window(self) -> dict:
+        snapshot = tracemalloc.take_snapshot()
+        top = snapshot.compare_to(self.snapshot, "lineno")[: self.top_n]
+        _reset_traced_peak()
+        peak, self.window_peak = self.window_peak, 0
+        self.peak = max(self.peak, peak)
+        self.snapshot = snapshot
+        return {
+            "traced_peak_mb": round(peak / (1024 * 1024), 2),
+            "top_allocations": [
+                {
+                    "site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in top
+            ],
+        }
+
+    def stop(self) -> float:
+        """Returns the traced peak of the whole call and releases tracemalloc."""
+        with _tracers_lock:
+            _, peak = tracemalloc.get_traced_memory()
+            _active_tracers.remove(self)
+        if self.owner:
+            tracemalloc.stop()
+        return round(max(self.peak, self.window_peak, peak) / (1024 * 1024), 2)
 
 
 class WideEventContext:
     """Accumulates context, metrics, and errors for a Wide Event."""
 
-    def __init__(self):
+    def __init__(
+        self, sampler: RssSampler | None = None, tracer: AllocationTracer | None = None
+    ):
         self.steps = {}
         self.metrics = {}
         self.extra_context = {}
         self.errors = []
+        self.sampler = sampler
+        self.tracer = tracer
 
     def add_step(self, name: str, duration_ms: float, **metadata):
         # Capture current memory at the end of the step
         current_mem = get_memory_usage_mb()
-        self.steps[name] = {
-            "duration_ms": duration_ms,
-            "memory_mb": current_mem,
-            **metadata,
-        }
+        step = {"duration_ms": duration_ms, "memory_mb": current_mem}
+        if self.sampler:
+            step["peak_memory_mb"] = self.sampler.close_window(current_mem)
+        if self.tracer:
+            step.update(self.tracer.close_window())
+        self.steps[name] = {**step, **metadata}
 
     def add_metric(self, name: str, value: Any):
         self.metrics[name] = value
@@ -64,23 +193,54 @@ class WideEventContext:
         )
 
 
-def canonical_logger(event_name: str):
+# Context of the innermost canonical_logger call running in this thread/task
+_current_ctx: ContextVar["WideEventContext | None"] = ContextVar(
+    "wide_event_context", default=None
+)
+
+
+def current_context() -> "WideEventContext | None":
+    """
+    Returns the WideEventContext of the canonical call in progress (None outside
+    one), so shared helpers can report steps without threading `ctx` through.
+    """
+    return _current_ctx.get()
+
+
+def canonical_logger(
+    event_name: str,
+    sample_interval_ms: float | None = None,
+    trace_top: int | None = None,
+):
     """
     Decorator for Canonical Logging (Wide Events) using structlog.
     Injects a 'ctx' object into the function to accumulate metadata.
     Emits ONE single structured JSON log event upon completion with time and memory.
+    With sample_interval_ms > 0 a background sampler adds the peak RSS of the call
+    and of each step; with trace_top > 0 tracemalloc adds the top allocation sites
+    per step. Both default to MEMORY_SAMPLE_INTERVAL_MS / MEMORY_TRACE_TOP.
     """
 
     def decorator(func: Callable):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            ctx = WideEventContext()
+            interval = (
+                MEMORY_SAMPLE_INTERVAL_MS
+                if sample_interval_ms is None
+                else sample_interval_ms
+            )
+            top = MEMORY_TRACE_TOP if trace_top is None else trace_top
+            ctx = WideEventContext(
+                sampler=RssSampler(interval) if interval > 0 else None,
+                tracer=AllocationTracer(top) if top > 0 else None,
+            )
             start_time = time.perf_counter()
             start_mem = get_memory_usage_mb()
             status = "success"
             error_reason = None
             stack_trace = None
             result = None
+            token = _current_ctx.set(ctx)
 
             try:
                 result = func(*args, ctx=ctx, **kwargs)
@@ -91,19 +251,26 @@ def canonical_logger(event_name: str):
                 stack_trace = traceback.format_exc()
                 raise e
             finally:
+                _current_ctx.reset(token)
                 end_time = time.perf_counter()
                 end_mem = get_memory_usage_mb()
                 total_duration_ms = round((end_time - start_time) * 1000, 2)
+                memory_usage = {
+                    "start_mb": start_mem,
+                    "end_mb": end_mem,
+                    "delta_mb": round(end_mem - start_mem, 2),
+                }
+                if ctx.sampler:
+                    memory_usage["peak_mb"] = ctx.sampler.stop()
+                    memory_usage["samples"] = ctx.sampler.samples
+                if ctx.tracer:
+                    memory_usage["traced_peak_mb"] = ctx.tracer.stop()
 
                 log_data = {
                     "event": event_name,
                     "status": status,
                     "total_duration_ms": total_duration_ms,
-                    "memory_usage": {
-                        "start_mb": start_mem,
-                        "end_mb": end_mem,
-                        "delta_mb": round(end_mem - start_mem, 2),
-                    },
+                    "memory_usage": memory_usage,
                     "context": {
                         "function": func.__name__,
                         **ctx.extra_context,
@@ -115,6 +282,12 @@ def canonical_logger(event_name: str):
                 if ctx.errors:
                     log_data["non_fatal_errors"] = ctx.errors
 
+                # Aggregate into the /metrics histograms (never breaks the call)
+                try:
+                    REGISTRY.record_event(log_data)
+                except Exception as e:
+                    log_data["metrics_error"] = str(e)
+
                 if status == "failure":
                     log_data["failure_reason"] = error_reason
                     log_data["stack_trace"] = stack_trace
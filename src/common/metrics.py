@@ -0,0 +1,162 @@
+import os
+import bisect
+import threading
+
+# Prometheus text exposition format served by the /metrics route
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120,
+)  # fmt: skip
+MEMORY_BUCKETS = tuple(2**i * 1024 * 1024 for i in range(4, 14))  # 16MB .. 8GB
+THROUGHPUT_BUCKETS = tuple(2**i * 1_000_000 for i in range(11))  # 1MB/s .. 1GB/s
+
+HISTOGRAMS = {
+    "canonical_event_duration_seconds": (
+        "Total duration of each canonical_logger call.",
+        DURATION_BUCKETS,
+    ),
+    "canonical_step_duration_seconds": (
+        "Duration of each step reported with ctx.add_step.",
+        DURATION_BUCKETS,
+    ),
+    "canonical_peak_memory_bytes": (
+        "Peak RSS of each call (sampled peak when enabled, else end RSS).",
+        MEMORY_BUCKETS,
+    ),
+    "canonical_throughput_bytes_per_second": (
+        "Input bytes processed per second by each successful call.",
+        THROUGHPUT_BUCKETS,
+    ),
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics), safe across threads."""
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> tuple[list[int], float, int]:
+        """Cumulative counts per bucket (+Inf last), sum and count."""
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        cumulative = [sum(counts[: i + 1]) for i in range(len(counts))]
+        return cumulative, total, count
+
+    def quantile(self, q: float) -> float:
+        """Estimates a quantile by linear interpolation inside the bucket, like
+        Prometheus' histogram_quantile (values past the last bucket clamp to it)."""
+        cumulative, _, count = self.snapshot()
+        if count == 0:
+            return float("nan")
+        rank = q * count
+        i = bisect.bisect_left(cumulative, rank)
+        if i >= len(self.buckets):
+            return self.buckets[-1]
+        lower = self.buckets[i - 1] if i > 0 else 0.0
+        below = cumulative[i - 1] if i > 0 else 0
+        in_bucket = cumulative[i] - below
+        return lower + (self.buckets[i] - lower) * (rank - below) / in_bucket
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in labels]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _input_bytes(file_path) -> int | None:
+    """Size of a local input, summed over its files (None for gs:// or missing)."""
+    try:
+        if os.path.isfile(file_path):
+            return os.path.getsize(file_path)
+        if file_path.startswith("gs://"):
+            return None
+        from src.common.utils import input_objects
+
+        return sum(size for _, size, _ in input_objects(file_path))
+    except (OSError, TypeError, AttributeError):
+        return None
+
+
+class MetricsRegistry:
+    """In-process histograms keyed by (metric name, labels)."""
+
+    def __init__(self):
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(
+                    key, Histogram(HISTOGRAMS[name][1])
+                )
+        histogram.observe(value)
+
+    def get(self, name: str, **labels) -> Histogram | None:
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def record_event(self, log_data: dict):
+        """Feeds the histograms from one wide event built by canonical_logger."""
+        event, status = log_data["event"], log_data["status"]
+        seconds = log_data["total_duration_ms"] / 1000
+        self.observe(
+            "canonical_event_duration_seconds", seconds, event=event, status=status
+        )
+        for step, info in log_data["steps"].items():
+            self.observe(
+                "canonical_step_duration_seconds",
+                info["duration_ms"] / 1000,
+                event=event,
+                step=step,
+            )
+        memory = log_data["memory_usage"]
+        peak_mb = memory.get("peak_mb", memory["end_mb"])
+        self.observe("canonical_peak_memory_bytes", peak_mb * 1024 * 1024, event=event)
+
+        input_bytes = _input_bytes(log_data["context"].get("file_path"))
+        if status == "success" and input_bytes and seconds > 0:
+            self.observe(
+                "canonical_throughput_bytes_per_second",
+                input_bytes / seconds,
+                event=event,
+            )
+
+    def render(self) -> str:
+        """All histograms in Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self.histograms.items(), key=lambda item: item[0])
+        lines, described = [], set()
+        for (name, labels), histogram in items:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {HISTOGRAMS[name][0]}")
+                lines.append(f"# TYPE {name} histogram")
+            cumulative, total, count = histogram.snapshot()
+            bounds = [repr(float(b)) for b in histogram.buckets] + ["+Inf"]
+            for le, c in zip(bounds, cumulative):
+                lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {c}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+
+# Shared by every canonical_logger call of the process
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import threading
+import orjson
+from collections import OrderedDict
+from collections.abc import Callable
+from src.common.logger import canonical_logger
+from src.common.single_flight import SingleFlight
+
+# Entries kept in the in-process tier before evicting the least recently used
+CACHE_MAX_ENTRIES = 128
+
+# Prefix of the persisted entries inside the persistent tier's store
+CACHE_PREFIX = "cache/"
+
+
+def object_version(file_path: str) -> str:
+    """
+    Version of an immutable input: the object generation in GCS, mtime+size for a
+    local file. A rewritten object gets a new version, so stale entries never match.
+    A multi-file input (directory, glob, prefix) hashes the versions of its files, so
+    adding, removing or rewriting any of them changes it.
+    """
+    from src.common.utils import input_objects, is_multi_input
+
+    if is_multi_input(file_path):
+        return cache_key(*input_objects(file_path))
+    if file_path.startswith("gs://"):
+        from src.common.utils import _get_gcs_blob
+
+        blob = _get_gcs_blob(file_path)
+        blob.reload()
+        return str(blob.generation)
+    stat = os.stat(file_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def cache_key(*parts) -> str:
+    """Stable key (also a valid object name) for a question/strategy/path/version."""
+    return hashlib.sha256(orjson.dumps(parts)).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of encoded (JSON bytes) results. The first tier is an in-process
+    LRU bounded by max_entries; the optional persistent tier is any state store
+    (GCSStateStore, LocalStateStore) and survives cold starts. `flights` coalesces
+    concurrent misses of the same key into one computation.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, persistent=None):
+        self.max_entries = max_entries
+        self.persistent = persistent
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.flights = SingleFlight()
+        self._lock = threading.Lock()
+
+    def _remember(self, key: str, value: bytes):
+        with self._lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def get(self, key: str) -> tuple[str | None, bytes | None]:
+        """Returns (tier, value): tier is "memory", "persistent" or None on a miss."""
+        with self._lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return "memory", self.entries[key]
+
+        data = None
+        if self.persistent is not None:
+            data, _ = self.persistent.read(f"{CACHE_PREFIX}{key}.json")
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None, None
+            self.hits += 1
+        self._remember(key, data)
+        return "persistent", data
+
+    def peek(self, key: str) -> bytes | None:
+        """In-process value for key (None if absent), without touching the stats."""
+        with self._lock:
+            return self.entries.get(key)
+
+    def put(self, key: str, value: bytes):
+        """Stores a result in both tiers (entries are immutable, last write wins)."""
+        self._remember(key, value)
+        if self.persistent is not None:
+            self.persistent.write(f"{CACHE_PREFIX}{key}.json", value)
+
+    def clear(self):
+        """Drops the in-process tier and resets the counters."""
+        with self._lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+
+@canonical_logger(event_name="cached_query")
+def cached_call(
+    cache: ResultCache, key_parts: tuple, compute: Callable[[], bytes], ctx=None
+) -> bytes:
+    """
+    Returns the cached result for key_parts or computes, stores and returns it.
+    compute must return the encoded result (JSON bytes), which is what is stored.
+    Concurrent misses of the same key run compute once: the other callers wait
+    for it and are served as the "coalesced" tier.
+    """
+    key = cache_key(*key_parts)
+    tier, value = cache.get(key)
+    followers = 0
+    if tier is None:
+
+        def compute_and_store():
+            # A flight that just finished has already stored the value
+            value = cache.peek(key)
+            if value is None:
+                value = compute()
+                cache.put(key, value)
+            return value
+
+        value, shared, followers = cache.flights.do(key, compute_and_store)
+        tier = "coalesced" if shared else None
+
+    if ctx:
+        ctx.add_context(cache_key=key, key_parts=list(key_parts))
+        ctx.add_metric("cache_tier", tier or "miss")
+        ctx.add_metric("coalesced_callers", followers)
+        ctx.add_metric("cache_hits", cache.hits)
+        ctx.add_metric("cache_misses", cache.misses)
+        ctx.add_metric("cache_entries", len(cache.entries))
+    return value
@@ -0,0 +1,64 @@
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+from typing import NamedTuple
+
+
+class FlightResult(NamedTuple):
+    """Outcome of SingleFlight.do: the value, whether it came from another caller's
+    execution, and (for the caller that ran it) how many callers attached."""
+
+    value: object
+    shared: bool
+    followers: int = 0
+
+
+class _Flight:
+    __slots__ = ("future", "followers")
+
+    def __init__(self):
+        self.future = Future()
+        self.followers = 0
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, callers arriving while it runs wait for and share its result (or
+    its exception). Nothing is kept once the call completes.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def in_flight(self, key: str) -> Future | None:
+        """Future of the running call for key, or None if nobody is computing it."""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                return None
+            flight.followers += 1
+            return flight.future
+
+    def do(self, key: str, fn: Callable[[], object]) -> FlightResult:
+        """Runs fn once per key among concurrent callers and shares the result."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+
+        if not leader:
+            return FlightResult(flight.future.result(), True)
+
+        try:
+            flight.future.set_result(fn())
+        except BaseException as e:
+            flight.future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._flights[key]
+        return FlightResult(flight.future.result(), False, flight.followers)
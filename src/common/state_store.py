@@ -0,0 +1,110 @@
+import os
+import threading
+
+
+class StateConflict(Exception):
+    """Raised when a conditional write loses the race against another writer."""
+
+
+# Generation of an object that does not exist yet (same convention as GCS)
+MISSING = 0
+
+
+class GCSStateStore:
+    """
+    State objects in a GCS bucket. Writes are conditional on the generation read
+    (if_generation_match), so concurrent invocations never overwrite each other.
+    """
+
+    def __init__(self, bucket_name: str, client=None):
+        from src.common.gcs_client import get_storage_client
+
+        self.bucket = (client or get_storage_client()).bucket(bucket_name)
+
+    def read(self, name: str) -> tuple[bytes | None, int]:
+        """Returns the object's bytes and generation (None, MISSING if absent)."""
+        from google.api_core.exceptions import NotFound
+
+        blob = self.bucket.blob(name)
+        try:
+            data = blob.download_as_bytes()
+        except NotFound:
+            return None, MISSING
+        return data, blob.generation
+
+    def write(self, name: str, data: bytes, if_generation_match: int | None = None):
+        """Uploads data; with if_generation_match only if nobody wrote in between."""
+        from google.api_core.exceptions import PreconditionFailed
+
+        try:
+            self.bucket.blob(name).upload_from_string(
+                data,
+                content_type="application/json",
+                if_generation_match=if_generation_match,
+            )
+        except PreconditionFailed as e:
+            raise StateConflict(name) from e
+
+    def delete(self, name: str):
+        """Deletes an object, ignoring it if it is already gone."""
+        from google.api_core.exceptions import NotFound
+
+        try:
+            self.bucket.blob(name).delete()
+        except NotFound:
+            pass
+
+
+class LocalStateStore:
+    """
+    Filesystem stand-in for the bucket (local runs and tests). Each file keeps its
+    generation in a `.generation` sidecar, bumped on every write; conditional writes
+    are serialized with a lock, which protects threads of one process only.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def _generation(self, path: str) -> int:
+        try:
+            with open(f"{path}.generation") as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return MISSING
+
+    def read(self, name: str) -> tuple[bytes | None, int]:
+        """Returns the file's bytes and generation (None, MISSING if absent)."""
+        path = self._path(name)
+        with self._lock:
+            generation = self._generation(path)
+            if generation == MISSING:
+                return None, MISSING
+            with open(path, "rb") as f:
+                return f.read(), generation
+
+    def write(self, name: str, data: bytes, if_generation_match: int | None = None):
+        """Writes the file and bumps its generation, optionally conditional."""
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            generation = self._generation(path)
+            if if_generation_match is not None and generation != if_generation_match:
+                raise StateConflict(name)
+            with open(path, "wb") as f:
+                f.write(data)
+            with open(f"{path}.generation", "w") as f:
+                f.write(str(generation + 1))
+
+    def delete(self, name: str):
+        """Deletes a file, ignoring it if it is already gone."""
+        path = self._path(name)
+        with self._lock:
+            for target in (path, f"{path}.generation"):
+                try:
+                    os.remove(target)
+                except FileNotFoundError:
+                    pass
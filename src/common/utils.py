@@ -1,25 +1,57 @@
-import msgspec
-import polars as pl
-from collections.abc import Iterable
 import io
+import os
+import mmap
+import contextlib
+import msgspec
+from functools import cache, lru_cache, partial, reduce
+from itertools import chain, islice
+from collections import Counter
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
 
 
 # --- 1. ESQUEMA EXPLÍCITO (Optimización Polars) ---
 
-twitter_schema = {
-    "id": pl.Int64,
-    "date": pl.String,
-    "content": pl.String,
-    "user": pl.Struct([pl.Field("id", pl.Int64), pl.Field("username", pl.String)]),
-    "mentionedUsers": pl.List(pl.Struct([pl.Field("username", pl.String)])),
-}
+
+@cache
+def twitter_schema() -> dict:
+    """
+    Esquema explícito para Polars. Se construye al primer uso: importar polars
+    cuesta ~150ms y las rutas de memoria (msgspec) no lo necesitan.
+    """
+    import polars as pl
+
+    return {
+        "id": pl.Int64,
+        "date": pl.String,
+        "content": pl.String,
+        "user": pl.Struct([pl.Field("id", pl.Int64), pl.Field("username", pl.String)]),
+        "mentionedUsers": pl.List(pl.Struct([pl.Field("username", pl.String)])),
+    }
 
 
 def read_polars(file_path: str):
     """
-    Lee archivos NDJSON usando Polars Lazy. Soporta local y GCS (gs://).
+    Lee archivos NDJSON usando Polars Lazy. Soporta local y GCS (gs://), y entradas
+    múltiples (directorio, glob o prefijo): un solo scan sobre todos los archivos, así
+    el plan se arma una vez y polars reparte los archivos entre sus threads.
+    Los archivos gzip/zstd se leen con scan_compressed_ndjson (descompresión en
+    streaming por bloques) y se concatenan al resto en el orden de la entrada.
     """
-    return pl.scan_ndjson(file_path, schema=twitter_schema, ignore_errors=True)
+    import polars as pl
+
+    paths = expand_inputs(file_path)
+    if any(map(is_compressed, paths)):
+        return pl.concat(
+            [
+                scan_compressed_ndjson(path)
+                if is_compressed(path)
+                else pl.scan_ndjson(path, schema=twitter_schema(), ignore_errors=True)
+                for path in paths
+            ]
+        )
+    source = paths[0] if len(paths) == 1 else paths
+    return pl.scan_ndjson(source, schema=twitter_schema(), ignore_errors=True)
 
 
 # --- 2. MSGSPEC STRUCTS (Optimización Memoria/Streaming) ---
@@ -46,22 +78,38 @@ class MentionTweet(msgspec.Struct):
     mentionedUsers: list[Mention] | None
 
 
+class FusedUser(msgspec.Struct):
+    username: str | None = None
+
+
+class FusedMention(msgspec.Struct):
+    username: str | None = None
+
+
+class FusedTweet(msgspec.Struct):
+    """Vista combinada (q1 + q2 + q3) para resolver todo en una sola lectura."""
+
+    date: str | None = None
+    user: FusedUser | None = None
+    content: str | None = None
+    mentionedUsers: list[FusedMention] | None = None
+
+
 # Decodificadores pre-compilados (Performance)
 tweet_decoder = msgspec.json.Decoder(Tweet)
 content_decoder = msgspec.json.Decoder(ContentTweet)
 mention_decoder = msgspec.json.Decoder(MentionTweet)
+fused_decoder = msgspec.json.Decoder(FusedTweet)
 
 
 def _get_gcs_blob(file_path: str):
-    """Auxiliar para obtener el blob de GCS."""
-    from google.cloud import storage
+    """Auxiliar para obtener el blob de GCS (con el cliente compartido del proceso)."""
+    from src.common.gcs_client import get_storage_client
 
     path_parts = file_path.replace("gs://", "").split("/")
     bucket_name = path_parts[0]
     blob_name = "/".join(path_parts[1:])
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    return bucket.blob(blob_name)
+    return get_storage_client().bucket(bucket_name).blob(blob_name)
 
 
 def read_orjson(file_path: str) -> Iterable[dict]:
@@ -72,29 +120,722 @@ def read_orjson(file_path: str) -> Iterable[dict]:
     yield from read_msgspec(file_path, decoder=None)
 
 
-def read_msgspec(file_path: str, decoder=None) -> Iterable:
+# Tamaño de cada rango descargado de GCS (memoria acotada por lectura)
+GCS_BUFFER_SIZE = 8 * 1024 * 1024
+
+
+def split_lines(chunks: Iterable[bytes]) -> Iterable[bytes]:
+    """
+    Reconstruye líneas completas a partir de bloques de bytes arbitrarios.
+    La línea cortada al final de un bloque se conserva y se completa con el siguiente.
+    """
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        start = 0
+        while (end := buffer.find(b"\n", start)) != -1:
+            yield bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+    if buffer:
+        yield bytes(buffer)
+
+
+def gcs_chunk_reader(
+    file_path: str, buffer_size: int = GCS_BUFFER_SIZE
+) -> Iterable[bytes]:
+    """
+    Descarga un objeto de GCS por rangos de buffer_size bytes, sin cargarlo entero.
+    Un objeto gzip/zstd se descomprime mientras llega, en bloques de buffer_size bytes.
+    """
+    blob = _get_gcs_blob(file_path)
+    with blob.open("rb", chunk_size=buffer_size) as reader:
+        yield from decompress_chunks(
+            iter(lambda: reader.read(buffer_size), b""), buffer_size
+        )
+
+
+# Cada cuántos bytes consumidos se liberan las páginas del mapeo (RSS acotado)
+MMAP_RELEASE_SIZE = 8 * 1024 * 1024
+
+
+def mmap_lines(
+    file_path: str, start: int = 0, end: int | None = None
+) -> Iterable[memoryview]:
+    """
+    Generador zero-copy de líneas de un archivo local: mapea el archivo (mmap) y entrega
+    cada línea que empieza en [start, end) como un memoryview sobre el mapeo, sin crear
+    un bytes por línea. Si start cae a mitad de una línea, esa línea se omite (empieza
+    antes del rango) y la lectura parte en la siguiente. Las páginas viven en el page
+    cache del SO, compartido entre procesos que leen el mismo archivo; las ya
+    consumidas se liberan del proceso con madvise para que el RSS no crezca con el
+    tamaño del archivo.
+    Cada vista es válida solo durante la iteración: decodificar, no retener.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if start >= end:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    can_release = hasattr(mmap, "MADV_DONTNEED")
+    view = memoryview(mm)
+    try:
+        # Alinea el inicio a la siguiente línea (rangos por bloques, ver date_index)
+        if start and mm[start - 1] != ord("\n"):
+            newline = mm.find(b"\n", start, end)
+            start = end if newline == -1 else newline + 1
+        released = start - start % mmap.PAGESIZE
+        position = start
+        while position < end:
+            newline = mm.find(b"\n", position, size)
+            stop = size if newline == -1 else newline + 1
+            yield view[position:stop]
+            position = stop
+            if can_release and position - released >= MMAP_RELEASE_SIZE:
+                cut = position - position % mmap.PAGESIZE
+                mm.madvise(mmap.MADV_DONTNEED, released, cut - released)
+                released = cut
+    finally:
+        view.release()
+        # Si el consumidor aún retiene una vista, el GC cerrará el mapeo después
+        with contextlib.suppress(BufferError):
+            mm.close()
+
+
+def read_lines(
+    file_path: str, buffer_size: int = GCS_BUFFER_SIZE, use_mmap: bool = False
+) -> Iterable[bytes]:
+    """
+    Generador de líneas crudas (bytes) de un archivo JSONL. Soporta local y GCS (gs://).
+    En GCS se hace streaming por bloques: el pico de RAM no depende del tamaño del objeto.
+    Con use_mmap=True los archivos locales se leen sin copia (memoryview, ver mmap_lines).
+    Las entradas múltiples (ver expand_inputs) se leen archivo tras archivo.
+    Los archivos gzip/zstd se descomprimen en streaming (ver decompressed).
+    """
+    if is_multi_input(file_path):
+        for path in expand_inputs(file_path):
+            yield from read_lines(path, buffer_size, use_mmap)
+        return
+
+    if file_path.startswith("gs://"):
+        yield from split_lines(gcs_chunk_reader(file_path, buffer_size))
+        return
+
+    if use_mmap and not is_compressed(file_path):
+        yield from mmap_lines(file_path)
+        return
+
+    with open(file_path, "rb") as raw, decompressed(raw) as file_obj:
+        yield from file_obj
+
+
+def read_msgspec(
+    file_path: str,
+    decoder=None,
+    buffer_size: int = GCS_BUFFER_SIZE,
+    use_mmap: bool = False,
+) -> Iterable:
     """
     Generador que lee archivos JSONL línea a línea usando msgspec para validación ultra-rápida.
     Si decoder es None, usa msgspec para cargar un dict genérico.
+    buffer_size controla el tamaño de cada bloque descargado desde GCS y use_mmap
+    activa la lectura local zero-copy.
     """
     if decoder is None:
         # Cargador de dict genérico ultra-rápido
         decoder = msgspec.json.Decoder()
 
+    yield from decode_lines(read_lines(file_path, buffer_size, use_mmap), decoder)
+
+
+def decode_lines(lines: Iterable[bytes], decoder) -> Iterable:
+    """Decodifica cada línea con el decoder dado, omitiendo las líneas corruptas."""
+    for line in lines:
+        try:
+            yield decoder.decode(line)
+        except msgspec.DecodeError:
+            continue
+
+
+# Líneas por lote: amortiza el costo Python por registro y el lote unido (~200 KB)
+# sigue cabiendo en caché; lotes más grandes resultaron más lentos en las pruebas
+BATCH_SIZE = 256
+
+
+def not_blank(line: bytes) -> bool:
+    """Las líneas en blanco no son registros (decode_lines también las omite)."""
+    return len(line) > 2 or bool(bytes(line).strip())
+
+
+@cache
+def _framed_decoder(record_type) -> msgspec.json.Decoder:
+    """Decoder de un arreglo de líneas enmarcadas ([registro]) de record_type."""
+    return msgspec.json.Decoder(list[tuple[record_type]])
+
+
+def decode_batch(lines: list, decoder) -> list | None:
+    """
+    Decodifica las líneas (sin líneas en blanco) con una sola llamada, cada una
+    enmarcada como su propio arreglo de un elemento: [[línea 1\n],[línea 2\n]].
+    Un objeto partido en dos líneas queda cortado por el marco (y un string no puede
+    cruzarlo, por el salto de línea) y una línea con dos valores no cabe en la tupla
+    de un elemento; en esos casos, o si el número de marcos no coincide con el de
+    líneas, retorna None para que el lote se decodifique línea a línea.
+    """
+    try:
+        framed = _framed_decoder(decoder.type).decode(
+            b"[[" + b"\n],[".join(lines) + b"\n]]"
+        )
+    except msgspec.DecodeError:
+        return None
+    if len(framed) != len(lines):
+        return None
+    return [record for (record,) in framed]
+
+
+def decode_batches(
+    lines: Iterable[bytes], decoder, batch_size: int = BATCH_SIZE
+) -> Iterable[list]:
+    """
+    Agrupa las líneas en lotes de batch_size y decodifica cada lote con una sola
+    llamada a decode_batch. Si el lote tiene alguna línea corrupta o que no
+    corresponde a un registro, se decodifica línea a línea con decode_lines para
+    omitir solo las inválidas.
+    """
+    lines = iter(lines)
+    while chunk := list(islice(lines, batch_size)):
+        chunk = list(filter(not_blank, chunk))
+        batch = decode_batch(chunk, decoder)
+        if batch is None:
+            batch = list(decode_lines(chunk, decoder))
+        yield batch
+
+
+def read_msgspec_batches(
+    file_path: str,
+    decoder=None,
+    batch_size: int = BATCH_SIZE,
+    buffer_size: int = GCS_BUFFER_SIZE,
+    use_mmap: bool = False,
+) -> Iterable[list]:
+    """
+    Variante por lotes de read_msgspec: entrega listas de hasta batch_size registros
+    decodificados, con los mismos registros y en el mismo orden que la lectura línea a
+    línea. Pensada para agregaciones que procesan un lote completo por llamada.
+    """
+    if decoder is None:
+        decoder = msgspec.json.Decoder()
+
+    yield from decode_batches(
+        read_lines(file_path, buffer_size, use_mmap), decoder, batch_size
+    )
+
+
+def decode_fused(line: bytes) -> FusedTweet | None:
+    """
+    Decodifica una línea con la vista combinada. Si falla (p.ej. un campo con tipo
+    inesperado), recupera por separado lo que cada decoder estrecho sí acepta, de modo
+    que cada pregunta ve exactamente los mismos registros que en su lectura individual.
+    """
+    try:
+        return fused_decoder.decode(line)
+    except msgspec.DecodeError:
+        pass
+
+    fields = {}
+    for decoder, names in (
+        (tweet_decoder, ("date", "user")),
+        (content_decoder, ("content",)),
+        (mention_decoder, ("mentionedUsers",)),
+    ):
+        try:
+            tweet = decoder.decode(line)
+        except msgspec.DecodeError:
+            continue
+        fields.update({name: getattr(tweet, name) for name in names})
+    return FusedTweet(**fields) if fields else None
+
+
+def read_fused(file_path: str) -> Iterable[FusedTweet]:
+    """Generador de FusedTweet: una sola lectura del archivo para las tres preguntas."""
+    return filter(None, map(decode_fused, read_lines(file_path)))
+
+
+# --- 3. MAP-REDUCE PARALELO (Rangos de bytes) ---
+
+# Los Decoder de msgspec no son serializables (pickle): los workers los ubican por nombre
+DECODERS = {
+    "tweet": tweet_decoder,
+    "content": content_decoder,
+    "mention": mention_decoder,
+}
+
+
+def byte_ranges(file_path: str, parts: int) -> list[tuple[int, int]]:
+    """
+    Divide un archivo local en hasta `parts` rangos [inicio, fin) alineados a saltos de
+    línea: ninguna línea queda repartida entre dos rangos.
+    """
+    size = os.path.getsize(file_path)
+    boundaries = [0]
+    with open(file_path, "rb") as f:
+        for i in range(1, parts):
+            # Desde el byte previo al corte, avanza hasta el final de esa línea
+            f.seek(max(size * i // parts - 1, 0))
+            f.readline()
+            boundaries.append(max(f.tell(), boundaries[-1]))
+    boundaries.append(size)
+    return [(a, b) for a, b in zip(boundaries, boundaries[1:]) if b > a]
+
+
+def _map_range(
+    decoder_name: str,
+    mapper: Callable,
+    file_path: str,
+    start: int,
+    end: int | None,
+    raw_scan: bool = False,
+) -> Counter:
+    """
+    Unidad de trabajo de cada proceso: decodifica su rango por lotes y agrega con mapper.
+    El rango se lee con mmap, así todos los workers comparten el mismo page cache.
+    Un objeto gs:// o comprimido no se divide (end=None): el worker lo lee completo
+    en streaming. Con raw_scan el rango se lee por bloques crudos (ver raw_blocks).
+    """
+    if raw_scan:
+        return mapper(read_raw_batches(file_path, DECODERS[decoder_name], start, end))
+    if end is None:
+        return mapper(read_msgspec_batches(file_path, decoder=DECODERS[decoder_name]))
+    return mapper(
+        decode_batches(mmap_lines(file_path, start, end), DECODERS[decoder_name])
+    )
+
+
+def _map_ranges(
+    decoder_name: str,
+    mapper: Callable,
+    file_path: str,
+    ranges: list[tuple[int, int]],
+    raw_scan: bool = False,
+) -> Counter:
+    """Como _map_range, sobre una lista de rangos (p.ej. los bloques de un índice)."""
+    if raw_scan:
+        blocks = chain.from_iterable(raw_blocks(file_path, a, b) for a, b in ranges)
+        return mapper(decode_blocks(blocks, DECODERS[decoder_name]))
+    lines = chain.from_iterable(mmap_lines(file_path, a, b) for a, b in ranges)
+    return mapper(decode_batches(lines, DECODERS[decoder_name]))
+
+
+def split_ranges(
+    ranges: list[tuple[int, int]], parts: int
+) -> list[list[tuple[int, int]]]:
+    """Reparte rangos ordenados en hasta `parts` grupos contiguos de bytes similares."""
+    target = sum(b - a for a, b in ranges) / max(parts, 1)
+    groups, size = [], 0
+    for a, b in ranges:
+        if not groups or (size >= target and len(groups) < parts):
+            groups.append([])
+            size = 0
+        groups[-1].append((a, b))
+        size += b - a
+    return groups
+
+
+def input_tasks(file_path: str, workers: int) -> list[tuple[str, int, int | None]]:
+    """
+    Tareas (archivo, inicio, fin) en el orden de la entrada: cada archivo local se
+    divide en hasta `workers` rangos; cada objeto gs:// y cada archivo comprimido
+    (un stream gzip/zstd no se puede empezar a mitad) es una tarea completa.
+    """
+    return [
+        task
+        for path in expand_inputs(file_path)
+        for task in (
+            [(path, 0, None)]
+            if path.startswith("gs://") or is_compressed(path)
+            else [(path, a, b) for a, b in byte_ranges(path, workers)]
+        )
+    ]
+
+
+def merge_counters(partials: Iterable[Counter]) -> Counter:
+    """Suma Counters parciales en orden (conserva el orden de primera aparición)."""
+    return reduce(lambda acc, c: (acc.update(c), acc)[1], partials, Counter())
+
+
+def parallel_map_reduce(
+    file_path: str,
+    decoder_name: str,
+    mapper: Callable[[Iterable], Counter],
+    workers: int = 1,
+    reducer: Callable[[Iterable], Counter] = merge_counters,
+    ranges: list[tuple[int, int]] | None = None,
+    raw_scan: bool = False,
+) -> Counter:
+    """
+    Map-reduce sobre un archivo JSONL: cada worker decodifica un rango de bytes con el
+    decoder pre-compilado `DECODERS[decoder_name]` y `mapper` recibe el flujo de lotes
+    (listas de registros, ver decode_batches) y produce un Counter parcial.
+    Los parciales se combinan en el orden del archivo, de modo que el orden de primera
+    aparición de las llaves (desempates de most_common) es el mismo que en secuencial.
+    mapper debe ser una función de módulo (serializable). Con workers <= 1 o un único
+    objeto gs:// o archivo comprimido se ejecuta en el mismo proceso sobre la entrada
+    completa. Con entradas múltiples, los archivos (y los rangos de cada archivo
+    local) se reparten entre los workers. reducer combina los parciales cuando mapper
+    no produce Counters (p.ej. resúmenes aproximados). Con ranges (rangos de bytes
+    ordenados de un archivo local, ver date_index) solo se leen las líneas que
+    empiezan en ellos, aunque un rango corte una línea. Con raw_scan la entrada se
+    lee por bloques crudos (ver read_raw_batches), con los mismos registros.
+    """
+    if ranges is not None:
+        groups = split_ranges(ranges, workers)
+        if len(groups) <= 1:
+            return _map_ranges(decoder_name, mapper, file_path, ranges, raw_scan)
+        worker = partial(
+            _map_ranges, decoder_name, mapper, file_path, raw_scan=raw_scan
+        )
+        with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+            return reducer(executor.map(worker, groups))
+
+    if workers <= 1 or (
+        not is_multi_input(file_path)
+        and (file_path.startswith("gs://") or is_compressed(file_path))
+    ):
+        return _map_range(decoder_name, mapper, file_path, 0, None, raw_scan)
+
+    tasks = input_tasks(file_path, workers)
+    if not tasks:
+        return mapper([])
+
+    paths, starts, ends = zip(*tasks)
+    worker = partial(_map_range, decoder_name, mapper, raw_scan=raw_scan)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        return reducer(executor.map(worker, paths, starts, ends))
+
+
+# --- 4. ENTRADAS MÚLTIPLES (directorios, globs y prefijos) ---
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def is_multi_input(file_path: str) -> bool:
+    """True si la entrada nombra varios archivos: directorio, glob o prefijo gs://.../."""
+    if any(c in GLOB_CHARS for c in file_path):
+        return True
+    if file_path.startswith("gs://"):
+        return file_path.endswith("/") or "/" not in file_path[5:]
+    return os.path.isdir(file_path)
+
+
+def _list_gcs_blobs(file_path: str) -> list:
+    """
+    Objetos de un prefijo (gs://bucket/input/) o glob (gs://bucket/input/*.json)
+    en orden de nombre. Se lista solo desde la parte fija del patrón; en el glob,
+    `*` también cruza `/` (fnmatch).
+    """
+    from fnmatch import fnmatchcase
+    from src.common.gcs_client import get_storage_client
+
+    bucket_name, _, pattern = file_path[5:].partition("/")
+    cut = min((pattern.index(c) for c in GLOB_CHARS if c in pattern), default=None)
+    prefix = pattern if cut is None else pattern[:cut]
+    blobs = get_storage_client().list_blobs(bucket_name, prefix=prefix)
+    return sorted(
+        (
+            blob
+            for blob in blobs
+            if not blob.name.endswith("/")
+            and (cut is None or fnmatchcase(blob.name, pattern))
+        ),
+        key=lambda blob: blob.name,
+    )
+
+
+def expand_inputs(file_path: str) -> list[str]:
+    """
+    Archivos de una entrada, en orden estable: el archivo mismo, los de un directorio
+    local (sin ocultos), los de un glob local o los objetos de un prefijo/glob gs://.
+    Un archivo único se devuelve sin tocar disco ni red.
+    """
+    if not is_multi_input(file_path):
+        return [file_path]
+    if file_path.startswith("gs://"):
+        bucket_name = file_path[5:].partition("/")[0]
+        paths = [f"gs://{bucket_name}/{b.name}" for b in _list_gcs_blobs(file_path)]
+    elif os.path.isdir(file_path):
+        paths = [
+            entry.path
+            for entry in sorted(os.scandir(file_path), key=lambda e: e.name)
+            if entry.is_file() and not entry.name.startswith(".")
+        ]
+    else:
+        import glob
+
+        paths = sorted(
+            p for p in glob.glob(file_path, recursive=True) if os.path.isfile(p)
+        )
+    if not paths:
+        raise FileNotFoundError(f"No input files match {file_path}")
+    return paths
+
+
+def input_objects(file_path: str) -> list[tuple[str, int, str]]:
+    """
+    (ruta, tamaño, versión) de cada archivo de la entrada. La versión es la generation
+    en GCS y mtime+tamaño en local: identifica el contenido sin leerlo.
+    """
     if file_path.startswith("gs://"):
+        if is_multi_input(file_path):
+            bucket_name = file_path[5:].partition("/")[0]
+            blobs = _list_gcs_blobs(file_path)
+            if not blobs:
+                raise FileNotFoundError(f"No input files match {file_path}")
+            return [
+                (f"gs://{bucket_name}/{b.name}", b.size, str(b.generation))
+                for b in blobs
+            ]
         blob = _get_gcs_blob(file_path)
-        stream = io.BytesIO()
-        blob.download_to_file(stream)
-        stream.seek(0)
-        file_obj = stream
+        blob.reload()
+        return [(file_path, blob.size, str(blob.generation))]
+
+    objects = []
+    for path in expand_inputs(file_path):
+        stat = os.stat(path)
+        objects.append((path, stat.st_size, f"{stat.st_mtime_ns}-{stat.st_size}"))
+    return objects
+
+
+# --- 5. ENTRADAS COMPRIMIDAS (gzip / zstd) ---
+
+# Al leer, el formato se detecta por los primeros bytes y no por la extensión: un
+# objeto que GCS entrega ya descomprimido (Content-Encoding: gzip) pasa como texto
+MAGIC_BYTES = {
+    b"\x1f\x8b": "gzip",
+    b"\x28\xb5\x2f\xfd": "zstd",
+}
+
+# Para elegir el lector de un objeto gs:// basta su nombre (sin pedir sus bytes)
+COMPRESSED_SUFFIXES = (".gz", ".gzip", ".zst", ".zstd")
+
+# Bloque de texto descomprimido por lectura (acota el buffer del descompresor)
+DECOMPRESS_BUFFER_SIZE = 1024 * 1024
+
+# Texto por cada read_ndjson del lector polars: con bloques de 1MB el costo fijo de
+# cada parseo hacía q2_time 40% más lento sobre 200MB; con 16MB el pico es similar
+PARSE_BLOCK_SIZE = 16 * 1024 * 1024
+
+
+def compression(head: bytes) -> str | None:
+    """Formato de compresión ("gzip", "zstd") según los primeros bytes, o None."""
+    return next(
+        (name for magic, name in MAGIC_BYTES.items() if head.startswith(magic)), None
+    )
+
+
+def is_compressed(file_path: str) -> bool:
+    """
+    True si el archivo está comprimido: en local por sus primeros 4 bytes y en GCS
+    por la extensión del objeto.
+    """
+    if file_path.startswith("gs://"):
+        return file_path.endswith(COMPRESSED_SUFFIXES)
+    with open(file_path, "rb") as f:
+        return compression(f.read(4)) is not None
+
+
+@contextlib.contextmanager
+def decompressed(raw: io.BufferedReader, buffer_size: int = DECOMPRESS_BUFFER_SIZE):
+    """
+    Envuelve un archivo binario con un lector que lo descomprime en streaming si es
+    gzip/zstd (si no, entrega raw tal cual). El formato se detecta con peek, sin
+    consumir bytes. No hay archivos temporales y el texto descomprimido se entrega de
+    a bloques de buffer_size. Los gzip de varios miembros (pigz, concatenados) y los
+    zstd de varios frames se leen completos.
+    """
+    kind = compression(raw.peek(4)[:4])
+    if kind is None:
+        yield raw
+    elif kind == "gzip":
+        import gzip
+
+        with gzip.GzipFile(fileobj=raw) as stream:
+            yield stream
     else:
-        file_obj = open(file_path, "rb")
+        import zstandard
 
-    try:
-        for line in file_obj:
-            try:
-                yield decoder.decode(line)
-            except msgspec.DecodeError:
-                continue
-    finally:
-        file_obj.close()
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            raw, read_size=buffer_size, read_across_frames=True, closefd=False
+        )
+        with io.BufferedReader(reader, buffer_size) as stream:
+            yield stream
+
+
+class ChunkStream(io.RawIOBase):
+    """Archivo de solo lectura sobre un iterable de bloques (p.ej. descargas de GCS)."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self.pending:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return 0
+            self.pending = memoryview(chunk)
+        n = min(len(buffer), len(self.pending))
+        buffer[:n] = self.pending[:n]
+        self.pending = self.pending[n:]
+        return n
+
+
+def decompress_chunks(
+    chunks: Iterable[bytes], buffer_size: int = DECOMPRESS_BUFFER_SIZE
+) -> Iterable[bytes]:
+    """
+    Variante por bloques de decompressed: el formato se detecta con el primer bloque.
+    Los bloques de texto plano pasan sin copia; los comprimidos se descomprimen a
+    medida que llegan, en bloques de hasta buffer_size bytes.
+    """
+    chunks = iter(chunks)
+    head = next(chunks, b"")
+    if compression(head) is None:
+        if head:
+            yield head
+        yield from chunks
+        return
+
+    raw = io.BufferedReader(ChunkStream(chain([head], chunks)), buffer_size)
+    with decompressed(raw, buffer_size) as stream:
+        yield from iter(lambda: stream.read(buffer_size), b"")
+
+
+@contextlib.contextmanager
+def open_decompressed(file_path: str):
+    """Archivo binario con el texto plano de un archivo local u objeto gs://."""
+    if file_path.startswith("gs://"):
+        with contextlib.closing(gcs_chunk_reader(file_path)) as chunks:
+            yield io.BufferedReader(ChunkStream(chunks), DECOMPRESS_BUFFER_SIZE)
+        return
+    with open(file_path, "rb") as raw, decompressed(raw) as stream:
+        yield stream
+
+
+# El mismo LazyFrame por archivo: polars solo comparte (CSE) fuentes idénticas, así
+# los tres planes de run_all descomprimen el archivo una sola vez. El archivo se abre
+# en cada ejecución, por lo que reutilizarlo no entrega contenido viejo
+@lru_cache(maxsize=32)
+def scan_compressed_ndjson(file_path: str, block_size: int = PARSE_BLOCK_SIZE):
+    """
+    LazyFrame sobre un NDJSON gzip/zstd (IO plugin de polars). scan_ndjson también
+    acepta estos archivos, pero descomprime el archivo entero en memoria antes de
+    parsear (~2.7x el texto plano, también con el motor streaming). Aquí el texto
+    se descomprime y se parsea por bloques de líneas completas con solo las columnas
+    proyectadas, así el motor streaming mantiene la memoria acotada.
+    """
+    import polars as pl
+    from polars.io.plugins import register_io_source
+
+    schema = twitter_schema()
+
+    def source(with_columns, predicate, n_rows, batch_size):
+        columns = (
+            schema if with_columns is None else {c: schema[c] for c in with_columns}
+        )
+        with open_decompressed(file_path) as stream:
+            while (n_rows is None or n_rows > 0) and (
+                block := stream.read(block_size) + stream.readline()
+            ):
+                df = pl.read_ndjson(block, schema=columns, ignore_errors=True)
+                if predicate is not None:
+                    df = df.filter(predicate)
+                if n_rows is not None:
+                    df = df.head(n_rows)
+                    n_rows -= df.height
+                yield df
+
+    return register_io_source(source, schema=schema, is_pure=True)
+
+
+# --- 6. LECTURA POR BLOQUES CRUDOS (sin cortar líneas en Python) ---
+
+# Opción por defecto de las estrategias de memoria (q1_memory, q3_memory)
+RAW_SCAN = os.environ.get("RAW_SCAN", "0") == "1"
+
+# Texto por cada decode_lines: con 64KB los registros del bloque siguen en caché;
+# bloques de 256KB y 1MB resultaron más lentos en las pruebas (200MB sintéticos)
+RAW_BLOCK_SIZE = 64 * 1024
+
+
+def raw_blocks(
+    file_path: str,
+    start: int = 0,
+    end: int | None = None,
+    block_size: int = RAW_BLOCK_SIZE,
+) -> Iterable[bytes]:
+    """
+    Generador de bloques de ~block_size bytes que terminan en un salto de línea, sin
+    crear un bytes por línea. Con start/end (archivo local sin comprimir) entrega las
+    líneas que empiezan en [start, end), como mmap_lines. Soporta entradas múltiples,
+    gs:// y gzip/zstd (ver open_decompressed).
+    """
+    if is_multi_input(file_path):
+        for path in expand_inputs(file_path):
+            yield from raw_blocks(path, block_size=block_size)
+        return
+
+    with open_decompressed(file_path) as stream:
+        if start:
+            # Como mmap_lines: si start cae a mitad de una línea, parte en la siguiente
+            stream.seek(start - 1)
+            if stream.read(1) != b"\n":
+                start += len(stream.readline())
+        position = start
+        while end is None or position < end:
+            size = block_size if end is None else min(block_size, end - position)
+            if not (block := stream.read(size)):
+                return
+            # Completa la última línea (si el bloque no terminó justo en un salto)
+            if not block.endswith(b"\n"):
+                block += stream.readline()
+            position += len(block)
+            yield block
+
+
+def decode_blocks(blocks: Iterable[bytes], decoder) -> Iterable[list]:
+    """
+    Decodifica cada bloque de líneas completas con una sola llamada, con cada línea
+    enmarcada como en decode_batch (los saltos de línea pasan a ser "\n],["). Si el
+    bloque tiene alguna línea corrupta, vacía, con dos valores o un objeto repartido
+    en dos líneas, se parte en líneas y pasa por decode_batches, así los registros son
+    los mismos y en el mismo orden que con la lectura línea a línea.
+    """
+    framed_decoder = _framed_decoder(decoder.type)
+    for block in blocks:
+        try:
+            framed = framed_decoder.decode(
+                b"[[" + block.rstrip(b"\n").replace(b"\n", b"\n],[") + b"\n]]"
+            )
+        except msgspec.DecodeError:
+            framed = None
+        if framed is None or len(framed) != block.count(b"\n") + (
+            not block.endswith(b"\n")
+        ):
+            yield from decode_batches(block.removesuffix(b"\n").split(b"\n"), decoder)
+            continue
+        yield [record for (record,) in framed]
+
+
+def read_raw_batches(
+    file_path: str, decoder, start: int = 0, end: int | None = None
+) -> Iterable[list]:
+    """
+    Variante de read_msgspec_batches que lee bloques crudos (ver raw_blocks): evita
+    el costo Python de separar las líneas y volver a unirlas en cada lote.
+    """
+    return decode_blocks(raw_blocks(file_path, start, end), decoder)
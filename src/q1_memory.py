@@ -1,9 +1,11 @@
 import time
 from datetime import datetime
 from collections import Counter
-from functools import reduce
-from src.common.utils import read_msgspec, tweet_decoder
+from collections.abc import Iterable
+from functools import partial, reduce
+from src.common.utils import parallel_map_reduce, Tweet
 from src.common.logger import canonical_logger
+from src.common import date_index, utils
 
 
 # Modular Functional Blocks (KISS + Type Hints + Docstrings)
@@ -14,24 +16,76 @@ def get_top_k(counters: Counter, k: int) -> list[str]:
     return [d for d, _ in counters.most_common(k)]
 
 
-def date_counter(file_path: str) -> Counter:
-    """Counts tweet occurrences per date using memory-efficient streaming with msgspec validation."""
+def count_dates(batches: Iterable[list[Tweet]]) -> Counter:
+    """Counts tweet occurrences per date over batches of validated msgspec objects."""
     return reduce(
-        lambda acc, t: (acc.update([t.date[:10]]), acc)[1],
-        read_msgspec(file_path, decoder=tweet_decoder),
+        lambda acc, batch: (acc.update([t.date[:10] for t in batch]), acc)[1],
+        batches,
         Counter(),
     )
 
 
-def user_date_counter(file_path: str, target_dates: frozenset[str]) -> Counter:
-    """Counts user activity for specific target dates using validated msgspec objects."""
+def count_user_dates(
+    batches: Iterable[list[Tweet]], target_dates: frozenset[str] | None = None
+) -> Counter:
+    """Counts (date, username) pairs per batch, keeping only target dates unless None."""
     return reduce(
-        lambda acc, t: (
-            (acc.update([(t.date[:10], t.user.username)]), acc)[1]
-            if t.date[:10] in target_dates
-            else acc
-        ),
-        read_msgspec(file_path, decoder=tweet_decoder),
+        lambda acc, batch: (
+            acc.update(
+                [
+                    (t.date[:10], t.user.username)
+                    for t in batch
+                    if target_dates is None or t.date[:10] in target_dates
+                ]
+            ),
+            acc,
+        )[1],
+        batches,
+        Counter(),
+    )
+
+
+def date_counter(file_path: str, workers: int = 1, raw_scan: bool = False) -> Counter:
+    """Counts tweet occurrences per date using memory-efficient streaming with msgspec validation."""
+    return parallel_map_reduce(
+        file_path, "tweet", count_dates, workers, raw_scan=raw_scan
+    )
+
+
+def user_date_counter(
+    file_path: str,
+    target_dates: frozenset[str] | None = None,
+    workers: int = 1,
+    ranges: list[tuple[int, int]] | None = None,
+    raw_scan: bool = False,
+) -> Counter:
+    """
+    Counts user activity for specific target dates using validated msgspec objects.
+    With target_dates=None every date is kept (single-pass mode). With ranges (from
+    the date index) only the blocks holding the target dates are decoded.
+    """
+    return parallel_map_reduce(
+        file_path,
+        "tweet",
+        partial(count_user_dates, target_dates=target_dates),
+        workers,
+        ranges=ranges,
+        raw_scan=raw_scan,
+    )
+
+
+def select_dates(user_date_counts: Counter, target_dates: frozenset[str]) -> Counter:
+    """Keeps only the (date, username) counts that belong to the target dates."""
+    return Counter(
+        {key: c for key, c in user_date_counts.items() if key[0] in target_dates}
+    )
+
+
+def date_totals(user_date_counts: Counter) -> Counter:
+    """Collapses (date, username) counts into per-date totals, keeping first-seen order."""
+    return reduce(
+        lambda acc, item: (acc.update({item[0][0]: item[1]}), acc)[1],
+        user_date_counts.items(),
         Counter(),
     )
 
@@ -57,30 +111,103 @@ def user_ranker(user_date_counts: Counter) -> dict:
     )
 
 
+def format_results(
+    top_dates: list[str], best_users_map: dict
+) -> list[tuple[datetime.date, str]]:
+    """Pairs each top date (as datetime.date) with its most active user."""
+    return [
+        (datetime.strptime(d, "%Y-%m-%d").date(), best_users_map[d][0])
+        for d in top_dates
+        if d in best_users_map
+    ]
+
+
 @canonical_logger(event_name="q1_memory_execution")
-def q1_memory(file_path: str, ctx=None) -> list[tuple[datetime.date, str]]:
+def q1_memory(
+    file_path: str,
+    single_pass: bool = False,
+    workers: int = 1,
+    use_index: bool | None = None,
+    raw_scan: bool | None = None,
+    ctx=None,
+) -> list[tuple[datetime.date, str]]:
     """
     Identifies the top 10 dates with the most tweets and their most active user.
     Uses msgspec for ultra-fast type validation and Canonical Logging for observability.
+    With single_pass=True the file is read once, keeping per-date user counters for
+    every date instead of rescanning it for the top dates (trades RAM for I/O).
+    With workers > 1 each scan is split in byte ranges across processes.
+    With use_index=True (default: DATE_INDEX env) the first pass builds a per-date
+    sidecar index (or reuses a current one, skipping that pass) and the second pass
+    only decodes the blocks holding the top dates.
+    With raw_scan=True (default: RAW_SCAN env) the scans hand newline-aligned raw
+    blocks to msgspec instead of splitting lines in Python (same records).
     """
+    use_index = date_index.DATE_INDEX if use_index is None else use_index
+    raw_scan = utils.RAW_SCAN if raw_scan is None else raw_scan
     if ctx:
-        ctx.add_context(file_path=file_path)
-
-    # 1. Step 1: Identify top 10 dates
-    t0 = time.perf_counter()
-    counts = date_counter(file_path)
-    top_dates = get_top_k(counts, 10)
-    if ctx:
-        ctx.add_step("identify_top_dates", round((time.perf_counter() - t0) * 1000, 4))
-        ctx.add_metric("total_dates", len(counts))
+        ctx.add_context(
+            file_path=file_path,
+            single_pass=single_pass,
+            workers=workers,
+            use_index=use_index,
+            raw_scan=raw_scan,
+        )
 
-    # 2. Step 2: Get user counts for those dates
-    t0 = time.perf_counter()
-    user_date_counts = user_date_counter(file_path, frozenset(top_dates))
-    if ctx:
-        ctx.add_step(
-            "count_users_for_top_dates", round((time.perf_counter() - t0) * 1000, 4)
+    if single_pass:
+        # 1. Step 1: Count users for every date in one scan
+        t0 = time.perf_counter()
+        all_user_date_counts = user_date_counter(
+            file_path, workers=workers, raw_scan=raw_scan
+        )
+        if ctx:
+            ctx.add_step(
+                "count_users_all_dates", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            ctx.add_metric("unique_user_dates", len(all_user_date_counts))
+
+        # 2. Step 2: Identify top 10 dates from the aggregate
+        t0 = time.perf_counter()
+        counts = date_totals(all_user_date_counts)
+        top_dates = get_top_k(counts, 10)
+        user_date_counts = select_dates(all_user_date_counts, frozenset(top_dates))
+        if ctx:
+            ctx.add_step(
+                "identify_top_dates", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            ctx.add_metric("total_dates", len(counts))
+    else:
+        # 1. Step 1: Identify top 10 dates (the index already holds the counts)
+        t0 = time.perf_counter()
+        index, index_status = (
+            date_index.ensure_index(file_path) if use_index else (None, "disabled")
+        )
+        counts = (
+            Counter(index.counts)
+            if index
+            else date_counter(file_path, workers, raw_scan)
+        )
+        top_dates = get_top_k(counts, 10)
+        if ctx:
+            ctx.add_step(
+                "identify_top_dates", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            ctx.add_metric("total_dates", len(counts))
+            ctx.add_metric("date_index", index_status)
+
+        # 2. Step 2: Get user counts for those dates
+        t0 = time.perf_counter()
+        ranges = index.ranges(top_dates) if index else None
+        user_date_counts = user_date_counter(
+            file_path, frozenset(top_dates), workers, ranges, raw_scan
         )
+        if ctx:
+            ctx.add_step(
+                "count_users_for_top_dates", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            if index:
+                ctx.add_metric("rescan_bytes", sum(b - a for a, b in ranges))
+                ctx.add_metric("file_bytes", index.size)
 
     # 3. Step 3: Find best users
     t0 = time.perf_counter()
@@ -90,11 +217,7 @@ def q1_memory(file_path: str, ctx=None) -> list[tuple[datetime.date, str]]:
 
     # 4. Step 4: Format results
     t0 = time.perf_counter()
-    result = [
-        (datetime.strptime(d, "%Y-%m-%d").date(), best_users_map[d][0])
-        for d in top_dates
-        if d in best_users_map
-    ]
+    result = format_results(top_dates, best_users_map)
     if ctx:
         ctx.add_step("format_results", round((time.perf_counter() - t0) * 1000, 4))
         ctx.add_metric("output_rows", len(result))
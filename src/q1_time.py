@@ -3,94 +3,92 @@ import polars as pl
 from datetime import date
 from src.common.utils import read_polars as extractor
 from src.common.logger import canonical_logger
+from src.common.polars_engine import resolve_engine
 
 # Modular Functional Blocks (KISS + Type Hints + Docstrings)
 
 
-def date_counter(file_path: str) -> pl.LazyFrame:
-    """Creates a LazyFrame pipeline to count tweets per date."""
+def date_user_extractor(file_path: str) -> pl.LazyFrame:
+    """Single NDJSON scan that parses the date once and extracts the username."""
     return (
         extractor(file_path)
-        .with_columns(
+        .select(
             pl.col("date")
             .str.to_datetime(format="%Y-%m-%dT%H:%M:%S%z", strict=False)
             .dt.date()
-            .alias("date")
+            .alias("date"),
+            pl.col("user").struct.field("username").alias("username"),
         )
         .filter(pl.col("date").is_not_null())
-        .group_by("date")
-        .len()
     )
 
 
-def get_top_k(lf: pl.LazyFrame, k: int) -> pl.LazyFrame:
-    """Adds top-k selection to the LazyFrame pipeline."""
-    return lf.top_k(k, by="len").select("date")
-
-
-def user_date_counter(file_path: str, top_dates_lf: pl.LazyFrame) -> pl.LazyFrame:
-    """Counts user activity for specific target dates."""
-    return (
-        extractor(file_path)
-        .with_columns(
-            pl.col("date")
-            .str.to_datetime(format="%Y-%m-%dT%H:%M:%S%z", strict=False)
-            .dt.date()
-            .alias("date"),
-            pl.col("user").struct.field("username").alias("username"),
-        )
-        .join(top_dates_lf, on="date")
-        .filter(pl.col("username").is_not_null())
-        .group_by("date", "username")
-        .len()
-    )
+def user_date_counter(lf: pl.LazyFrame) -> pl.LazyFrame:
+    """Counts tweets per (date, username); null usernames keep their own group."""
+    return lf.group_by("date", "username").len()
 
 
 def user_ranker(lf: pl.LazyFrame) -> pl.LazyFrame:
-    """Ranks users per date to find the most active one."""
+    """
+    Ranks users per date to find the most active one.
+    date_total counts every tweet of the day (used to pick the top dates), while
+    day_total_tweets only counts tweets with a username (used for the final order).
+    """
+    has_user = pl.col("username").is_not_null()
     return lf.group_by("date").agg(
         pl.col("username")
-        .sort_by(["len", "username"], descending=[True, False])
+        .sort_by([has_user.not_(), "len", "username"], descending=[False, True, False])
         .first()
         .alias("top_user"),
-        pl.col("len").sum().alias("day_total_tweets"),
+        pl.col("len").filter(has_user).sum().alias("day_total_tweets"),
+        pl.col("len").sum().alias("date_total"),
+    )
+
+
+def get_top_k(lf: pl.LazyFrame, k: int) -> pl.LazyFrame:
+    """Keeps the k dates with most tweets (ties broken by the most recent date)."""
+    return lf.top_k(k, by=["date_total", "date"])
+
+
+def build_query(file_path: str, k: int = 10) -> pl.LazyFrame:
+    """Composes the full lazy plan: top k dates with their most active user."""
+    return (
+        date_user_extractor(file_path)
+        .pipe(user_date_counter)
+        .pipe(user_ranker)
+        .pipe(get_top_k, k=k)
+        .filter(pl.col("top_user").is_not_null())
+        .sort(["day_total_tweets", "date"], descending=[True, True])
+        .select("date", "top_user")
     )
 
 
 @canonical_logger(event_name="q1_time_execution")
-def q1_time(file_path: str, ctx=None) -> list[tuple[date, str]]:
+def q1_time(
+    file_path: str,
+    engine: str | None = None,
+    memory_budget_mb: float | None = None,
+    ctx=None,
+) -> list[tuple[date, str]]:
     """
     Computes top 10 dates and their most active user using an optimized Lazy pipeline.
     Uses Native Typing (Polars Schema) for ultra-fast validation and Canonical Logging.
+    engine selects the Polars engine ("in-memory", "streaming" or "auto", which
+    streams when the input would not fit in memory_budget_mb).
     """
+    engine = resolve_engine(file_path, engine, memory_budget_mb)
     if ctx:
-        ctx.add_context(file_path=file_path)
+        ctx.add_context(file_path=file_path, engine=engine)
 
-    # 1. Plan for Top 10 Dates
+    # 1. Plan: one scan -> (date, username) counts -> per-date ranking -> top 10
     t0 = time.perf_counter()
-    top_dates_lf = get_top_k(date_counter(file_path), 10)
-    if ctx:
-        ctx.add_step("plan_top_dates", round((time.perf_counter() - t0) * 1000, 4))
-
-    # 2. Plan for User activity on those dates
-    t0 = time.perf_counter()
-    user_counts_lf = user_date_counter(file_path, top_dates_lf)
-    if ctx:
-        ctx.add_step("plan_user_counts", round((time.perf_counter() - t0) * 1000, 4))
-
-    # 3. Plan for final ranking and sort
-    t0 = time.perf_counter()
-    query = (
-        user_ranker(user_counts_lf)
-        .sort(["day_total_tweets", "date"], descending=[True, True])
-        .select("date", "top_user")
-    )
+    query = build_query(file_path, 10)
     if ctx:
-        ctx.add_step("plan_final_query", round((time.perf_counter() - t0) * 1000, 4))
+        ctx.add_step("build_query_plan", round((time.perf_counter() - t0) * 1000, 4))
 
-    # 4. SINGLE EXECUTION (Validation happens here at Rust level via schema)
+    # 2. SINGLE EXECUTION (Validation happens here at Rust level via schema)
     t0 = time.perf_counter()
-    result = query.collect()
+    result = query.collect(engine=engine)
 
     if ctx:
         ctx.add_step("execution_collect", round((time.perf_counter() - t0) * 1000, 4))
@@ -1,9 +1,20 @@
-import re
 import time
 from functools import reduce
 from collections import Counter
-from collections.abc import Iterable
-from src.common.utils import read_msgspec, content_decoder
+from collections.abc import Callable, Iterable
+from src.common.utils import (
+    read_msgspec_batches,
+    content_decoder,
+    parallel_map_reduce,
+    ContentTweet,
+)
+from src.common.emoji_tokenizer import tokenize_many
+from src.common.heavy_hitters import (
+    Sketch,
+    merge_sketches,
+    sketch_bounds,
+    sketch_counter,
+)
 from src.common.logger import canonical_logger
 
 
@@ -15,11 +26,20 @@ def get_top_k(counters: Counter, k: int) -> list[tuple[str, int]]:
     return sorted(counters.items(), key=lambda x: (-x[1], x[0]))[:k]
 
 
-def emoji_extractor(file_path: str, pattern: re.Pattern) -> Iterable[list[str]]:
-    """Yields lists of emojis extracted from each tweet content using msgspec."""
-    return map(
-        lambda t: pattern.findall(t.content),
-        read_msgspec(file_path, decoder=content_decoder),
+def extract_emojis(
+    batches: Iterable[list[ContentTweet]],
+    tokenizer: Callable[[Iterable[str]], list[str]] = tokenize_many,
+) -> Iterable[list[str]]:
+    """Yields one flat list with the emojis found in each batch of decoded tweets."""
+    return map(lambda batch: tokenizer([t.content for t in batch]), batches)
+
+
+def emoji_extractor(
+    file_path: str, tokenizer: Callable[[Iterable[str]], list[str]] = tokenize_many
+) -> Iterable[list[str]]:
+    """Yields per-batch lists of emojis extracted from tweet contents using msgspec."""
+    return extract_emojis(
+        read_msgspec_batches(file_path, decoder=content_decoder), tokenizer
     )
 
 
@@ -32,37 +52,68 @@ def emoji_counter(emoji_stream: Iterable[list[str]]) -> Counter:
     )
 
 
+def emoji_mapper(batches: Iterable[list[ContentTweet]]) -> Counter:
+    """Counts the emojis of a stream of decoded batches (unit of work of each worker)."""
+    return emoji_counter(extract_emojis(batches))
+
+
+def emoji_sketch_mapper(batches: Iterable[list[ContentTweet]]) -> Sketch:
+    """Summarizes the emojis of a stream of decoded batches in fixed memory."""
+    return sketch_counter(extract_emojis(batches))
+
+
 @canonical_logger(event_name="q2_memory_execution")
-def q2_memory(file_path: str, ctx=None) -> list[tuple[str, int]]:
+def q2_memory(
+    file_path: str, workers: int = 1, approximate: bool = False, ctx=None
+) -> list[tuple[str, int]]:
     """
     Counts the top 10 most used emojis using a memory-efficient functional pipeline.
-    Uses msgspec for fast content extraction and Canonical Logging for observability.
+    Uses msgspec for fast content extraction, the emoji tokenizer (same tokens as
+    q2_time) and Canonical Logging for observability.
+    With workers > 1 the file is split in byte ranges and counted across processes.
+    With approximate=True a fixed-size heavy-hitter summary replaces the exact Counter:
+    memory stays constant with the number of distinct emojis, each returned count
+    may be short by at most `max_count_error` (reported with the other bounds).
     """
     if ctx:
-        ctx.add_context(file_path=file_path)
-
-    # Regex for capturing emojis (including ZWJ and modifiers)
-    emoji_regex = re.compile(
-        r"("
-        r"[\U0001f1e6-\U0001f1ff]{2}|"
-        r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf]"
-        r"(?:[\ufe0f\u200d\U0001f3fb-\U0001f3ff]+"
-        r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf])*"
-        r")"
-    )
+        ctx.add_context(file_path=file_path, workers=workers, approximate=approximate)
 
-    # Define orchestrated pipeline steps
-    t0 = time.perf_counter()
-    stream = emoji_extractor(file_path, emoji_regex)
-    if ctx:
-        ctx.add_step(
-            "create_extraction_stream", round((time.perf_counter() - t0) * 1000, 4)
+    if approximate:
+        t0 = time.perf_counter()
+        sketch = parallel_map_reduce(
+            file_path, "content", emoji_sketch_mapper, workers, reducer=merge_sketches
         )
+        counter = sketch.counts
+        if ctx:
+            ctx.add_step(
+                "aggregate_sketch", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            for name, value in sketch_bounds(sketch, 10).items():
+                ctx.add_metric(name, value)
+    elif workers > 1:
+        t0 = time.perf_counter()
+        counter = parallel_map_reduce(file_path, "content", emoji_mapper, workers)
+        if ctx:
+            ctx.add_step(
+                "aggregate_counts_parallel", round((time.perf_counter() - t0) * 1000, 4)
+            )
+    else:
+        # Define orchestrated pipeline steps
+        t0 = time.perf_counter()
+        stream = emoji_extractor(file_path)
+        if ctx:
+            ctx.add_step(
+                "create_extraction_stream", round((time.perf_counter() - t0) * 1000, 4)
+            )
+
+        t0 = time.perf_counter()
+        counter = emoji_counter(stream)
+        if ctx:
+            ctx.add_step(
+                "aggregate_counts", round((time.perf_counter() - t0) * 1000, 4)
+            )
 
-    t0 = time.perf_counter()
-    counter = emoji_counter(stream)
     if ctx:
-        ctx.add_step("aggregate_counts", round((time.perf_counter() - t0) * 1000, 4))
         ctx.add_metric("unique_emojis", len(counter))
 
     t0 = time.perf_counter()
@@ -2,8 +2,21 @@ import time
 from functools import reduce
 from collections import Counter
 from collections.abc import Iterable
-from src.common.utils import read_msgspec, mention_decoder
+from src.common.utils import (
+    read_msgspec_batches,
+    read_raw_batches,
+    mention_decoder,
+    parallel_map_reduce,
+    MentionTweet,
+)
+from src.common.heavy_hitters import (
+    Sketch,
+    merge_sketches,
+    sketch_bounds,
+    sketch_counter,
+)
 from src.common.logger import canonical_logger
+from src.common import utils
 
 
 # Modular Functional Blocks (KISS + Type Hints + Docstrings)
@@ -14,16 +27,25 @@ def get_top_k(counters: Counter, k: int) -> list[tuple[str, int]]:
     return sorted(counters.items(), key=lambda x: (-x[1], x[0]))[:k]
 
 
-def mention_extractor(file_path: str) -> Iterable[list[str]]:
-    """Yields lists of mentioned usernames from each tweet using msgspec."""
+def extract_mentions(batches: Iterable[list[MentionTweet]]) -> Iterable[list[str]]:
+    """Yields one flat list of lowercased mentioned usernames per decoded batch."""
     return map(
-        lambda t: [m.username.lower() for m in (t.mentionedUsers or [])]
-        if t.mentionedUsers
-        else [],
-        read_msgspec(file_path, decoder=mention_decoder),
+        lambda batch: [
+            m.username.lower()
+            for t in batch
+            if t.mentionedUsers
+            for m in t.mentionedUsers
+        ],
+        batches,
     )
 
 
+def mention_extractor(file_path: str, raw_scan: bool = False) -> Iterable[list[str]]:
+    """Yields per-batch lists of mentioned usernames from the tweets using msgspec."""
+    read = read_raw_batches if raw_scan else read_msgspec_batches
+    return extract_mentions(read(file_path, decoder=mention_decoder))
+
+
 def mention_counter(mention_stream: Iterable[list[str]]) -> Counter:
     """Aggregates all mentioned usernames into a single Counter."""
     return reduce(
@@ -33,27 +55,86 @@ def mention_counter(mention_stream: Iterable[list[str]]) -> Counter:
     )
 
 
+def mention_mapper(batches: Iterable[list[MentionTweet]]) -> Counter:
+    """Counts the mentions of a stream of decoded batches (unit of work of each worker)."""
+    return mention_counter(extract_mentions(batches))
+
+
+def mention_sketch_mapper(batches: Iterable[list[MentionTweet]]) -> Sketch:
+    """Summarizes the mentions of a stream of decoded batches in fixed memory."""
+    return sketch_counter(extract_mentions(batches))
+
+
 @canonical_logger(event_name="q3_memory_execution")
-def q3_memory(file_path: str, ctx=None) -> list[tuple[str, int]]:
+def q3_memory(
+    file_path: str,
+    workers: int = 1,
+    approximate: bool = False,
+    raw_scan: bool | None = None,
+    ctx=None,
+) -> list[tuple[str, int]]:
     """
     Counts the top 10 most mentioned users using a memory-efficient functional pipeline.
     Uses msgspec for ultra-fast mention extraction and Canonical Logging for observability.
+    With workers > 1 the file is split in byte ranges and counted across processes.
+    With approximate=True a fixed-size heavy-hitter summary replaces the exact Counter:
+    memory stays constant with the number of distinct mentions, each returned count
+    may be short by at most `max_count_error` (reported with the other bounds).
+    With raw_scan=True (default: RAW_SCAN env) the file is decoded from raw blocks
+    of whole lines instead of line by line (same mentions).
     """
+    raw_scan = utils.RAW_SCAN if raw_scan is None else raw_scan
     if ctx:
-        ctx.add_context(file_path=file_path)
+        ctx.add_context(
+            file_path=file_path,
+            workers=workers,
+            approximate=approximate,
+            raw_scan=raw_scan,
+        )
 
-    # Define orchestrated pipeline steps
-    t0 = time.perf_counter()
-    stream = mention_extractor(file_path)
-    if ctx:
-        ctx.add_step(
-            "create_extraction_stream", round((time.perf_counter() - t0) * 1000, 4)
+    if approximate:
+        t0 = time.perf_counter()
+        sketch = parallel_map_reduce(
+            file_path,
+            "mention",
+            mention_sketch_mapper,
+            workers,
+            reducer=merge_sketches,
+            raw_scan=raw_scan,
         )
+        counter = sketch.counts
+        if ctx:
+            ctx.add_step(
+                "aggregate_sketch", round((time.perf_counter() - t0) * 1000, 4)
+            )
+            for name, value in sketch_bounds(sketch, 10).items():
+                ctx.add_metric(name, value)
+    elif workers > 1:
+        t0 = time.perf_counter()
+        counter = parallel_map_reduce(
+            file_path, "mention", mention_mapper, workers, raw_scan=raw_scan
+        )
+        if ctx:
+            ctx.add_step(
+                "aggregate_counts_parallel", round((time.perf_counter() - t0) * 1000, 4)
+            )
+    else:
+        # Define orchestrated pipeline steps
+        t0 = time.perf_counter()
+        stream = mention_extractor(file_path, raw_scan)
+        if ctx:
+            ctx.add_step(
+                "create_extraction_stream", round((time.perf_counter() - t0) * 1000, 4)
+            )
+
+        t0 = time.perf_counter()
+        counter = mention_counter(stream)
+        if ctx:
+            ctx.add_step(
+                "aggregate_counts", round((time.perf_counter() - t0) * 1000, 4)
+            )
 
-    t0 = time.perf_counter()
-    counter = mention_counter(stream)
     if ctx:
-        ctx.add_step("aggregate_counts", round((time.perf_counter() - t0) * 1000, 4))
         ctx.add_metric("unique_mentions", len(counter))
 
     t0 = time.perf_counter()
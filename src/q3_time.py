@@ -2,6 +2,7 @@ import time
 import polars as pl
 from src.common.utils import read_polars as extractor
 from src.common.logger import canonical_logger
+from src.common.polars_engine import resolve_engine
 
 # Modular Functional Blocks (KISS + Type Hints + Docstrings)
 
@@ -27,30 +28,43 @@ def get_top_k(lf: pl.LazyFrame, k: int) -> pl.LazyFrame:
     return lf.top_k(k, by="len")
 
 
+def build_query(file_path: str, k: int = 10) -> pl.LazyFrame:
+    """Composes the full lazy plan: top k mentioned users sorted by count and name."""
+    return (
+        extractor(file_path)
+        .pipe(mention_extractor)
+        .pipe(mention_counter)
+        .pipe(get_top_k, k=k)
+        .sort(["len", "username"], descending=[True, False])
+    )
+
+
 @canonical_logger(event_name="q3_time_execution")
-def q3_time(file_path: str, ctx=None) -> list[tuple[str, int]]:
+def q3_time(
+    file_path: str,
+    engine: str | None = None,
+    memory_budget_mb: float | None = None,
+    ctx=None,
+) -> list[tuple[str, int]]:
     """
     Computes the top 10 mentioned users using a clean LazyFrame query.
     Uses Native Typing (Polars Schema) for ultra-fast validation and Canonical Logging.
+    engine selects the Polars engine ("in-memory", "streaming" or "auto", which
+    streams when the input would not fit in memory_budget_mb).
     """
+    engine = resolve_engine(file_path, engine, memory_budget_mb)
     if ctx:
-        ctx.add_context(file_path=file_path)
+        ctx.add_context(file_path=file_path, engine=engine)
 
     # Orchestrated pipeline
     t0 = time.perf_counter()
-    query = (
-        extractor(file_path)
-        .pipe(mention_extractor)
-        .pipe(mention_counter)
-        .pipe(get_top_k, k=10)
-        .sort(["len", "username"], descending=[True, False])
-    )
+    query = build_query(file_path, 10)
     if ctx:
         ctx.add_step("build_query_plan", round((time.perf_counter() - t0) * 1000, 4))
 
     # SINGLE EXECUTION (Validation happens here at Rust level via schema)
     t0 = time.perf_counter()
-    result = query.collect()
+    result = query.collect(engine=engine)
 
     if ctx:
         ctx.add_step("execution_collect", round((time.perf_counter() - t0) * 1000, 4))
@@ -0,0 +1,154 @@
+import time
+from functools import reduce
+from collections import Counter
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+from src.common.utils import read_fused, FusedTweet
+from src.common.emoji_tokenizer import tokenize
+from src.common.logger import canonical_logger
+from src.common.polars_engine import resolve_engine
+from src.q1_memory import (
+    date_totals,
+    format_results,
+    get_top_k as q1_top_k,
+    select_dates,
+    user_ranker,
+)
+from src.q2_memory import get_top_k as q2_top_k
+from src.q3_memory import get_top_k as q3_top_k
+
+# Polars (and the q*_time plans) load only when the time strategy runs
+if TYPE_CHECKING:
+    import polars as pl
+
+
+# Modular Functional Blocks (KISS + Type Hints + Docstrings)
+
+
+def time_queries(file_path: str, k: int = 10) -> list["pl.LazyFrame"]:
+    """Builds the q1/q2/q3 lazy plans over the same NDJSON scan."""
+    from src.q1_time import build_query as q1_query
+    from src.q2_time import build_query as q2_query
+    from src.q3_time import build_query as q3_query
+
+    return [
+        q1_query(file_path, k),
+        q2_query(file_path, k),
+        q3_query(file_path, k),
+    ]
+
+
+def fused_accumulator(
+    acc: tuple[Counter, Counter, Counter], t: FusedTweet
+) -> tuple[Counter, Counter, Counter]:
+    """
+    Updates (date, username), emoji and mention counters from a single tweet.
+    Each question only counts the fields its own msgspec decoder would accept.
+    """
+    user_date_counts, emoji_counts, mention_counts = acc
+    if t.date is not None and t.user is not None and t.user.username is not None:
+        user_date_counts[(t.date[:10], t.user.username)] += 1
+    if t.content is not None:
+        emoji_counts.update(tokenize(t.content))
+    if t.mentionedUsers and all(m.username is not None for m in t.mentionedUsers):
+        mention_counts.update(m.username.lower() for m in t.mentionedUsers)
+    return acc
+
+
+def fused_counter(tweets: Iterable[FusedTweet]) -> tuple[Counter, Counter, Counter]:
+    """Aggregates the three questions' counters in one pass over the stream."""
+    return reduce(fused_accumulator, tweets, (Counter(), Counter(), Counter()))
+
+
+def rank_counts(
+    user_date_counts: Counter, emoji_counts: Counter, mention_counts: Counter, k: int
+) -> dict[str, list]:
+    """Resolves the q1/q2/q3 top k rows from the three aggregated counters."""
+    top_dates = q1_top_k(date_totals(user_date_counts), k)
+    best_users_map = user_ranker(select_dates(user_date_counts, frozenset(top_dates)))
+    return {
+        "q1": format_results(top_dates, best_users_map),
+        "q2": q2_top_k(emoji_counts, k),
+        "q3": q3_top_k(mention_counts, k),
+    }
+
+
+def run_time(
+    file_path: str, k: int = 10, engine: str = "in-memory", ctx=None
+) -> dict[str, list]:
+    """Executes the three Polars plans together so the file is parsed only once."""
+    import polars as pl
+
+    t0 = time.perf_counter()
+    queries = time_queries(file_path, k)
+    if ctx:
+        ctx.add_step("build_query_plans", round((time.perf_counter() - t0) * 1000, 4))
+
+    # SINGLE EXECUTION: comm_subplan_elim caches the shared NDJSON scan
+    t0 = time.perf_counter()
+    frames = pl.collect_all(queries, engine=engine)
+    if ctx:
+        ctx.add_step(
+            "execution_collect_all", round((time.perf_counter() - t0) * 1000, 4)
+        )
+
+    return {q: list(frame.iter_rows()) for q, frame in zip(("q1", "q2", "q3"), frames)}
+
+
+def run_memory(file_path: str, k: int = 10, ctx=None) -> dict[str, list]:
+    """Streams the file once with msgspec and resolves the three rankings."""
+    t0 = time.perf_counter()
+    user_date_counts, emoji_counts, mention_counts = fused_counter(
+        read_fused(file_path)
+    )
+    if ctx:
+        ctx.add_step("aggregate_counts", round((time.perf_counter() - t0) * 1000, 4))
+        ctx.add_metric("unique_user_dates", len(user_date_counts))
+        ctx.add_metric("unique_emojis", len(emoji_counts))
+        ctx.add_metric("unique_mentions", len(mention_counts))
+
+    t0 = time.perf_counter()
+    result = rank_counts(user_date_counts, emoji_counts, mention_counts, k)
+    if ctx:
+        ctx.add_step("rank_results", round((time.perf_counter() - t0) * 1000, 4))
+
+    return result
+
+
+STRATEGIES = {
+    "time": run_time,
+    "memory": run_memory,
+}
+
+
+@canonical_logger(event_name="run_all_execution")
+def run_all(
+    file_path: str,
+    strategy: str = "time",
+    engine: str | None = None,
+    memory_budget_mb: float | None = None,
+    ctx=None,
+) -> dict[str, list]:
+    """
+    Answers q1, q2 and q3 (top 10 each) from a single read of the input file.
+    Returns a dict keyed by question with the same rows as the individual functions.
+    engine and memory_budget_mb pick the Polars engine of the time strategy.
+    """
+    runner = STRATEGIES.get(strategy)
+    if runner is None:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    if ctx:
+        ctx.add_context(file_path=file_path, strategy=strategy)
+
+    options = {}
+    if strategy == "time":
+        options["engine"] = resolve_engine(file_path, engine, memory_budget_mb)
+        if ctx:
+            ctx.add_context(engine=options["engine"])
+
+    result = runner(file_path, 10, ctx=ctx, **options)
+    if ctx:
+        ctx.add_metric("output_rows", sum(len(rows) for rows in result.values()))
+
+    return result
@@ -107,6 +107,11 @@ resource "google_cloudfunctions2_function" "tweet_processor" {
     max_instance_count = 10
     available_memory   = "1Gi"
     timeout_seconds    = 540
+    environment_variables = {
+      # strategy=time streams inputs whose in-memory plan would not fit
+      POLARS_ENGINE           = "auto"
+      POLARS_MEMORY_BUDGET_MB = "512"
+    }
     ingress_settings               = "ALLOW_ALL"
     all_traffic_on_latest_revision = true
   }
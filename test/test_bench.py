@@ -0,0 +1,218 @@
+import os
+import json
+import pytest
+
+from src.bench.__main__ import main
+from src.bench.compare import compare_runs
+from src.bench.datasets import ensure_dataset, write_dataset
+from src.bench.runner import run_once
+from src.bench.scaling import (
+    memory_tier,
+    parallelism,
+    run_scaling,
+    scaling_curves,
+    write_curves,
+)
+from src.bench.stats import compare_samples, permutation_pvalue
+from src.bench.synthetic import (
+    SyntheticSpec,
+    ZipfSampler,
+    generate_lines,
+    parse_size,
+    write_synthetic,
+)
+from src.common.emoji_tokenizer import tokenize
+from src.q1_memory import q1_memory
+from src.q1_time import q1_time
+from src.q2_memory import q2_memory
+from src.q2_time import q2_time
+from src.q3_memory import q3_memory
+from src.q3_time import q3_time
+
+# --- 1. Configuration & Scenarios ---
+
+FAST = [1.00, 1.02, 0.98, 1.01, 0.99]
+SLOW = [1.30, 1.32, 1.28, 1.31, 1.29]
+
+# (baseline, current, expected regression)
+COMPARE_SCENARIOS = [
+    (FAST, SLOW, True),  # clear +30%
+    (FAST, FAST, False),  # identical
+    (SLOW, FAST, False),  # improvement
+    (FAST, [x * 1.05 for x in FAST], False),  # significant but under threshold
+    ([1.0, 1.0, 1.0], [1.3, 1.3, 1.3], False),  # 3 vs 3 can never reach p < 0.05
+]
+
+SIZE_SCENARIOS = [("100MB", 10**8), ("50GB", 5 * 10**10), ("1.5kb", 1500), (42, 42)]
+
+TIER_SCENARIOS = [(100, "256Mi"), (300, "512Mi"), (900, "2Gi"), (40_000, None)]
+
+ENGINE_PAIRS = [(q1_time, q1_memory), (q2_time, q2_memory), (q3_time, q3_memory)]
+
+
+def results_file(tmp_path, name, samples):
+    data = {
+        "meta": {"machine": "x86_64", "cpu_count": 1},
+        "results": {"q1_time/tiny": {"time_s": samples, "peak_rss_mb": [50.0] * 5}},
+    }
+    path = tmp_path / name
+    path.write_text(json.dumps(data))
+    return str(path), data
+
+
+# --- 2. The Driver Test Functions ---
+
+
+def test_dataset_is_deterministic(tmp_path):
+    a, b = tmp_path / "a.json", tmp_path / "b.json"
+    write_dataset(str(a), 500, seed=7)
+    write_dataset(str(b), 500, seed=7)
+    assert a.read_bytes() == b.read_bytes()
+    write_dataset(str(b), 500, seed=8)
+    assert a.read_bytes() != b.read_bytes()
+
+
+def test_dataset_is_cached(tmp_path):
+    path = ensure_dataset(str(tmp_path), "tiny")
+    mtime = os.path.getmtime(path)
+    assert ensure_dataset(str(tmp_path), "tiny") == path
+    assert os.path.getmtime(path) == mtime
+    assert len(q1_memory(path)) == 10
+
+
+def test_permutation_pvalue_exact():
+    # Fully separated 5 vs 5: only 1 of the 252 splits is as extreme
+    assert permutation_pvalue(FAST, SLOW) == pytest.approx(1 / 252)
+    assert permutation_pvalue(SLOW, FAST) == 1.0
+
+
+@pytest.mark.parametrize("baseline, current, expected", COMPARE_SCENARIOS)
+def test_compare_samples(baseline, current, expected):
+    assert compare_samples(baseline, current, 0.10, 0.05)["regression"] is expected
+
+
+def test_compare_runs_checks_time_and_memory(tmp_path):
+    _, baseline = results_file(tmp_path, "base.json", FAST)
+    _, current = results_file(tmp_path, "new.json", SLOW)
+    rows = {row["metric"]: row for row in compare_runs(baseline, current)}
+    assert rows["time_s"]["regression"] and not rows["peak_rss_mb"]["regression"]
+
+
+def test_cli_compare_exit_code(tmp_path, capsys):
+    base, _ = results_file(tmp_path, "base.json", FAST)
+    slow, _ = results_file(tmp_path, "slow.json", SLOW)
+    assert main(["compare", base, base]) == 0
+    assert main(["compare", base, slow]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
+
+
+def test_run_once_isolated(tmp_path):
+    sample = run_once("q1_memory", ensure_dataset(str(tmp_path), "tiny"))
+    assert sample["time_s"] > 0
+    assert sample["peak_rss_mb"] >= sample["import_rss_mb"] > 0
+    assert "identify_top_dates" in sample["steps_ms"]
+
+
+@pytest.mark.parametrize("size, expected", SIZE_SCENARIOS)
+def test_parse_size(size, expected):
+    assert parse_size(size) == expected
+
+
+def test_zipf_sampler_skew():
+    import random
+
+    sampler = ZipfSampler(10**9, 1.2, random.Random(1))
+    samples = [sampler.sample() for _ in range(20_000)]
+    assert all(1 <= k <= 10**9 for k in samples)
+    # P(1) / P(2) = 2^1.2 ~ 2.3
+    assert 2.0 < samples.count(1) / samples.count(2) < 2.6
+
+
+def test_synthetic_stream_shape():
+    spec = SyntheticSpec(emoji_density=3.0, malformed_rate=0.1)
+    lines = [line for line, _ in zip(generate_lines(spec), range(2000))]
+    assert lines == [line for line, _ in zip(generate_lines(spec), range(2000))]
+
+    emojis = {
+        e for line in lines if b'"content"' in line for e in tokenize(line.decode())
+    }
+    assert "🇮🇳" in emojis and "👍🏽" in emojis and "🏳️‍🌈" in emojis
+    malformed = sum(not line.startswith(b'{"url"') for line in lines)
+    assert 100 < malformed < 300
+
+
+def test_synthetic_engines_agree(tmp_path):
+    path = str(tmp_path / "syn.json")
+    spec = SyntheticSpec(users=500, mention_users=200, malformed_rate=0.05)
+    stats = write_synthetic(path, spec, target_bytes=1_000_000)
+    assert stats.bytes >= 1_000_000 and stats.malformed > 0
+    for time_engine, memory_engine in ENGINE_PAIRS:
+        assert time_engine(path) == memory_engine(path)
+
+
+def test_synthetic_constant_memory(tmp_path):
+    import tracemalloc
+
+    tracemalloc.start()
+    write_synthetic(str(tmp_path / "big.json"), target_bytes=8_000_000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # One write block (1 MB) plus its joined copy, not the 8 MB file
+    assert peak < 4_000_000
+
+
+@pytest.mark.parametrize("rss_mb, expected", TIER_SCENARIOS)
+def test_memory_tier(rss_mb, expected):
+    assert memory_tier(rss_mb) == expected
+
+
+def test_parallelism_per_engine():
+    env, overrides = parallelism("q2_memory", 4)
+    assert env["POLARS_MAX_THREADS"] == "4" and overrides == {"workers": 4}
+    assert int(env["BENCH_CPUS"]) <= 4
+    assert parallelism("q2_time", 4)[1] == {}
+
+
+def test_scaling_curves():
+    def row(threads, time_s, step, children=0.0):
+        return {
+            "target": "q2_memory",
+            "size_bytes": 10**8,
+            "threads": threads,
+            "time_s": time_s,
+            "throughput_mb_s": 100 / time_s,
+            "peak_rss_mb": 30.0,
+            "children_peak_rss_mb": children,
+            step: time_s * 1000,
+        }
+
+    rows = [row(1, 2.0, "step_count_ms"), row(1, 2.2, "step_count_ms")]
+    rows += [
+        row(4, 0.6, "step_parallel_ms", 50.0),
+        row(4, 0.5, "step_parallel_ms", 40.0),
+    ]
+    one, four = scaling_curves(rows)
+
+    assert (one["time_s"], one["speedup"], one["step_count_ms"]) == (2.1, 1.0, 2100)
+    assert four["speedup"] == pytest.approx(2.1 / 0.55)
+    assert "step_count_ms" not in four
+    # Parent plus 4 workers at the largest worker peak
+    assert four["instance_rss_mb"] == 30.0 + 4 * 50.0
+    assert four["memory_tier"] == "512Mi"
+
+
+def test_run_scaling_writes_curves(tmp_path):
+    rows = run_scaling(
+        ["q3_memory"],
+        [200_000],
+        [1],
+        repeats=1,
+        data_dir=str(tmp_path),
+        log=lambda msg: None,
+    )
+    csv_path, json_path = write_curves(rows, str(tmp_path / "curves"), meta={})
+    header = open(csv_path).readline().strip().split(",")
+    assert header[:3] == ["target", "size_bytes", "threads"]
+    assert "step_aggregate_counts_ms" in header
+    curve = json.load(open(json_path))["curves"][0]
+    assert curve["size_bytes"] >= 200_000 and curve["throughput_mb_s"] > 0
@@ -0,0 +1,16 @@
+import pytest
+import subprocess
+import sys
+
+# --- 1. Configuration & Scenarios ---
+
+# Heavy engines/clients that only the route using them may load
+LAZY_MODULES = ["polars", "msgspec", "google.cloud.storage", "structlog", "psutil"]
+
+# --- 2. The Driver Test Function ---
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_import_main_is_lazy(module):
+    probe = f"import sys, main; sys.exit({module!r} in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", probe]).returncode == 0
@@ -1,13 +1,42 @@
+import io
+import gzip
 import pytest
+import zstandard
 import polars as pl
 import json
-from src.common.utils import read_polars, read_orjson
+from collections import Counter
+from src.common.utils import (
+    read_polars,
+    read_orjson,
+    read_msgspec,
+    read_msgspec_batches,
+    split_lines,
+    byte_ranges,
+    mmap_lines,
+    parallel_map_reduce,
+    tweet_decoder,
+    expand_inputs,
+    input_objects,
+    is_multi_input,
+    decompress_chunks,
+    scan_compressed_ndjson,
+    mention_decoder,
+    raw_blocks,
+    decode_blocks,
+    read_raw_batches,
+    RAW_BLOCK_SIZE,
+)
 
 # --- 1. Configuration & Scenarios ---
 
 TARGET_FUNCS = [
     ("polars", read_polars),
     ("orjson", read_orjson),
+    ("mmap", lambda fp: read_msgspec(fp, use_mmap=True)),
+    (
+        "batches",
+        lambda fp: [r for b in read_msgspec_batches(fp, batch_size=2) for r in b],
+    ),
 ]
 
 TEST_SCENARIOS = {
@@ -17,9 +46,12 @@ TEST_SCENARIOS = {
             {"date": "2021-02-13", "content": "B", "user": {"username": "u2"}},
         ],
         "validators": {
-            "polars": lambda res: res.collect().height == 2
-            and res.collect_schema()["date"] == pl.String,
+            "polars": lambda res: (
+                res.collect().height == 2 and res.collect_schema()["date"] == pl.String
+            ),
             "orjson": lambda res: len(list(res)) == 2,
+            "mmap": lambda res: len(list(res)) == 2,
+            "batches": lambda res: len(list(res)) == 2,
         },
     },
     "corrupt_lines": {
@@ -27,6 +59,8 @@ TEST_SCENARIOS = {
         "validators": {
             "polars": lambda res: True,  # Logic moved to try-except in driver
             "orjson": lambda res: len(list(res)) == 2,
+            "mmap": lambda res: len(list(res)) == 2,
+            "batches": lambda res: len(list(res)) == 2,
         },
     },
     "empty_file": {
@@ -35,6 +69,8 @@ TEST_SCENARIOS = {
         "validators": {
             "polars": lambda res: res.collect().height == 0,
             "orjson": lambda res: list(res) == [],
+            "mmap": lambda res: list(res) == [],
+            "batches": lambda res: list(res) == [],
         },
     },
     "null_values": {
@@ -42,6 +78,8 @@ TEST_SCENARIOS = {
         "validators": {
             "polars": lambda res: res.collect()["user"][0] is None,
             "orjson": lambda res: list(res)[0]["user"] is None,
+            "mmap": lambda res: list(res)[0]["user"] is None,
+            "batches": lambda res: list(res)[0]["user"] is None,
         },
     },
 }
@@ -94,3 +132,451 @@ def test_engine_processing(json_factory, func_name, func_impl, scenario_name):
         assert validator(result), (
             f"Validator failed for {func_name} in case {scenario_name}"
         )
+
+
+# --- 4. Streaming GCS Reader ---
+
+SPLIT_SCENARIOS = {
+    "aligned_chunks": ([b'{"a": 1}\n', b'{"a": 2}\n'], [b'{"a": 1}', b'{"a": 2}']),
+    "line_across_chunks": (
+        [b'{"a"', b': 1}\n{"a', b'": 2}\n'],
+        [b'{"a": 1}', b'{"a": 2}'],
+    ),
+    "no_trailing_newline": ([b'{"a": 1}\n{"a": 2}'], [b'{"a": 1}', b'{"a": 2}']),
+    "one_byte_chunks": (
+        [bytes([b]) for b in b'{"a": 1}\n{"a": 2}\n'],
+        [b'{"a": 1}', b'{"a": 2}'],
+    ),
+    "empty": ([], []),
+}
+
+
+@pytest.mark.parametrize("scenario_name", SPLIT_SCENARIOS.keys())
+def test_split_lines(scenario_name):
+    chunks, expected = SPLIT_SCENARIOS[scenario_name]
+    assert list(split_lines(chunks)) == expected
+
+
+class FakeBlob:
+    """Stand-in for a GCS blob: records the chunk size and every read size."""
+
+    def __init__(self, payload: bytes):
+        self.payload = payload
+        self.reads = []
+
+    def open(self, mode, chunk_size=None):
+        stream = io.BytesIO(self.payload)
+        original_read = stream.read
+
+        def read(size=-1):
+            self.reads.append(size)
+            return original_read(size)
+
+        stream.read = read
+        return stream
+
+
+def test_read_msgspec_streams_gcs(monkeypatch):
+    payload = b'{"date": "A"}\n{"date": "BROKEN \n{"date": "B"}\n' * 50
+    blob = FakeBlob(payload)
+    monkeypatch.setattr("src.common.utils._get_gcs_blob", lambda path: blob)
+
+    records = list(read_msgspec("gs://bucket/input/file.json", buffer_size=16))
+
+    assert [r["date"] for r in records] == ["A", "B"] * 50
+    assert all(size == 16 for size in blob.reads)
+    assert len(blob.reads) > len(payload) // 16
+
+
+# --- 5. Byte-Range Parallel Map-Reduce ---
+
+
+def count_dates(batches):
+    """Module-level mapper (picklable) used by the parallel tests."""
+    return Counter(t.date for batch in batches for t in batch)
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 50])
+def test_byte_ranges_aligned(json_factory, parts):
+    content = "".join(f'{{"date": "2021-02-{i % 28 + 1:02d}"}}\n' for i in range(20))
+    file_path = json_factory("ranges.json", content)
+
+    ranges = byte_ranges(file_path, parts)
+    lines = [line for a, b in ranges for line in mmap_lines(file_path, a, b)]
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(content)
+    assert all(a < b for a, b in ranges)
+    assert b"".join(lines).decode() == content
+
+
+def test_mmap_lines_unaligned_ranges(json_factory):
+    content = "".join(f'{{"date": "2021-02-{i + 1:02d}"}}\n' for i in range(10))
+    file_path = json_factory("unaligned.json", content)
+    size = len(content)
+
+    # Arbitrary cuts (date index blocks): each line is read once, by the range it
+    # starts in, never as a fragment
+    for step in [1, 7, 19, 20, 64]:
+        cuts = list(range(0, size, step)) + [size]
+        lines = [
+            bytes(line)
+            for a, b in zip(cuts, cuts[1:])
+            for line in mmap_lines(file_path, a, b)
+        ]
+        assert b"".join(lines).decode() == content
+        assert all(line.startswith(b"{") for line in lines)
+
+
+@pytest.mark.parametrize("workers", [1, 2, 4])
+def test_parallel_map_reduce_matches_sequential(json_factory, workers):
+    content = "".join(
+        f'{{"date": "2021-02-{i % 5 + 1:02d}", "user": {{"username": "u{i}"}}}}\n'
+        + ('{"date": "BROKEN \n' if i % 3 == 0 else "")
+        for i in range(30)
+    )
+    file_path = json_factory("parallel.json", content)
+
+    result = parallel_map_reduce(file_path, "tweet", count_dates, workers)
+    expected = Counter(t.date for t in read_msgspec(file_path, decoder=tweet_decoder))
+
+    assert result == expected
+    assert list(result) == list(expected)  # Same first-seen order (tie-breaking)
+
+
+def test_parallel_map_reduce_empty_file(json_factory):
+    file_path = json_factory("empty_parallel.json", "")
+    assert parallel_map_reduce(file_path, "tweet", count_dates, 4) == Counter()
+
+
+# --- 6. Batched Decoding ---
+
+BATCH_CONTENT = (
+    '{"date": "A"}\n'
+    '{"date": "B", "tags": [1\n'  # Invalid alone, valid if merged with the next line
+    ",2]}\n"
+    "\n"
+    '{"date": "C"}\n'
+    '{"date": "D"}'
+)
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, 256])
+def test_read_msgspec_batches_matches_lines(json_factory, batch_size):
+    file_path = json_factory("batches.json", BATCH_CONTENT)
+
+    batches = list(read_msgspec_batches(file_path, batch_size=batch_size))
+
+    assert [r for b in batches for r in b] == list(read_msgspec(file_path))
+    assert [r["date"] for b in batches for r in b] == ["A", "C", "D"]
+    assert all(len(b) <= batch_size for b in batches)
+
+
+# Two corrupt lines that cancel out when lines are merged: one holding two tweets
+# and one tweet split over two lines. Only "D" is a valid line
+MISALIGNED_PREFIX = {
+    "space": '{"date": "A", "user": {"username": "a"}} '
+    '{"date": "B", "user": {"username": "b"}}\n',
+    "comma": '{"date": "A", "user": {"username": "a"}}, '
+    '{"date": "B", "user": {"username": "b"}}\n',
+}
+MISALIGNED_SPLIT = {
+    "after_key": '{"date": "C", "user":\n{"username": "c"}}\n',
+    "array_value": '{"date": "C", "user": {"username": "c"}, "tags": [1\n2]}\n',
+    "member": '{"date": "C"\n"user": {"username": "c"}}\n',
+    "string": '{"date": "C\n", "user": {"username": "c"}}\n',
+}
+MISALIGNED_SCENARIOS = {
+    f"{prefix}_{split}": MISALIGNED_PREFIX[prefix]
+    + MISALIGNED_SPLIT[split]
+    + '{"date": "D", "user": {"username": "d"}}\n'
+    for prefix in MISALIGNED_PREFIX
+    for split in MISALIGNED_SPLIT
+}
+
+
+@pytest.mark.parametrize("batch_size", [1, 4, 256])
+@pytest.mark.parametrize("scenario_name", MISALIGNED_SCENARIOS.keys())
+def test_read_msgspec_batches_misaligned_lines(json_factory, scenario_name, batch_size):
+    content = MISALIGNED_SCENARIOS[scenario_name] + "\n"
+    file_path = json_factory("misaligned.json", content)
+
+    batches = read_msgspec_batches(file_path, tweet_decoder, batch_size=batch_size)
+    records = [r for b in batches for r in b]
+
+    assert records == list(read_msgspec(file_path, tweet_decoder))
+    assert [r.date for r in records] == ["D"]
+
+
+# --- 7. Multi-File Inputs ---
+
+MULTI_PARTS = {
+    "part-0.json": "".join(
+        f'{{"date": "2021-02-0{i % 3 + 1}", "user": {{"username": "u{i}"}}}}\n'
+        for i in range(10)
+    ),
+    "part-1.json": '{"date": "BROKEN \n{"date": "2021-02-09"}\n',
+    "part-2.json": '{"date": "2021-02-01"}',  # no trailing newline
+}
+
+MULTI_SCENARIOS = {
+    "directory": lambda d: d,
+    "glob": lambda d: f"{d}/part-*.json",
+    "recursive_glob": lambda d: f"{d}/**/*.json",
+}
+
+GCS_SCENARIOS = [
+    ("gs://bucket/input/", ["input/a.json", "input/b.json", "input/sub/c.json"]),
+    ("gs://bucket/input/*.json", ["input/a.json", "input/b.json", "input/sub/c.json"]),
+    ("gs://bucket/input/a*", ["input/a.json"]),
+    ("gs://bucket/input/?.json", ["input/a.json", "input/b.json"]),
+]
+
+
+class FakeListedBlob:
+    def __init__(self, name):
+        self.name, self.size, self.generation = name, len(name), hash(name) % 1000
+
+
+class FakeListingClient:
+    """list_blobs over a fixed bucket (unordered, with a folder placeholder)."""
+
+    names = ["input/b.json", "input/", "input/sub/c.json", "input/a.json", "other.json"]
+
+    def list_blobs(self, bucket_name, prefix=""):
+        return [FakeListedBlob(n) for n in self.names if n.startswith(prefix)]
+
+
+@pytest.fixture
+def multi_dir(tmp_path):
+    d = tmp_path / "input"
+    d.mkdir()
+    for name, content in MULTI_PARTS.items():
+        (d / name).write_text(content)
+    (d / ".hidden.json").write_text('{"date": "HIDDEN"}\n')
+    (d / "_tmp").mkdir()
+    return d
+
+
+@pytest.mark.parametrize("scenario_name", MULTI_SCENARIOS.keys())
+def test_expand_inputs(multi_dir, scenario_name):
+    file_path = MULTI_SCENARIOS[scenario_name](str(multi_dir))
+    assert is_multi_input(file_path)
+    assert expand_inputs(file_path) == [str(multi_dir / n) for n in MULTI_PARTS]
+
+
+def test_expand_inputs_single_and_missing(tmp_path):
+    # A single path is returned untouched (read errors surface when opening it)
+    assert expand_inputs("gs://bucket/input/file.json") == [
+        "gs://bucket/input/file.json"
+    ]
+    with pytest.raises(FileNotFoundError):
+        expand_inputs(str(tmp_path / "*.json"))
+
+
+@pytest.mark.parametrize("file_path, expected", GCS_SCENARIOS)
+def test_expand_gcs_inputs(monkeypatch, file_path, expected):
+    monkeypatch.setattr(
+        "src.common.gcs_client.get_storage_client", lambda: FakeListingClient()
+    )
+    assert expand_inputs(file_path) == [f"gs://bucket/{n}" for n in expected]
+    assert [size for _, size, _ in input_objects(file_path)] == [
+        len(n) for n in expected
+    ]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 5])
+def test_multi_input_matches_concatenation(multi_dir, tmp_path, workers):
+    joined = tmp_path / "joined.json"
+    joined.write_text(
+        "".join(c if c.endswith("\n") else c + "\n" for c in MULTI_PARTS.values())
+    )
+
+    result = parallel_map_reduce(str(multi_dir), "tweet", count_dates, workers)
+    expected = Counter(t.date for t in read_msgspec(str(joined), decoder=tweet_decoder))
+
+    assert result == expected and list(result) == list(expected)
+    assert list(read_msgspec(str(multi_dir))) == list(read_msgspec(str(joined)))
+
+
+def test_read_polars_multi_input(multi_dir):
+    clean = multi_dir / "part-1.json"
+    clean.write_text('{"date": "2021-02-09"}\n')  # polars rejects corrupt lines
+    assert read_polars(str(multi_dir)).collect().height == 10 + 1 + 1
+
+
+# --- 8. Compressed Inputs (gzip / zstd) ---
+
+COMPRESSORS = {
+    "gzip": gzip.compress,
+    "zstd": zstandard.ZstdCompressor().compress,
+    # pigz / concatenated archives: several gzip members in one file
+    "gzip_members": lambda data: b"".join(
+        gzip.compress(data[i : i + 100]) for i in range(0, len(data), 100)
+    ),
+    "zstd_frames": lambda data: b"".join(
+        zstandard.ZstdCompressor().compress(data[i : i + 100])
+        for i in range(0, len(data), 100)
+    ),
+}
+
+COMPRESSED_CONTENT = "".join(
+    json.dumps({"date": f"2021-02-{i % 28 + 1:02d}", "user": {"username": f"u{i}"}})
+    + "\n"
+    for i in range(40)
+)
+
+
+@pytest.mark.parametrize("func_name, func_impl", TARGET_FUNCS)
+@pytest.mark.parametrize("compressor", COMPRESSORS.keys())
+def test_compressed_input_matches_plain(tmp_path, func_name, func_impl, compressor):
+    plain = tmp_path / "tweets.json"
+    plain.write_text(COMPRESSED_CONTENT)
+    packed = tmp_path / "tweets.json.gz"
+    packed.write_bytes(COMPRESSORS[compressor](COMPRESSED_CONTENT.encode()))
+
+    result, expected = func_impl(str(packed)), func_impl(str(plain))
+    if func_name == "polars":
+        result, expected = result.collect(), expected.collect()
+        assert result.equals(expected)
+    else:
+        assert list(result) == list(expected)
+
+
+def test_read_msgspec_streams_compressed_gcs(monkeypatch):
+    payload = COMPRESSED_CONTENT.encode() * 20
+    blob = FakeBlob(gzip.compress(payload))
+    monkeypatch.setattr("src.common.utils._get_gcs_blob", lambda path: blob)
+
+    records = list(read_msgspec("gs://bucket/input/file.json.gz", buffer_size=64))
+
+    assert len(records) == 40 * 20
+    assert all(size == 64 for size in blob.reads)
+
+
+def test_decompress_chunks_passes_plain_through():
+    chunks = [b'{"a": 1}\n', b'{"a"', b": 2}"]
+    assert list(decompress_chunks(iter(chunks))) == chunks
+    assert list(decompress_chunks(iter([]))) == []
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_parallel_map_reduce_compressed_parts(tmp_path, workers):
+    lines = COMPRESSED_CONTENT.splitlines(keepends=True)
+    parts = tmp_path / "parts"
+    parts.mkdir()
+    for i, packed in enumerate([True, False, True]):  # plain parts are split by range
+        data = "".join(lines[i::3]).encode()
+        (parts / f"part-{i}.json").write_bytes(gzip.compress(data) if packed else data)
+
+    result = parallel_map_reduce(str(parts), "tweet", count_dates, workers)
+    expected = Counter(t.date for t in read_msgspec(str(parts), decoder=tweet_decoder))
+    assert result == expected and list(result) == list(expected)
+    assert sum(result.values()) == 40
+
+
+def test_scan_compressed_ndjson_pushdown(tmp_path):
+    packed = tmp_path / "tweets.json.zst"
+    packed.write_bytes(COMPRESSORS["zstd"](COMPRESSED_CONTENT.encode()))
+
+    lf = scan_compressed_ndjson(str(packed), block_size=64)
+    assert lf.select("date").head(5).collect().shape == (5, 1)
+    assert lf.filter(pl.col("date") == "2021-02-01").collect().height == 2
+    # Same LazyFrame per file: run_all's plans share a single decompression
+    assert scan_compressed_ndjson(str(packed), block_size=64) is lf
+
+
+# --- 9. Raw Block Scan ---
+
+# Edge cases the block reader must decode exactly like the line reader
+RAW_SCAN_CORPUS = (
+    '{"date":"2021-02-12T10:00:00+00:00","user":{"username":"compact"},'
+    '"mentionedUsers":[{"username":"A"}]}\n'
+    '{"date": "2021-02-12T11:00:00+00:00", "user": {"id": 1, "username": "spaced"}, '
+    '"mentionedUsers": null}\n'
+    '{"user": {"username": "reordered"}, "mentionedUsers": [], "date": "2021-02-13"}\n'
+    '{"date": "2021-02-13", "user": {"username": "us\\u00e9r \\"q\\""}, '
+    '"content": "\\ud83d\\ude9c {\\"date\\": 1}", "mentionedUsers": [{"username": "\\u0042"}]}\n'
+    '{"quotedTweet": {"date": "2020-01-01", "user": {"username": "nested"}, '
+    '"mentionedUsers": [{"username": "inner"}]}, "date": "2021-02-14", '
+    '"user": {"username": "outer"}, "mentionedUsers": [{"username": "outer"}]}\n'
+    '{"date": "2021-02-14", "\\u0075ser": {"username": "escaped_key"}, '
+    '"mentionedUsers": null}\n'
+    '{"date": "2021-02-14", "content": "raw 🚜", "user": {"username": "utf8"}, '
+    '"mentionedUsers": [{"username": "C"}]}\r\n'
+    '{"date": "2021-02-15", "user": null, "mentionedUsers": [{"username": "D"}]}\n'
+    '{"date": null, "user": "x", "mentionedUsers": "y"}\n'
+    "[1, 2, 3]\n"
+    "\n"
+    "   \n"
+    '{"date": "2021-02-15", "user": {"username": "two"}} {"date": "2021-02-16"}\n'
+    '{"date": "2021-02-15", "user": {"username": "a"}}, {"date": "2021-02-15", '
+    '"user": {"username": "b"}}\n'
+    '{"date": "2021-02-15", "user":\n'
+    '{"username": "split"}, "mentionedUsers": null}\n'
+    '{"date": "2021-02-15", "user": {"username": "array_split"}, "tags": [1\n'
+    '2], "mentionedUsers": null}\n'
+    '{"date": "2021-02-15", "user": {"username": "member_split"}\n'
+    '"mentionedUsers": [{"username": "F"}]}\n'
+    '{"date": "2021-02-15", "user": {"username": "cut"}, "mentionedUsers": [{"user\n'
+    "x!@#$ not json\n"
+    '{"date": "2021-02-16", "user": {"username": "last"}, '
+    '"mentionedUsers": [{"username": "E"}]}'
+)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, RAW_BLOCK_SIZE])
+@pytest.mark.parametrize("decoder", [tweet_decoder, mention_decoder])
+def test_decode_blocks_matches_lines(json_factory, block_size, decoder):
+    file_path = json_factory("corpus.json", RAW_SCAN_CORPUS)
+
+    blocks = list(raw_blocks(file_path, block_size=block_size))
+    records = [r for b in decode_blocks(blocks, decoder) for r in b]
+    expected = list(read_msgspec(file_path, decoder))
+
+    assert b"".join(blocks) == RAW_SCAN_CORPUS.encode()
+    assert all(b.endswith(b"\n") for b in blocks[:-1])
+    assert records == expected and len(records) >= 8
+
+
+@pytest.mark.parametrize("scenario_name", MISALIGNED_SCENARIOS.keys())
+def test_decode_blocks_misaligned_lines(json_factory, scenario_name):
+    # One block whose record count matches its line count, but not line by line
+    content = MISALIGNED_SCENARIOS[scenario_name]
+    file_path = json_factory("misaligned.json", content)
+
+    records = [r for b in read_raw_batches(file_path, tweet_decoder) for r in b]
+
+    assert records == list(read_msgspec(file_path, tweet_decoder))
+    assert [r.date for r in records] == ["D"]
+
+
+def test_raw_blocks_ranges_match_mmap_lines(json_factory):
+    file_path = json_factory("corpus.json", RAW_SCAN_CORPUS)
+    size = len(RAW_SCAN_CORPUS.encode())
+
+    # Line-aligned (byte_ranges) and arbitrary cuts (date index blocks)
+    for a, b in byte_ranges(file_path, 3) + [(0, 1), (5, 200), (200, size)]:
+        raw = b"".join(raw_blocks(file_path, a, b, block_size=16))
+        assert raw == b"".join(mmap_lines(file_path, a, b))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_map_reduce_raw_scan(json_factory, workers):
+    file_path = json_factory("corpus.json", RAW_SCAN_CORPUS * 3)
+    ranges = [(0, 300), (900, 1400)]
+
+    for kwargs in ({}, {"ranges": ranges}):
+        result = parallel_map_reduce(
+            file_path, "tweet", count_dates, workers, raw_scan=True, **kwargs
+        )
+        expected = parallel_map_reduce(file_path, "tweet", count_dates, 1, **kwargs)
+        assert result == expected and list(result) == list(expected)
+
+
+def test_read_raw_batches_compressed(tmp_path):
+    packed = tmp_path / "tweets.json.zst"
+    packed.write_bytes(COMPRESSORS["zstd_frames"](COMPRESSED_CONTENT.encode()))
+
+    records = [r for b in read_raw_batches(str(packed), tweet_decoder) for r in b]
+    assert records == list(read_msgspec(str(packed), decoder=tweet_decoder))
+    assert len(records) == 40
@@ -0,0 +1,199 @@
+import os
+import gzip
+import json
+import pytest
+import msgspec
+from collections import Counter
+
+from src.common import date_index
+from src.common.date_index import (
+    build_index,
+    decode_with_offsets,
+    ensure_index,
+    load_index,
+    read_dates,
+    save_index,
+    sidecar_path,
+)
+from src.common.utils import (
+    expand_inputs,
+    mmap_lines,
+    parallel_map_reduce,
+    read_msgspec,
+    split_ranges,
+    tweet_decoder,
+)
+from src.q1_memory import count_dates, count_user_dates, q1_memory, date_counter
+
+# Small blocks so a few KB of tweets span many of them
+BLOCK_SIZE = 256
+
+# --- 1. Configuration & Scenarios ---
+
+
+def tweets(order):
+    """60 tweets over 6 days: ordered by date (like real dumps) or interleaved."""
+    rows = [
+        {
+            "date": f"2021-02-{10 + i % 6:02d}T10:00:00+00:00",
+            "user": {"username": f"u{i % 4}"},
+        }
+        for i in range(60)
+    ]
+    return sorted(rows, key=lambda r: r["date"]) if order == "sorted" else rows
+
+
+TEST_SCENARIOS = {
+    "sorted": "\n".join(json.dumps(t) for t in tweets("sorted")) + "\n",
+    "interleaved": "\n".join(json.dumps(t) for t in tweets("interleaved")) + "\n",
+    "corrupt_lines": '{"date": "2021-02-10", "user": {"username": "a"}}\n'
+    '{"date": "BROKEN \n'
+    '{"date": null}\n'
+    * 30
+    + '{"date": "2021-02-11", "user": {"username": "b"}}',  # no trailing newline
+    # Two tweets on one line next to a tweet split over two lines
+    "misaligned_lines": '{"date": "2021-02-10", "user": {"username": "a"}} '
+    '{"date": "2021-02-11", "user": {"username": "b"}}\n'
+    '{"date": "2021-02-12", "user":\n'
+    '{"username": "c"}}\n'
+    '{"date": "2021-02-13", "user": {"username": "d"}}\n',
+    # Comma-separated tweets next to a tweet split at a value or member boundary
+    "misaligned_array_split": '{"date": "2021-02-10", "user": {"username": "a"}}, '
+    '{"date": "2021-02-11", "user": {"username": "b"}}\n'
+    '{"date": "2021-02-12", "user": {"username": "c"}, "tags": [1\n'
+    "2]}\n"
+    '{"date": "2021-02-13", "user": {"username": "d"}}\n',
+    "misaligned_member_split": '{"date": "2021-02-10", "user": {"username": "a"}}, '
+    '{"date": "2021-02-11", "user": {"username": "b"}}\n'
+    '{"date": "2021-02-12"\n'
+    '"user": {"username": "c"}}\n'
+    '{"date": "2021-02-13", "user": {"username": "d"}}\n',
+    "empty": "",
+}
+
+# --- 2. Shared Fixtures ---
+
+
+@pytest.fixture
+def json_factory(tmp_path):
+    def _create(filename, content):
+        p = tmp_path / filename
+        p.write_text(content, encoding="utf-8")
+        return str(p)
+
+    return _create
+
+
+# --- 3. The Driver Test Functions ---
+
+
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_index_matches_full_scan(json_factory, scenario_name):
+    file_path = json_factory(f"{scenario_name}.json", TEST_SCENARIOS[scenario_name])
+    index = build_index(file_path, BLOCK_SIZE)
+
+    # Same counts in the same first-seen order (most_common ties included)
+    full = date_counter(file_path)
+    assert list(Counter(index.counts).items()) == list(full.items())
+
+    for date in index.counts:
+        indexed = Counter()
+        for batch in parallel_map_reduce(
+            file_path, "tweet", lambda b: list(b), ranges=index.ranges([date])
+        ):
+            indexed.update(t.date[:10] for t in batch if t.date[:10] == date)
+        assert indexed[date] == full[date]
+
+
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_decode_with_offsets_matches_lines(json_factory, scenario_name):
+    file_path = json_factory(f"{scenario_name}.json", TEST_SCENARIOS[scenario_name])
+
+    expected, position = [], 0
+    for line in mmap_lines(file_path):
+        try:
+            expected.append((position, tweet_decoder.decode(line)))
+        except msgspec.DecodeError:
+            pass
+        position += len(line)
+
+    assert list(decode_with_offsets(mmap_lines(file_path))) == expected
+
+
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_index_matches_line_reader(json_factory, scenario_name):
+    file_path = json_factory(f"{scenario_name}.json", TEST_SCENARIOS[scenario_name])
+    index = build_index(file_path, BLOCK_SIZE)
+
+    lines = Counter(t.date[:10] for t in read_msgspec(file_path, tweet_decoder))
+
+    assert list(Counter(index.counts).items()) == list(lines.items())
+    assert list(date_counter(file_path).items()) == list(lines.items())
+
+
+def test_sorted_file_rescans_only_its_blocks(json_factory):
+    file_path = json_factory("sorted.json", TEST_SCENARIOS["sorted"])
+    index = build_index(file_path, BLOCK_SIZE)
+
+    assert all(len(runs) == 1 for runs in index.blocks.values())
+    scanned = sum(b - a for a, b in index.ranges(["2021-02-10"]))
+    assert scanned < os.path.getsize(file_path) / 3
+
+
+def test_sidecar_reused_and_invalidated(json_factory):
+    file_path = json_factory("tweets.json", TEST_SCENARIOS["interleaved"])
+
+    index, status = ensure_index(file_path)
+    assert status == "built" and os.path.exists(sidecar_path(file_path))
+    # Hidden sidecar: a directory input does not pick it up as a tweet file
+    assert expand_inputs(os.path.dirname(file_path)) == [file_path]
+
+    date_index._loaded.clear()  # a cold process reads the sidecar
+    assert ensure_index(file_path) == (index, "hit")
+
+    with open(file_path, "a") as f:
+        f.write('{"date": "2021-03-01", "user": {"username": "new"}}\n')
+    assert load_index(file_path) is None
+    index, status = ensure_index(file_path)
+    assert status == "built" and index.counts["2021-03-01"] == 1
+
+
+def test_index_unavailable_inputs(json_factory, tmp_path):
+    packed = tmp_path / "tweets.json.gz"
+    packed.write_bytes(gzip.compress(TEST_SCENARIOS["sorted"].encode()))
+    file_path = json_factory("tweets.json", TEST_SCENARIOS["sorted"])
+
+    for path in [str(packed), str(tmp_path), "gs://bucket/tweets.json"]:
+        assert ensure_index(path) == (None, "unavailable")
+    # Without an index read_dates falls back to reading every line
+    assert sum(len(b) for b in read_dates(file_path, ["2021-02-10"])) == 60
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_q1_memory_with_index(json_factory, workers):
+    file_path = json_factory("tweets.json", TEST_SCENARIOS["interleaved"])
+    save_index(file_path, build_index(file_path, BLOCK_SIZE))
+
+    assert q1_memory(file_path, use_index=True, workers=workers) == q1_memory(file_path)
+
+
+@pytest.mark.parametrize("parts", [1, 2, 3, 10])
+def test_split_ranges(parts):
+    ranges = [(0, 10), (20, 25), (30, 60), (70, 71), (80, 100)]
+    groups = split_ranges(ranges, parts)
+
+    assert [r for group in groups for r in group] == ranges
+    assert 1 <= len(groups) <= parts
+
+
+def test_read_dates_skips_other_blocks(json_factory):
+    file_path = json_factory("sorted.json", TEST_SCENARIOS["sorted"])
+    save_index(file_path, build_index(file_path, BLOCK_SIZE))
+    target = frozenset(["2021-02-12"])
+
+    indexed = list(read_dates(file_path, target))
+    full = list(parallel_map_reduce(file_path, "tweet", lambda b: list(b)))
+
+    assert sum(map(len, indexed)) < sum(map(len, full))
+    assert count_user_dates(indexed, target) == count_user_dates(full, target)
+    assert count_dates(indexed)["2021-02-12"] == 10
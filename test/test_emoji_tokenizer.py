@@ -0,0 +1,90 @@
+import pytest
+import json
+import polars as pl
+
+from src.common.emoji_tokenizer import tokenize, tokenize_many
+from src.common.utils import read_polars
+from src.q2_time import (
+    EMOJI_REGEX,
+    emoji_extractor as ee_time,
+    emoji_counter as ec_time,
+)
+from src.q2_memory import emoji_extractor as ee_mem, emoji_counter as ec_mem, q2_memory
+
+# --- 1. Configuration & Scenarios ---
+
+# Shared corpus: every text must yield exactly the tokens of q2_time's regex
+EMOJI_CORPUS = {
+    "empty": "",
+    "ascii_only": "Farmers protest #FarmersProtest @user 100%",
+    "non_ascii_no_emoji": "किसान आंदोलन जारी है — ñandú «café»",
+    "variation_selector": "I love ✈️ and ❤️",
+    "skin_tone": "👍🏽 👍🏻👍",
+    "lone_modifier": "🏽 x🏿",
+    "flags": "🇮🇳 🇮🇳🇮 🇮 x",
+    "zwj_without_fe0f": "Family: 👨‍👩‍👧‍👦",
+    "zwj_with_fe0f": "🏳️‍🌈 👩‍❤️‍👨",
+    "keycap_and_symbols": "#️⃣ 1️⃣ ©️ ® ™ ‼️ ⁉ 〰",
+    "adjacent_to_script": "किसान🌾आंदोलन✊🏾",
+    "unicode_whitespace": "🌾\u00a0🌾\u3000🌾\u2028❤\u0085✈",
+}
+
+TARGET_FUNCS = [
+    ("tokenize", lambda texts: [tokenize(t) for t in texts]),
+    ("tokenize_many", lambda texts: [tokenize_many(texts)]),
+    ("tokenize_many_single", lambda texts: [tokenize_many([t]) for t in texts]),
+]
+
+
+def expected_tokens(func_name, texts):
+    """Reference tokens from the Polars regex used by q2_time."""
+    tokens = pl.Series(texts, dtype=pl.String).str.extract_all(EMOJI_REGEX).to_list()
+    if func_name == "tokenize_many":
+        return [[token for row in tokens for token in row]]
+    return tokens
+
+
+# --- 2. Shared Fixtures ---
+
+
+@pytest.fixture
+def json_factory(tmp_path):
+    def _create(filename, content):
+        p = tmp_path / filename
+        with open(p, "w", encoding="utf-8") as f:
+            for item in content:
+                f.write(json.dumps(item) + "\n")
+        return str(p)
+
+    return _create
+
+
+# --- 3. The Driver Test Functions ---
+
+
+@pytest.mark.parametrize("func_name, func_impl", TARGET_FUNCS)
+@pytest.mark.parametrize("scenario_name", EMOJI_CORPUS.keys())
+def test_tokenizer_matches_time_regex(func_name, func_impl, scenario_name):
+    texts = [EMOJI_CORPUS[scenario_name]]
+    assert func_impl(texts) == expected_tokens(func_name, texts)
+
+
+@pytest.mark.parametrize("func_name, func_impl", TARGET_FUNCS)
+def test_tokenizer_matches_time_regex_on_corpus(func_name, func_impl):
+    texts = list(EMOJI_CORPUS.values())
+    assert func_impl(texts) == expected_tokens(func_name, texts)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_q2_memory_matches_q2_time(json_factory, workers):
+    data = [{"content": text} for text in EMOJI_CORPUS.values()] * 3
+    file_path = json_factory("corpus.json", data)
+
+    time_counts = dict(
+        ec_time(ee_time(read_polars(file_path), EMOJI_REGEX)).collect().iter_rows()
+    )
+    assert dict(ec_mem(ee_mem(file_path))) == time_counts
+
+    # q2_time's top_k breaks ties at the 10th place arbitrarily: rank its full counts
+    ranked = sorted(time_counts.items(), key=lambda x: (-x[1], x[0]))[:10]
+    assert q2_memory(file_path, workers=workers) == ranked
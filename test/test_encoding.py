@@ -0,0 +1,54 @@
+import pytest
+import msgspec
+import polars as pl
+from collections import Counter
+from datetime import date, datetime
+
+from src.common.encoding import encode_response, encode_result, join_encoded
+
+# --- 1. Configuration & Scenarios ---
+
+TEST_SCENARIOS = {
+    "q1_rows": (
+        [(date(2021, 2, 12), "user1"), (date(2021, 2, 13), "user2")],
+        [["2021-02-12", "user1"], ["2021-02-13", "user2"]],
+    ),
+    "q2_rows": ([("😀", 3), ("🚀", 1)], [["😀", 3], ["🚀", 1]]),
+    "datetime": ([(datetime(2021, 2, 12, 10, 30), 1)], [["2021-02-12T10:30:00", 1]]),
+    "run_all": (
+        {"q1": [(date(2021, 2, 12), "u")], "q2": [], "q3": [("u", 2)]},
+        {"q1": [["2021-02-12", "u"]], "q2": [], "q3": [["u", 2]]},
+    ),
+    "full_histogram": (Counter({"a": 3, "b": 1}), {"a": 3, "b": 1}),
+    "polars_frame": (
+        pl.DataFrame({"date": [date(2021, 2, 12)], "username": ["u"]}),
+        [["2021-02-12", "u"]],
+    ),
+    "polars_series": (pl.Series("len", [3, 1]), [3, 1]),
+    "empty": ([], []),
+}
+
+# --- 2. The Driver Test Functions ---
+
+
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_encode_result(scenario_name):
+    result, expected = TEST_SCENARIOS[scenario_name]
+    assert msgspec.json.decode(encode_result(result)) == expected
+
+
+def test_encode_result_unknown_type():
+    with pytest.raises(TypeError):
+        encode_result([object()])
+
+
+def test_encoded_parts_embedded_verbatim():
+    parts = {q: encode_result(rows) for q, rows in TEST_SCENARIOS["run_all"][0].items()}
+    joined = join_encoded(parts)
+    response = encode_response({"question": "all"}, joined)
+
+    assert joined == encode_result(TEST_SCENARIOS["run_all"][0])
+    assert msgspec.json.decode(response) == {
+        "question": "all",
+        "result": TEST_SCENARIOS["run_all"][1],
+    }
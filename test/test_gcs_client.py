@@ -0,0 +1,83 @@
+import pytest
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+from src.common import gcs_client
+from src.common.logger import canonical_logger
+from src.common.utils import _get_gcs_blob
+
+# --- 1. Shared Fixtures ---
+
+
+class FakeClient:
+    """storage.Client stand-in: counts constructions, real requests session."""
+
+    built = 0
+
+    def __init__(self):
+        FakeClient.built += 1
+        self._http = requests.Session()
+
+    def bucket(self, name):
+        return FakeBucket(name)
+
+
+class FakeBucket:
+    def __init__(self, name):
+        self.name = name
+
+    def blob(self, name):
+        return (self.name, name)
+
+
+@pytest.fixture(autouse=True)
+def fake_storage(monkeypatch):
+    monkeypatch.setattr("google.cloud.storage.Client", FakeClient)
+    monkeypatch.setattr(gcs_client, "_client", None)
+    FakeClient.built = 0
+
+
+@canonical_logger(event_name="test_gcs_call")
+def traced_call(ctx=None):
+    gcs_client.get_storage_client()
+    return ctx
+
+
+# --- 2. The Driver Test Functions ---
+
+
+def test_client_shared_across_threads():
+    barrier = threading.Barrier(8)
+
+    def worker(_):
+        barrier.wait()
+        return gcs_client.get_storage_client()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(worker, range(8)))
+
+    assert FakeClient.built == 1
+    assert all(c is clients[0] for c in clients)
+
+
+def test_client_pool_size():
+    adapter = gcs_client.get_storage_client()._http.get_adapter("https://x")
+    assert adapter._pool_maxsize == gcs_client.GCS_POOL_SIZE
+
+
+def test_client_setup_is_a_step():
+    first, second = traced_call(), traced_call()
+
+    assert "gcs_client_setup" in first.steps
+    assert "gcs_client_setup" not in second.steps
+    assert second.metrics["gcs_client_reused"] is True
+
+
+def test_client_rebuilt_after_fork():
+    client = gcs_client.get_storage_client()
+    gcs_client._reset_after_fork()
+
+    assert gcs_client.get_storage_client() is not client
+    assert _get_gcs_blob("gs://bucket/input/a.json") == ("bucket", "input/a.json")
+    assert FakeClient.built == 2
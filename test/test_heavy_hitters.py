@@ -0,0 +1,87 @@
+import pytest
+import random
+from collections import Counter
+
+from src.common.heavy_hitters import (
+    merge_sketches,
+    sketch_bounds,
+    sketch_counter,
+    sketch_top_k,
+)
+
+CAPACITY = 8
+
+# --- 1. Configuration & Scenarios ---
+
+
+def zipf_stream(n_keys, n_items, seed=7):
+    """Batches of skewed keys: a few heavy hitters and a long tail."""
+    rnd = random.Random(seed)
+    keys = [f"user{i}" for i in range(n_keys)]
+    weights = [1 / (i + 1) for i in range(n_keys)]
+    items = rnd.choices(keys, weights=weights, k=n_items)
+    return [items[i : i + 256] for i in range(0, n_items, 256)]
+
+
+TARGET_FUNCS = [
+    ("sequential", lambda stream: sketch_counter(stream, CAPACITY)),
+    (
+        # One partial summary per "worker", merged in file order
+        "merged",
+        lambda stream: merge_sketches(
+            [sketch_counter(stream[i::3], CAPACITY) for i in range(3)], CAPACITY
+        ),
+    ),
+]
+
+TEST_SCENARIOS = {
+    "zipf": zipf_stream(n_keys=500, n_items=20_000),
+    "high_cardinality": [
+        [f"k{i}" for i in range(j, j + 256)] for j in range(0, 20_000, 256)
+    ],
+    "few_keys": [["a", "b", "a"], ["c", "a", "b"]],
+    "empty": [],
+}
+
+# --- 2. The Driver Test Function ---
+
+
+@pytest.mark.parametrize("func_name, func_impl", TARGET_FUNCS)
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_sketch_error_bounds(func_name, func_impl, scenario_name):
+    stream = TEST_SCENARIOS[scenario_name]
+    exact = Counter(item for items in stream for item in items)
+
+    sketch = func_impl(stream)
+
+    # Fixed memory, whatever the number of distinct keys
+    assert len(sketch.counts) <= 2 * CAPACITY
+    assert sketch.total == exact.total()
+    assert sketch.error <= sketch.total // (CAPACITY + 1)
+    # Every estimate is a lower bound, short by at most the reported error
+    assert all(
+        sketch.counts[key] <= c <= sketch.counts[key] + sketch.error
+        for key, c in exact.items()
+    )
+
+
+def test_sketch_exact_without_pruning():
+    stream = TEST_SCENARIOS["few_keys"]
+    sketch = sketch_counter(stream, CAPACITY)
+
+    assert sketch.error == 0
+    assert sketch_top_k(sketch, 2) == [("a", 3), ("b", 2)]
+    assert sketch_bounds(sketch, 2, CAPACITY)["guaranteed_top_k"] == 2
+
+
+def test_sketch_guaranteed_top_k():
+    stream = zipf_stream(n_keys=500, n_items=20_000)
+    exact = Counter(item for items in stream for item in items)
+    sketch = sketch_counter(stream, CAPACITY)
+
+    bounds = sketch_bounds(sketch, 3, CAPACITY)
+    true_top = {key for key, _ in exact.most_common(3)}
+    guaranteed = sketch_top_k(sketch, 3)[: bounds["guaranteed_top_k"]]
+
+    assert bounds["guaranteed_top_k"] >= 1
+    assert all(key in true_top for key, _ in guaranteed)
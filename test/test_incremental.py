@@ -0,0 +1,164 @@
+import pytest
+import json
+
+from src.run_all import run_all
+from src.common.encoding import encode_result
+from src.common.state_store import LocalStateStore, StateConflict
+from src.incremental import (
+    STATE_NAME,
+    global_top_k,
+    load_state,
+    publish_global,
+    update_state,
+)
+
+# --- 1. Configuration & Scenarios ---
+
+
+def make_tweets(day, n, users, emojis, mentions):
+    """n tweets on 2021-02-<day> cycling over the given users, emojis and mentions."""
+    return [
+        {
+            "date": f"2021-02-{day:02d}T10:00:00+00:00",
+            "content": f"tweet {i} {emojis[i % len(emojis)]}",
+            "user": {"username": users[i % len(users)]},
+            "mentionedUsers": [{"username": mentions[i % len(mentions)]}],
+        }
+        for i in range(n)
+    ]
+
+
+INPUT_FILES = {
+    "input/day1.json": make_tweets(1, 6, ["ana", "bob"], ["✈️", "❤️"], ["Latam"]),
+    "input/day2.json": make_tweets(2, 9, ["bob"], ["🌾"], ["latam", "Modi"]),
+    "input/day3.json": make_tweets(3, 4, ["carl", "ana"], ["🇮🇳", "❤️"], ["Rihanna"]),
+}
+
+# Global top k published next to the per-file outputs
+GLOBAL_NAME = "output/global_top_k.json"
+
+# --- 2. Shared Fixtures ---
+
+
+@pytest.fixture
+def json_factory(tmp_path):
+    def _create(filename, content):
+        p = tmp_path / filename.replace("/", "_")
+        with open(p, "w", encoding="utf-8") as f:
+            for item in content:
+                f.write(json.dumps(item) + "\n")
+        return str(p)
+
+    return _create
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalStateStore(str(tmp_path / "bucket"))
+
+
+class FlakyStore(LocalStateStore):
+    """Loses the race on the first `conflicts` conditional writes of the state."""
+
+    def __init__(self, root, conflicts):
+        super().__init__(root)
+        self.conflicts = conflicts
+
+    def write(self, name, data, if_generation_match=None):
+        if name == STATE_NAME and self.conflicts > 0:
+            self.conflicts -= 1
+            raise StateConflict(name)
+        super().write(name, data, if_generation_match)
+
+
+class RacingStore(LocalStateStore):
+    """Runs another invocation right before our first write of the global output."""
+
+    def __init__(self, root, other):
+        super().__init__(root)
+        self.other = other
+
+    def write(self, name, data, if_generation_match=None):
+        if name == GLOBAL_NAME and self.other is not None:
+            other, self.other = self.other, None
+            other(self)
+        super().write(name, data, if_generation_match)
+
+
+# --- 3. The Driver Test Functions ---
+
+
+def test_incremental_matches_full_recomputation(json_factory, store):
+    for name, tweets in INPUT_FILES.items():
+        result = update_state(store, json_factory(name, tweets), name, "1")
+        assert result["file"] == run_all(json_factory(name, tweets), strategy="memory")
+
+    all_tweets = [t for tweets in INPUT_FILES.values() for t in tweets]
+    expected = run_all(json_factory("all.json", all_tweets), strategy="memory")
+
+    assert result["global"] == expected
+    assert global_top_k(store) == expected
+
+
+def test_incremental_redelivery_is_noop(json_factory, store):
+    name, tweets = "input/day1.json", INPUT_FILES["input/day1.json"]
+    file_path = json_factory(name, tweets)
+
+    first = update_state(store, file_path, name, "7")
+    second = update_state(store, file_path, name, "7")
+
+    assert first["global"] == second["global"]
+    assert second["global"]["q3"] == [("latam", 6)]
+
+
+def test_incremental_overwrite_replaces_contribution(json_factory, store):
+    for name, tweets in INPUT_FILES.items():
+        update_state(store, json_factory(name, tweets), name, "1")
+
+    # New generation of day2: its old counts must be removed, not added on top
+    new_day2 = make_tweets(2, 2, ["dan"], ["😊"], ["nobody"])
+    result = update_state(
+        store, json_factory("day2_v2.json", new_day2), "input/day2.json", "2"
+    )
+
+    tweets = INPUT_FILES["input/day1.json"] + new_day2 + INPUT_FILES["input/day3.json"]
+    assert result["global"] == run_all(json_factory("v2.json", tweets), "memory")
+    assert load_state(store)[0].files == {
+        "input/day1.json": "1",
+        "input/day2.json": "2",
+        "input/day3.json": "1",
+    }
+
+
+@pytest.mark.parametrize("conflicts, succeeds", [(0, True), (2, True), (5, False)])
+def test_incremental_retries_on_conflict(json_factory, tmp_path, conflicts, succeeds):
+    store = FlakyStore(str(tmp_path / "bucket"), conflicts)
+    name, tweets = "input/day3.json", INPUT_FILES["input/day3.json"]
+    file_path = json_factory(name, tweets)
+
+    if succeeds:
+        result = update_state(store, file_path, name, "1")
+        assert result["global"] == run_all(file_path, strategy="memory")
+    else:
+        with pytest.raises(StateConflict):
+            update_state(store, file_path, name, "1")
+
+
+def test_publish_global_never_leaves_stale_output(json_factory, tmp_path):
+    name, tweets = "input/day3.json", INPUT_FILES["input/day3.json"]
+
+    def late_file(store):
+        update_state(store, json_factory(name, tweets), name, "1")
+        publish_global(store, GLOBAL_NAME)
+
+    store = RacingStore(str(tmp_path / "bucket"), late_file)
+    for other in ("input/day1.json", "input/day2.json"):
+        update_state(store, json_factory(other, INPUT_FILES[other]), other, "1")
+
+    # Ranked before day3 was merged: the conditional write must reject it
+    top_k = publish_global(store, GLOBAL_NAME)
+
+    all_tweets = [t for tweets in INPUT_FILES.values() for t in tweets]
+    expected = run_all(json_factory("all.json", all_tweets), strategy="memory")
+    assert top_k == expected
+    assert store.read(GLOBAL_NAME)[0] == encode_result(expected)
@@ -0,0 +1,94 @@
+import pytest
+import ast
+import time
+import orjson
+import threading
+import tracemalloc
+
+from src.common.logger import canonical_logger
+
+# --- 1. Configuration & Scenarios ---
+
+BLOCK_MB = 64
+
+
+def allocate_and_free(ctx=None):
+    """Peaks BLOCK_MB above the baseline inside a step, then frees it."""
+    t0 = time.perf_counter()
+    block = b"x" * (BLOCK_MB * 1024 * 1024)
+    time.sleep(0.05)
+    del block
+    if ctx:
+        ctx.add_step("allocate", round((time.perf_counter() - t0) * 1000, 4))
+    return threading.active_count()
+
+
+@canonical_logger(event_name="inner_test", trace_top=3)
+def small_inner(ctx=None):
+    t0 = time.perf_counter()
+    block = b"x" * 1024
+    ctx.add_step("inner", round((time.perf_counter() - t0) * 1000, 4))
+    return len(block)
+
+
+@canonical_logger(event_name="outer_test", trace_top=3)
+def outer_with_nested_call(ctx=None):
+    """The outer step peaks before a nested traced call that stays small."""
+    t0 = time.perf_counter()
+    block = b"x" * (BLOCK_MB * 1024 * 1024)
+    del block
+    small_inner()
+    ctx.add_step("outer", round((time.perf_counter() - t0) * 1000, 4))
+
+
+TARGET_FUNCS = [
+    ("default", canonical_logger(event_name="mem_test")(allocate_and_free)),
+    (
+        "sampled",
+        canonical_logger(event_name="mem_test", sample_interval_ms=1)(
+            allocate_and_free
+        ),
+    ),
+    ("traced", canonical_logger(event_name="mem_test", trace_top=3)(allocate_and_free)),
+]
+
+# --- 2. The Driver Test Function ---
+
+
+@pytest.mark.parametrize("func_name, func_impl", TARGET_FUNCS)
+def test_memory_instrumentation(capsys, func_name, func_impl):
+    threads_before = threading.active_count()
+    threads_inside = func_impl()
+    # PrintLogger writes the orjson bytes as a b'...' literal
+    line = capsys.readouterr().out.strip().splitlines()[-1]
+    event = orjson.loads(ast.literal_eval(line))
+    memory, step = event["memory_usage"], event["steps"]["allocate"]
+
+    if func_name == "default":
+        # Off: no sampler thread and the same fields as before
+        assert threads_inside == threads_before
+        assert set(memory) == {"start_mb", "end_mb", "delta_mb"}
+        assert set(step) == {"duration_ms", "memory_mb"}
+    elif func_name == "sampled":
+        # The freed block is invisible at the end, but not to the sampler
+        assert threads_inside == threads_before + 1
+        assert memory["peak_mb"] >= memory["end_mb"] + BLOCK_MB * 0.9
+        assert step["peak_memory_mb"] >= step["memory_mb"] + BLOCK_MB * 0.9
+        assert memory["samples"] > 1
+    else:
+        assert step["traced_peak_mb"] >= BLOCK_MB
+        assert memory["traced_peak_mb"] >= BLOCK_MB
+        assert len(step["top_allocations"]) <= 3
+        assert not tracemalloc.is_tracing()
+    assert threading.active_count() == threads_before
+
+
+def test_nested_tracing_keeps_outer_peak(capsys):
+    outer_with_nested_call()
+    lines = capsys.readouterr().out.strip().splitlines()
+    inner, outer = (orjson.loads(ast.literal_eval(line)) for line in lines[-2:])
+
+    assert outer["steps"]["outer"]["traced_peak_mb"] >= BLOCK_MB
+    assert outer["memory_usage"]["traced_peak_mb"] >= BLOCK_MB
+    assert inner["steps"]["inner"]["traced_peak_mb"] < BLOCK_MB
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,97 @@
+import pytest
+import time
+
+import main
+from src.common.logger import canonical_logger
+from src.common.metrics import CONTENT_TYPE, Histogram, MetricsRegistry
+
+# --- 1. Shared Fixtures ---
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr("src.common.logger.REGISTRY", registry)
+    monkeypatch.setattr("src.common.metrics.REGISTRY", registry)
+    return registry
+
+
+@canonical_logger(event_name="metrics_test")
+def scan(file_path, fail=False, ctx=None):
+    ctx.add_context(file_path=file_path)
+    t0 = time.perf_counter()
+    with open(file_path, "rb") as f:
+        f.read()
+    ctx.add_step("read", round((time.perf_counter() - t0) * 1000, 4))
+    if fail:
+        raise ValueError("corrupt")
+
+
+class Request:
+    args = {}
+    path = "/metrics"
+
+    def get_json(self, silent=True):
+        return None
+
+
+# --- 2. The Driver Test Functions ---
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(tuple(range(10, 101, 10)))
+    for value in range(1, 101):
+        histogram.observe(value)
+
+    cumulative, total, count = histogram.snapshot()
+    assert cumulative[-1] == count == 100
+    assert total == sum(range(1, 101))
+    assert histogram.quantile(0.5) == pytest.approx(50)
+    assert histogram.quantile(0.99) == pytest.approx(99)
+
+
+def test_events_feed_histograms(registry, tmp_path):
+    file_path = tmp_path / "tweets.json"
+    file_path.write_bytes(b"{}\n" * 100_000)
+
+    for _ in range(3):
+        scan(str(file_path))
+    with pytest.raises(ValueError):
+        scan(str(file_path), fail=True)
+
+    ok = registry.get(
+        "canonical_event_duration_seconds", event="metrics_test", status="success"
+    )
+    failed = registry.get(
+        "canonical_event_duration_seconds", event="metrics_test", status="failure"
+    )
+    step = registry.get(
+        "canonical_step_duration_seconds", event="metrics_test", step="read"
+    )
+    throughput = registry.get(
+        "canonical_throughput_bytes_per_second", event="metrics_test"
+    )
+    memory = registry.get("canonical_peak_memory_bytes", event="metrics_test")
+
+    assert (ok.count, failed.count, step.count, memory.count) == (3, 1, 4, 4)
+    # Throughput only for successful calls over a local file
+    assert throughput.count == 3 and throughput.sum > 0
+
+
+def test_metrics_route(registry, tmp_path):
+    file_path = tmp_path / "tweets.json"
+    file_path.write_bytes(b"{}\n")
+    scan(str(file_path))
+
+    body, status, headers = main.entrypoint(Request())
+    lines = body.splitlines()
+
+    assert status == 200 and headers["Content-Type"] == CONTENT_TYPE
+    assert "# TYPE canonical_event_duration_seconds histogram" in lines
+    assert (
+        'canonical_event_duration_seconds_bucket{event="metrics_test",'
+        'status="success",le="+Inf"} 1'
+    ) in lines
+    assert (
+        'canonical_step_duration_seconds_count{event="metrics_test",step="read"} 1'
+    ) in lines
@@ -0,0 +1,98 @@
+import pytest
+import json
+
+import main
+from src.common import polars_engine
+from src.common.polars_engine import resolve_engine
+
+# --- 1. Configuration & Scenarios ---
+
+FILE_BYTES = 10 * 1024 * 1024  # in-memory estimate: 6 MB
+
+# (engine, memory_budget_mb, expected)
+ENGINE_SCENARIOS = [
+    ("in-memory", None, "in-memory"),
+    ("streaming", None, "streaming"),
+    ("streaming", 1, "streaming"),  # an explicit engine wins over the budget
+    ("auto", 0, "in-memory"),  # no budget
+    ("auto", 64, "in-memory"),
+    ("auto", 4, "streaming"),
+]
+
+
+class Request:
+    path = "/"
+
+    def __init__(self, **args):
+        self.args = args
+
+    def get_json(self, silent=True):
+        return None
+
+
+@pytest.fixture
+def sized_file(tmp_path):
+    p = tmp_path / "tweets.json"
+    with open(p, "wb") as f:
+        f.truncate(FILE_BYTES)
+    return str(p)
+
+
+# --- 2. The Driver Test Functions ---
+
+
+@pytest.mark.parametrize("engine, budget, expected", ENGINE_SCENARIOS)
+def test_resolve_engine(sized_file, engine, budget, expected):
+    assert resolve_engine(sized_file, engine, budget) == expected
+
+
+def test_resolve_engine_defaults(sized_file, monkeypatch):
+    assert resolve_engine(sized_file) == "in-memory"
+    monkeypatch.setattr(polars_engine, "POLARS_ENGINE", "auto")
+    monkeypatch.setattr(polars_engine, "POLARS_MEMORY_BUDGET_MB", 4)
+    assert resolve_engine(sized_file) == "streaming"
+
+
+def test_resolve_engine_compressed_input(tmp_path):
+    p = tmp_path / "tweets.json.gz"
+    with open(p, "wb") as f:
+        f.write(b"\x1f\x8b")
+        f.truncate(FILE_BYTES // 4)  # ~20 MB of text once decompressed
+    assert polars_engine.input_size(str(p)) == FILE_BYTES // 4 * 8
+    assert resolve_engine(str(p), "auto", 8) == "streaming"
+    assert resolve_engine(str(p), "auto", 64) == "in-memory"
+
+
+def test_resolve_engine_unknown_size_streams(tmp_path):
+    assert resolve_engine(str(tmp_path / "missing.json"), "auto", 64) == "streaming"
+
+
+def test_resolve_engine_rejects_unknown():
+    with pytest.raises(ValueError, match="gpu"):
+        resolve_engine("file.json", "gpu")
+
+
+def test_entrypoint_engine(tmp_path):
+    file_path = tmp_path / "tweets.json"
+    tweet = {"content": "hola 😀", "user": {"username": "a"}, "mentionedUsers": None}
+    file_path.write_text(json.dumps(tweet, ensure_ascii=False) + "\n")
+
+    body, status = main.entrypoint(
+        Request(q="q2", file=str(file_path), engine="streaming")
+    )
+    assert status == 200 and json.loads(body)["result"] == [["😀", 1]]
+
+    body, status = main.entrypoint(Request(q="q2", file=str(file_path), engine="gpu"))
+    assert status == 400 and "gpu" in json.loads(body)["message"]
+
+
+def test_load_route_engine():
+    assert main._load_route("q1", "time", False, "streaming").keywords == {
+        "engine": "streaming"
+    }
+    assert main._load_route("all", "time", False, "auto").keywords == {
+        "strategy": "time",
+        "engine": "auto",
+    }
+    # The memory strategy has no Polars engine
+    assert not hasattr(main._load_route("q1", "memory", False, "streaming"), "keywords")
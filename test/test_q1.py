@@ -6,10 +6,11 @@ from collections import Counter
 
 # Imports for Time implementation
 from src.q1_time import (
-    date_counter as dc_time,
+    date_user_extractor as due_time,
     get_top_k as gk_time,
     user_date_counter as udc_time,
     user_ranker as ur_time,
+    build_query,
     q1_time,
 )
 
@@ -26,20 +27,22 @@ from src.q1_memory import (
 
 TARGET_FUNCS = [
     # Time (Polars)
-    ("time_date_counter", dc_time),
+    ("time_date_user_extractor", due_time),
     ("time_get_top_k", lambda lf: gk_time(lf, 2)),
-    (
-        "time_user_date_counter",
-        lambda fp: udc_time(fp, pl.LazyFrame({"date": [date(2021, 2, 12)]})),
-    ),
+    ("time_user_date_counter", lambda fp: udc_time(due_time(fp))),
     ("time_user_ranker", ur_time),
     ("time_q1", q1_time),
+    ("time_q1_streaming", lambda fp: q1_time(fp, engine="streaming")),
     # Memory (Functional)
     ("mem_date_counter", dc_mem),
     ("mem_get_top_k", lambda c: gk_mem(c, 2)),
     ("mem_user_date_counter", lambda fp: udc_mem(fp, frozenset(["2021-02-12"]))),
     ("mem_user_ranker", ur_mem),
     ("mem_q1", q1_memory),
+    ("mem_q1_parallel", lambda fp: q1_memory(fp, workers=2)),
+    ("mem_q1_single_pass", lambda fp: q1_memory(fp, single_pass=True)),
+    ("mem_q1_indexed", lambda fp: q1_memory(fp, use_index=True)),
+    ("mem_q1_raw_scan", lambda fp: q1_memory(fp, raw_scan=True)),
 ]
 
 TEST_SCENARIOS = {
@@ -63,9 +66,9 @@ TEST_SCENARIOS = {
             },
         ],
         "validators": {
-            "time_date_counter": lambda res: res.collect().height == 2,
+            "time_date_user_extractor": lambda res: res.collect().height == 4,
             "time_get_top_k": lambda res: res.collect()["date"][0] == date(2021, 2, 12),
-            "time_user_date_counter": lambda res: res.collect().height == 2,
+            "time_user_date_counter": lambda res: res.collect().height == 3,
             "time_user_ranker": lambda res: res.collect().height == 2,
             "time_q1": lambda res: res[0] == (date(2021, 2, 12), "user1"),
             "mem_date_counter": lambda res: len(res) == 2 and res["2021-02-12"] == 3,
@@ -73,6 +76,9 @@ TEST_SCENARIOS = {
             "mem_user_date_counter": lambda res: len(res) == 2,
             "mem_user_ranker": lambda res: len(res) == 2,
             "mem_q1": lambda res: res[0] == (date(2021, 2, 12), "user1"),
+            "mem_q1_parallel": lambda res: res[0] == (date(2021, 2, 12), "user1"),
+            "mem_q1_single_pass": lambda res: res
+            == [(date(2021, 2, 12), "user1"), (date(2021, 2, 13), "user3")],
         },
     },
     "tie_breaking": {
@@ -87,7 +93,7 @@ TEST_SCENARIOS = {
             },
         ],
         "validators": {
-            "time_date_counter": lambda res: res.collect().height == 1,
+            "time_date_user_extractor": lambda res: res.collect().height == 2,
             "time_get_top_k": lambda res: res.collect().height == 1,
             "time_user_date_counter": lambda res: res.collect().height == 2,
             "time_user_ranker": lambda res: res.collect()["top_user"][0] == "userA",
@@ -97,12 +103,14 @@ TEST_SCENARIOS = {
             "mem_user_date_counter": lambda res: len(res) == 2,
             "mem_user_ranker": lambda res: res["2021-02-12"][0] == "userA",
             "mem_q1": lambda res: res[0][1] == "userA",
+            "mem_q1_parallel": lambda res: res[0][1] == "userA",
+            "mem_q1_single_pass": lambda res: res[0][1] == "userA",
         },
     },
     "empty_file": {
         "data": [],
         "validators": {
-            "time_date_counter": lambda res: res.collect().height == 0,
+            "time_date_user_extractor": lambda res: res.collect().height == 0,
             "time_get_top_k": lambda res: res.collect().height == 0,
             "time_user_date_counter": lambda res: res.collect().height == 0,
             "time_user_ranker": lambda res: res.collect().height == 0,
@@ -112,10 +120,21 @@ TEST_SCENARIOS = {
             "mem_user_date_counter": lambda res: len(res) == 0,
             "mem_user_ranker": lambda res: len(res) == 0,
             "mem_q1": lambda res: res == [],
+            "mem_q1_parallel": lambda res: res == [],
+            "mem_q1_single_pass": lambda res: res == [],
         },
     },
 }
 
+# The streaming engine must answer exactly like the in-memory one
+for config in TEST_SCENARIOS.values():
+    if "time_q1" in config["validators"]:
+        config["validators"]["time_q1_streaming"] = config["validators"]["time_q1"]
+    # ...and neither the date index nor raw blocks may change q1_memory's answer
+    if "mem_q1" in config["validators"]:
+        config["validators"]["mem_q1_indexed"] = config["validators"]["mem_q1"]
+        config["validators"]["mem_q1_raw_scan"] = config["validators"]["mem_q1"]
+
 # --- 2. Shared Fixtures ---
 
 
@@ -192,13 +211,36 @@ def test_q1_engine(json_factory, func_name, func_impl, scenario_name):
 
     elif "get_top_k" in func_name:
         if "time" in func_name:
-            lf_counts = dc_time(file_path)
-            result = func_impl(lf_counts)
+            lf_ranked = ur_time(udc_time(due_time(file_path)))
+            result = func_impl(lf_ranked)
         else:  # memory
             counts = dc_mem(file_path)
             result = func_impl(counts)
 
-    else:  # q1_time, q1_memory, date_counter, user_date_counter
+    else:  # q1_time, q1_memory, date extractors/counters, user_date_counter
         result = func_impl(file_path)
 
     assert validator(result), f"Validator failed for {func_name} in {scenario_name}"
+
+
+def test_q1_time_single_scan(json_factory):
+    """The plan must read the NDJSON and parse the date exactly once (no self-join)."""
+    file_path = json_factory("single_scan.json", TEST_SCENARIOS["basic_flow"]["data"])
+    plan = build_query(file_path).explain()
+
+    assert plan.count("SCAN") == 1
+    assert plan.count("strptime") == 1
+    assert "JOIN" not in plan
+
+
+def test_q1_time_null_usernames(json_factory):
+    """Null usernames count towards the top dates but never win a date."""
+    data = [
+        {"date": "2021-02-12T10:00:00+00:00", "user": None},
+        {"date": "2021-02-12T11:00:00+00:00", "user": None},
+        {"date": "2021-02-12T12:00:00+00:00", "user": {"id": 2, "username": "b"}},
+        {"date": "2021-02-13T10:00:00+00:00", "user": None},
+    ]
+    file_path = json_factory("null_users.json", data)
+
+    assert q1_time(file_path) == [(date(2021, 2, 12), "b")]
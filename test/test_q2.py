@@ -1,6 +1,5 @@
 import pytest
 import json
-import re
 
 # Imports for Time implementation
 from src.q2_time import (
@@ -20,14 +19,6 @@ from src.q2_memory import (
 
 # Shared Regex for testing components
 TIME_REGEX = r"(?:[\U0001f1e6-\U0001f1ff]{2}|[\p{Emoji_Presentation}\p{Extended_Pictographic}](?:\p{EMod}|\ufe0f\u200d[\p{Emoji_Presentation}\p{Extended_Pictographic}])*+)"
-MEM_REGEX = re.compile(
-    r"("
-    r"[\U0001f1e6-\U0001f1ff]{2}|"
-    r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf]"
-    r"(?:[\ufe0f\u200d\U0001f3fb-\U0001f3ff]+"
-    r"[\U0001f300-\U0001f9ff\u2600-\u26ff\u2700-\u27bf])*"
-    r")"
-)
 
 # --- 1. Configuration & Scenarios ---
 
@@ -37,11 +28,14 @@ TARGET_FUNCS = [
     ("time_emoji_counter", ec_time),
     ("time_get_top_k", lambda lf: gk_time(lf, 2)),
     ("time_q2", q2_time),
+    ("time_q2_streaming", lambda fp: q2_time(fp, engine="streaming")),
     # Memory (Functional)
-    ("mem_emoji_extractor", lambda fp: ee_mem(fp, MEM_REGEX)),
+    ("mem_emoji_extractor", ee_mem),
     ("mem_emoji_counter", ec_mem),
     ("mem_get_top_k", lambda c: gk_mem(c, 2)),
     ("mem_q2", q2_memory),
+    ("mem_q2_parallel", lambda fp: q2_memory(fp, workers=2)),
+    ("mem_q2_approximate", lambda fp: q2_memory(fp, approximate=True)),
 ]
 
 TEST_SCENARIOS = {
@@ -55,10 +49,12 @@ TEST_SCENARIOS = {
             "time_emoji_counter": lambda res: res.collect().height == 2,
             "time_get_top_k": lambda res: res.collect().height == 2,
             "time_q2": lambda res: res[0][1] == 2,
-            "mem_emoji_extractor": lambda res: len(list(res)) == 2,
+            "mem_emoji_extractor": lambda res: sum(map(len, res)) == 3,
             "mem_emoji_counter": lambda res: len(res) == 2,
             "mem_get_top_k": lambda res: len(res) == 2,
             "mem_q2": lambda res: res[0][1] == 2,
+            "mem_q2_approximate": lambda res: res[0][1] == 2,
+            "mem_q2_parallel": lambda res: res[0][1] == 2,
         },
     },
     "zwj_sequences": {
@@ -70,10 +66,15 @@ TEST_SCENARIOS = {
             "time_emoji_counter": lambda res: res.collect().height >= 1,
             "time_get_top_k": lambda res: res.collect().height >= 1,
             "time_q2": lambda res: res[0][1] == 1,
-            "mem_emoji_extractor": lambda res: len(list(res)[0]) == 1,
-            "mem_emoji_counter": lambda res: len(res) == 1,
-            "mem_get_top_k": lambda res: len(res) == 1,
-            "mem_q2": lambda res: res[0][0] == "👨‍👩‍👧‍👦",
+            # Same tokens as q2_time: ZWJ only links after FE0F, so each person counts
+            "mem_emoji_extractor": lambda res: len(list(res)[0]) == 4,
+            "mem_emoji_counter": lambda res: len(res) == 4,
+            "mem_get_top_k": lambda res: len(res) == 2,
+            "mem_q2": lambda res: [e for e, _ in res] == ["👦", "👧", "👨", "👩"],
+            "mem_q2_approximate": lambda res: (
+                [e for e, _ in res] == ["👦", "👧", "👨", "👩"]
+            ),
+            "mem_q2_parallel": lambda res: res[0] == ("👦", 1),
         },
     },
     "tie_breaking": {
@@ -89,6 +90,10 @@ TEST_SCENARIOS = {
             "mem_emoji_counter": lambda res: len(res) == 2,
             "mem_get_top_k": lambda res: len(res) == 2,
             "mem_q2": lambda res: res[0][1] == res[1][1] and res[0][0] < res[1][0],
+            "mem_q2_approximate": lambda res: res[0][1] == res[1][1]
+            and res[0][0] < res[1][0],
+            "mem_q2_parallel": lambda res: res[0][1] == res[1][1]
+            and res[0][0] < res[1][0],
         },
     },
     "empty": {
@@ -102,10 +107,17 @@ TEST_SCENARIOS = {
             "mem_emoji_counter": lambda res: len(res) == 0,
             "mem_get_top_k": lambda res: len(res) == 0,
             "mem_q2": lambda res: res == [],
+            "mem_q2_approximate": lambda res: res == [],
+            "mem_q2_parallel": lambda res: res == [],
         },
     },
 }
 
+# The streaming engine must answer exactly like the in-memory one
+for config in TEST_SCENARIOS.values():
+    if "time_q2" in config["validators"]:
+        config["validators"]["time_q2_streaming"] = config["validators"]["time_q2"]
+
 # --- 2. Shared Fixtures ---
 
 
@@ -152,7 +164,7 @@ def test_q2_engine(json_factory, func_name, func_impl, scenario_name):
             lf = read_polars(file_path)
             input_data = ee_time(lf, TIME_REGEX)
         else:
-            input_data = ee_mem(file_path, MEM_REGEX)
+            input_data = ee_mem(file_path)
         result = func_impl(input_data)
 
     elif "get_top_k" in func_name:
@@ -163,7 +175,7 @@ def test_q2_engine(json_factory, func_name, func_impl, scenario_name):
             counts_lf = ec_time(ee_time(lf, TIME_REGEX))
             result = func_impl(counts_lf)
         else:
-            counter = ec_mem(ee_mem(file_path, MEM_REGEX))
+            counter = ec_mem(ee_mem(file_path))
             result = func_impl(counter)
 
     else:  # q2_time, q2_memory
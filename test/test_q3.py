@@ -25,11 +25,19 @@ TARGET_FUNCS = [
     ("time_mention_counter", mc_time),
     ("time_get_top_k", lambda lf: gk_time(lf, 2)),
     ("time_q3", q3_time),
+    ("time_q3_streaming", lambda fp: q3_time(fp, engine="streaming")),
     # Memory (Functional)
     ("mem_mention_extractor", me_mem),
     ("mem_mention_counter", mc_mem),
     ("mem_get_top_k", lambda c: gk_mem(c, 2)),
     ("mem_q3", q3_memory),
+    ("mem_q3_parallel", lambda fp: q3_memory(fp, workers=2)),
+    ("mem_q3_approximate", lambda fp: q3_memory(fp, approximate=True)),
+    ("mem_q3_raw_scan", lambda fp: q3_memory(fp, raw_scan=True)),
+    (
+        "mem_q3_raw_scan_parallel",
+        lambda fp: q3_memory(fp, workers=2, raw_scan=True),
+    ),
 ]
 
 TEST_SCENARIOS = {
@@ -43,10 +51,12 @@ TEST_SCENARIOS = {
             "time_mention_counter": lambda res: res.collect().height == 2,
             "time_get_top_k": lambda res: res.collect().height == 2,
             "time_q3": lambda res: res[0] == ("usera", 2),
-            "mem_mention_extractor": lambda res: len(list(res)) == 2,
+            "mem_mention_extractor": lambda res: sum(map(len, res)) == 3,
             "mem_mention_counter": lambda res: len(res) == 2,
             "mem_get_top_k": lambda res: len(res) == 2,
             "mem_q3": lambda res: res[0] == ("usera", 2),
+            "mem_q3_approximate": lambda res: res[0] == ("usera", 2),
+            "mem_q3_parallel": lambda res: res[0] == ("usera", 2),
         },
     },
     "case_insensitivity": {
@@ -63,6 +73,8 @@ TEST_SCENARIOS = {
             "mem_mention_counter": lambda res: len(res) == 1,
             "mem_get_top_k": lambda res: len(res) == 1,
             "mem_q3": lambda res: res[0] == ("latam", 2),
+            "mem_q3_approximate": lambda res: res[0] == ("latam", 2),
+            "mem_q3_parallel": lambda res: res[0] == ("latam", 2),
         },
     },
     "null_and_empty": {
@@ -80,6 +92,8 @@ TEST_SCENARIOS = {
             "mem_mention_counter": lambda res: len(res) == 0,
             "mem_get_top_k": lambda res: len(res) == 0,
             "mem_q3": lambda res: res == [],
+            "mem_q3_approximate": lambda res: res == [],
+            "mem_q3_parallel": lambda res: res == [],
         },
     },
     "tie_breaking": {
@@ -95,10 +109,22 @@ TEST_SCENARIOS = {
             "mem_mention_counter": lambda res: len(res) == 2,
             "mem_get_top_k": lambda res: len(res) == 2,
             "mem_q3": lambda res: res[0][0] == "usera" and res[1][0] == "userb",
+            "mem_q3_approximate": lambda res: res[0][0] == "usera"
+            and res[1][0] == "userb",
+            "mem_q3_parallel": lambda res: res[0][0] == "usera"
+            and res[1][0] == "userb",
         },
     },
 }
 
+# The streaming engine must answer exactly like the in-memory one
+for config in TEST_SCENARIOS.values():
+    if "time_q3" in config["validators"]:
+        config["validators"]["time_q3_streaming"] = config["validators"]["time_q3"]
+    # ...and reading raw blocks must not change q3_memory's answer
+    for name in ("mem_q3_raw_scan", "mem_q3_raw_scan_parallel"):
+        config["validators"][name] = config["validators"]["mem_q3"]
+
 # --- 2. Shared Fixtures ---
 
 
@@ -0,0 +1,112 @@
+import pytest
+import os
+import json
+import msgspec
+
+from src.q2_memory import q2_memory
+from src.common.encoding import encode_result
+from src.common.state_store import LocalStateStore
+from src.common.result_cache import ResultCache, cached_call, object_version
+
+# --- 1. Configuration & Scenarios ---
+
+TWEETS = [
+    {"content": "Hola 😀 😀 🚀", "mentionedUsers": [{"username": "Latam"}]},
+    {"content": "Chao 😀", "mentionedUsers": None},
+]
+
+# --- 2. Shared Fixtures ---
+
+
+@pytest.fixture
+def json_file(tmp_path):
+    p = tmp_path / "tweets.json"
+    p.write_text("\n".join(json.dumps(t) for t in TWEETS) + "\n", encoding="utf-8")
+    return str(p)
+
+
+class CountingCompute:
+    """Stands in for a q* function and records how many times it really ran."""
+
+    def __init__(self, func, file_path):
+        self.func, self.file_path, self.calls = func, file_path, 0
+
+    def __call__(self):
+        self.calls += 1
+        return encode_result(self.func(self.file_path))
+
+
+# --- 3. The Driver Test Functions ---
+
+
+def test_cache_hits_after_first_call(json_file):
+    cache = ResultCache(max_entries=4)
+    compute = CountingCompute(q2_memory, json_file)
+    key = ("q2", "memory", False, json_file, object_version(json_file))
+
+    first = cached_call(cache, key, compute)
+    second = cached_call(cache, key, compute)
+
+    assert (
+        msgspec.json.decode(first)
+        == msgspec.json.decode(second)
+        == [["😀", 3], ["🚀", 1]]
+    )
+    assert compute.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_invalidated_by_new_version(json_file):
+    cache = ResultCache(max_entries=4)
+    compute = CountingCompute(q2_memory, json_file)
+    version = object_version(json_file)
+    cached_call(cache, ("q2", "memory", False, json_file, version), compute)
+
+    with open(json_file, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"content": "🚀 🚀 🚀"}) + "\n")
+    os.utime(json_file, ns=(0, os.stat(json_file).st_mtime_ns + 1))
+    new_version = object_version(json_file)
+    result = cached_call(
+        cache, ("q2", "memory", False, json_file, new_version), compute
+    )
+
+    assert new_version != version
+    assert msgspec.json.decode(result) == [["🚀", 4], ["😀", 3]]
+    assert compute.calls == 2
+
+
+def test_cache_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.put(key, key.encode())
+    assert cache.get("a") == ("memory", b"a")  # "b" is now the least recent
+    cache.put("c", b"c")
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") == (None, None)
+
+
+def test_cache_persistent_tier_survives_restart(json_file, tmp_path):
+    store = LocalStateStore(str(tmp_path / "cache"))
+    compute = CountingCompute(q2_memory, json_file)
+    key = ("q2", "memory", False, json_file, object_version(json_file))
+
+    cached_call(ResultCache(persistent=store), key, compute)
+    # A fresh process (empty LRU) still finds the result in the persistent tier
+    cold_cache = ResultCache(persistent=store)
+    result = cached_call(cold_cache, key, compute)
+
+    assert msgspec.json.decode(result) == [["😀", 3], ["🚀", 1]]
+    assert compute.calls == 1
+    assert cold_cache.get(next(iter(cold_cache.entries)))[0] == "memory"
+
+
+def test_object_version_covers_every_input_file(json_file, tmp_path):
+    parts = tmp_path / "parts"
+    parts.mkdir()
+    (parts / "part-0.json").write_text(open(json_file).read())
+    version = object_version(str(parts))
+    assert object_version(str(parts)) == version
+
+    (parts / "part-1.json").write_text('{"content": "🚀"}\n')
+    assert object_version(str(parts)) != version
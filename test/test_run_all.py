@@ -0,0 +1,156 @@
+import pytest
+import json
+from datetime import date
+
+from src.q1_time import q1_time
+from src.q1_memory import q1_memory
+from src.q2_time import q2_time
+from src.q2_memory import q2_memory
+from src.q3_time import q3_time
+from src.q3_memory import q3_memory
+from src.run_all import run_all
+from src.bench.datasets import ensure_compressed
+
+# --- 1. Configuration & Scenarios ---
+
+TARGET_FUNCS = [
+    ("time_run_all", "time", {"q1": q1_time, "q2": q2_time, "q3": q3_time}),
+    ("mem_run_all", "memory", {"q1": q1_memory, "q2": q2_memory, "q3": q3_memory}),
+]
+
+TEST_SCENARIOS = {
+    "happy_path": {
+        "raw_content": "\n".join(
+            json.dumps(item, ensure_ascii=False)
+            for item in [
+                {
+                    "date": "2021-02-12T10:00:00+00:00",
+                    "content": "I love ✈️ and ❤️",
+                    "user": {"id": 1, "username": "user1"},
+                    "mentionedUsers": [{"username": "UserA"}],
+                },
+                {
+                    "date": "2021-02-12T11:00:00+00:00",
+                    "content": "More ❤️",
+                    "user": {"id": 1, "username": "user1"},
+                    "mentionedUsers": [{"username": "usera"}, {"username": "userB"}],
+                },
+                {
+                    "date": "2021-02-13T10:00:00+00:00",
+                    "content": "Family: 👨‍👩‍👧‍👦",
+                    "user": {"id": 2, "username": "user2"},
+                    "mentionedUsers": None,
+                },
+            ]
+        )
+        + "\n",
+        "validators": {
+            "time_run_all": lambda res: (
+                res["q1"][0] == (date(2021, 2, 12), "user1")
+                and res["q3"][0] == ("usera", 2)
+            ),
+            "mem_run_all": lambda res: (
+                res["q1"][0] == (date(2021, 2, 12), "user1") and res["q2"][0][1] == 2
+            ),
+        },
+    },
+    "partial_records": {
+        # Each question must skip exactly the lines its own decoder rejects
+        "raw_content": "\n".join(
+            [
+                '{"date": "2021-02-12T10:00:00+00:00", "content": null, "user": {"username": "u1"}}',
+                '{"date": "2021-02-12T10:00:00+00:00", "content": "😊", "user": null}',
+                '{"content": "😊 ✈️", "mentionedUsers": [{"username": "a"}, {"username": null}]}',
+                '{"date": 20210212, "content": "✈️", "mentionedUsers": [{"username": "b"}]}',
+                '{"date": "BROKEN',
+                '{"date": "2021-02-13T10:00:00+00:00", "user": {"username": "u2"}, "mentionedUsers": [{"username": "B"}]}',
+            ]
+        )
+        + "\n",
+        "validators": {
+            "time_run_all": lambda res: len(res["q1"]) == 2,
+            "mem_run_all": lambda res: res["q3"] == [("b", 2)],
+        },
+    },
+    "empty_file": {
+        "raw_content": "",
+        "validators": {
+            "time_run_all": lambda res: res == {"q1": [], "q2": [], "q3": []},
+            "mem_run_all": lambda res: res == {"q1": [], "q2": [], "q3": []},
+        },
+    },
+}
+
+# --- 2. Shared Fixtures ---
+
+
+@pytest.fixture
+def json_factory(tmp_path):
+    def _create(filename, content):
+        p = tmp_path / filename
+        p.write_text(content, encoding="utf-8")
+        return str(p)
+
+    return _create
+
+
+# --- 3. The Driver Test Function ---
+
+
+@pytest.mark.parametrize("func_name, strategy, single_funcs", TARGET_FUNCS)
+@pytest.mark.parametrize("scenario_name", TEST_SCENARIOS.keys())
+def test_run_all_engine(json_factory, func_name, strategy, single_funcs, scenario_name):
+    config = TEST_SCENARIOS[scenario_name]
+    file_path = json_factory(f"{func_name}_{scenario_name}.json", config["raw_content"])
+
+    if strategy == "time" and scenario_name == "partial_records":
+        # Polars rejects the whole file on a corrupt line (see test_common_utils)
+        file_path = json_factory(
+            f"{func_name}_{scenario_name}_clean.json",
+            config["raw_content"].replace('{"date": "BROKEN\n', ""),
+        )
+
+    result = run_all(file_path, strategy=strategy)
+
+    # The fused single scan must match the individual functions exactly
+    assert result == {q: func(file_path) for q, func in single_funcs.items()}
+    assert config["validators"][func_name](result)
+
+
+@pytest.mark.parametrize("scenario_name", ["happy_path"])
+def test_run_all_streaming_engine(json_factory, scenario_name):
+    file_path = json_factory(
+        "streaming.json", TEST_SCENARIOS[scenario_name]["raw_content"]
+    )
+    assert run_all(file_path, engine="streaming") == run_all(file_path)
+
+
+@pytest.mark.parametrize("func_name, strategy, single_funcs", TARGET_FUNCS)
+def test_run_all_multi_file(json_factory, tmp_path, func_name, strategy, single_funcs):
+    lines = TEST_SCENARIOS["happy_path"]["raw_content"].splitlines()
+    file_path = json_factory(f"{func_name}_joined.json", "\n".join(lines))
+    parts = tmp_path / f"{func_name}_parts"
+    parts.mkdir()
+    for i, line in enumerate(lines):
+        (parts / f"part-{i}.json").write_text(line, encoding="utf-8")
+
+    expected = run_all(file_path, strategy=strategy)
+    assert run_all(str(parts), strategy=strategy) == expected
+    assert run_all(f"{parts}/part-*.json", strategy=strategy) == expected
+
+
+@pytest.mark.parametrize("func_name, strategy, single_funcs", TARGET_FUNCS)
+@pytest.mark.parametrize("suffix", [".gz", ".zst"])
+def test_run_all_compressed(json_factory, func_name, strategy, single_funcs, suffix):
+    raw_content = TEST_SCENARIOS["happy_path"]["raw_content"]
+    file_path = json_factory(f"{func_name}.json", raw_content)
+    packed = ensure_compressed(file_path, {".gz": "gzip", ".zst": "zstd"}[suffix])
+
+    assert packed == file_path + suffix
+    assert run_all(packed, strategy=strategy) == run_all(file_path, strategy=strategy)
+
+
+def test_run_all_invalid_strategy(json_factory):
+    file_path = json_factory("invalid.json", "")
+    with pytest.raises(ValueError):
+        run_all(file_path, strategy="gpu")
@@ -0,0 +1,150 @@
+import pytest
+import time
+import threading
+import msgspec
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+from src.common.result_cache import ResultCache, cache_key, cached_call
+from src.common.single_flight import SingleFlight
+
+CALLERS = 6
+
+# --- 1. Shared Fixtures ---
+
+
+class GatedCompute:
+    """Blocks until released, so every caller arrives while the call is in flight."""
+
+    def __init__(self, value):
+        self.value, self.calls = value, 0
+        self.release = threading.Event()
+
+    def __call__(self, *args):
+        self.calls += 1
+        assert self.release.wait(timeout=5)
+        if isinstance(self.value, Exception):
+            raise self.value
+        return self.value
+
+
+def wait_for_followers(flights, key, n):
+    """Polls until n callers are attached to the flight of key."""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with flights._lock:
+            flight = flights._flights.get(key)
+            if flight is not None and flight.followers >= n:
+                return
+        time.sleep(0.001)
+    raise TimeoutError(key)
+
+
+# --- 2. The Driver Test Functions ---
+
+
+def test_single_flight_runs_once():
+    flights, compute = SingleFlight(), GatedCompute([["a", 1]])
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [executor.submit(flights.do, "k", compute) for _ in range(CALLERS)]
+        wait_for_followers(flights, "k", CALLERS - 1)
+        compute.release.set()
+        results = [f.result() for f in futures]
+
+    assert compute.calls == 1
+    assert all(r.value == [["a", 1]] for r in results)
+    assert sorted(r.shared for r in results) == [False] + [True] * (CALLERS - 1)
+    assert max(r.followers for r in results) == CALLERS - 1
+    # Nothing is kept once the call completes
+    assert flights.do("k", lambda: "again").value == "again"
+
+
+def test_single_flight_shares_errors():
+    flights, compute = SingleFlight(), GatedCompute(ValueError("corrupt file"))
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(flights.do, "k", compute) for _ in range(3)]
+        wait_for_followers(flights, "k", 2)
+        compute.release.set()
+        for f in futures:
+            with pytest.raises(ValueError, match="corrupt file"):
+                f.result()
+
+    assert compute.calls == 1
+
+
+def test_cached_call_coalesces_misses():
+    cache, compute = ResultCache(), GatedCompute([["x", 2]])
+    key_parts = ("q3", "memory", False, "file.json", "v1")
+    with ThreadPoolExecutor(max_workers=CALLERS) as executor:
+        futures = [
+            executor.submit(cached_call, cache, key_parts, compute)
+            for _ in range(CALLERS)
+        ]
+        wait_for_followers(cache.flights, cache_key(*key_parts), CALLERS - 1)
+        compute.release.set()
+        results = [f.result() for f in futures]
+
+    assert compute.calls == 1
+    assert results == [[["x", 2]]] * CALLERS
+    assert cached_call(cache, key_parts, compute) == [["x", 2]]
+
+
+def test_single_question_shares_all_scan():
+    cache = ResultCache()
+    all_rows = {"q1": [["2021-02-12", "u1"]], "q2": [["😀", 3]], "q3": [["u2", 1]]}
+    run_all = GatedCompute(all_rows)
+    args = ("memory", False, "file.json", "v1")
+    all_key = cache_key("all", *args)
+
+    def all_request():
+        return cached_call(
+            cache,
+            ("all", *args),
+            lambda: main._compute_http(cache, "all", *args, run_all),
+        )
+
+    def never_called(file_path):
+        raise AssertionError("q2 must reuse the in-flight q=all scan")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        all_future = executor.submit(all_request)
+        wait_for_followers(cache.flights, all_key, 0)
+        q2_future = executor.submit(
+            main._compute_http, cache, "q2", *args, never_called
+        )
+        wait_for_followers(cache.flights, all_key, 1)
+        run_all.release.set()
+
+        assert msgspec.json.decode(q2_future.result()) == all_rows["q2"]
+        assert msgspec.json.decode(all_future.result()) == all_rows
+
+    # The q=all scan also seeded each question's entry
+    assert msgspec.json.decode(cache.peek(cache_key("q3", *args))) == all_rows["q3"]
+
+
+def test_single_question_recomputes_when_all_scan_fails():
+    cache = ResultCache()
+    run_all = GatedCompute(OSError("transient GCS error"))
+    args = ("memory", False, "file.json", "v1")
+    all_key = cache_key("all", *args)
+
+    def all_request():
+        return cached_call(
+            cache,
+            ("all", *args),
+            lambda: main._compute_http(cache, "all", *args, run_all),
+        )
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        all_future = executor.submit(all_request)
+        wait_for_followers(cache.flights, all_key, 0)
+        q2_future = executor.submit(
+            main._compute_http, cache, "q2", *args, lambda file_path: [["😀", 3]]
+        )
+        wait_for_followers(cache.flights, all_key, 1)
+        run_all.release.set()
+
+        # The follower falls back to its own scan instead of sharing the error
+        assert msgspec.json.decode(q2_future.result()) == [["😀", 3]]
+        with pytest.raises(OSError):
+            all_future.result()